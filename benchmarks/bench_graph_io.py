@@ -0,0 +1,90 @@
+"""
+网络读写基准测试
+Graph I/O Benchmark
+
+在出场次数最多的若干演员组成的多演员网络上，比较二进制列式格式 (.npz) 与
+GEXF、GraphML、node-link JSON、NDJSON 的保存耗时、文件大小和加载耗时。
+网络分别以普通边（字符串列表属性）和作品编码边（interned=True）构建。
+文本格式由流式导出器写出（nx.write_gexf 等无法写出列表属性），由 networkx / pandas 读回。
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import os
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+import pandas as pd
+
+from src.exporters import export_graph
+from src.graph_store import load_graph, save_graph
+from src.network_builder import NetworkBuilder
+from benchmarks.synthetic_data import load_frames
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def read_node_link(path):
+    with open(path, encoding='utf-8') as f:
+        return nx.node_link_graph(json.load(f), edges='edges')
+
+
+# 名称 -> (文件名, 保存函数, 加载函数)
+CASES = {
+    'npz': ('graph.npz', lambda G, path: save_graph(G, path), load_graph),
+    'npz (压缩)': ('graph_z.npz', lambda G, path: save_graph(G, path, compress=True), load_graph),
+    'gexf': ('graph.gexf', lambda G, path: export_graph(G, path, 'gexf'), nx.read_gexf),
+    'graphml': ('graph.graphml', lambda G, path: export_graph(G, path, 'graphml'), nx.read_graphml),
+    'json': ('graph.json', lambda G, path: export_graph(G, path, 'json'), read_node_link),
+    'ndjson': ('graph.ndjson', lambda G, path: export_graph(G, path, 'ndjson'),
+               lambda path: pd.read_json(path, lines=True)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--actors', type=int, default=300, help='多演员网络包含的演员数')
+    parser.add_argument('--formats', nargs='+', default=list(CASES), choices=list(CASES),
+                        help='参与比较的格式')
+    args = parser.parse_args()
+
+    cast_data_df, cast_works_df, _ = load_frames()
+    names = cast_works_df['cast_name'].value_counts().index[:args.actors].tolist()
+    builder = NetworkBuilder()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for interned in (False, True):
+            with contextlib.redirect_stdout(io.StringIO()):
+                G = builder.build_multi_actor_network(names, cast_data_df, cast_works_df,
+                                                      interned=interned)
+            print(f"\n多演员网络{'（作品编码边）' if interned else ''}: "
+                  f"{G.number_of_nodes()} 个节点, {G.number_of_edges()} 条边")
+            print(f"  {'格式':<24} {'保存 (秒)':>10} {'大小 (MB)':>10} {'加载 (秒)':>10}")
+            for name in args.formats:
+                filename, save, load = CASES[name]
+                path = os.path.join(directory, filename)
+                _, save_time = timed(save, G, path)
+                size = os.path.getsize(path) / 2 ** 20
+                _, load_time = timed(load, path)
+                print(f"  {name:<24} {save_time:10.3f} {size:10.2f} {load_time:10.3f}")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph = builder.build_global_network(cast_works_df, compact=True)
+        path = os.path.join(directory, 'global.npz')
+        _, save_time = timed(save_graph, graph, path)
+        _, load_time = timed(load_graph, path, compact=True)
+        print(f"\n全局网络 (CompactGraph): {graph.number_of_nodes()} 个节点, {graph.number_of_edges()} 条边")
+        print(f"  npz 保存 {save_time:.3f} 秒, {os.path.getsize(path) / 2 ** 20:.2f} MB, 加载 {load_time:.3f} 秒")
+
+
+if __name__ == '__main__':
+    main()
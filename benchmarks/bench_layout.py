@@ -0,0 +1,79 @@
+"""
+布局基准测试
+Layout Benchmark
+
+在 1k / 10k / 50k 节点的子图上比较 Barnes-Hut 多层布局与 nx.spring_layout 的耗时和布局质量。
+子图从度最高的节点开始广度优先抽取，保证连通。nx.spring_layout 的代价随节点数平方增长，
+默认只在不超过 --networkx-nodes 的子图上运行。
+
+布局质量用 平均边长 / 随机节点对的平均距离 衡量，越小说明相连的节点靠得越近。
+"""
+
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+from scipy.sparse.csgraph import breadth_first_order
+
+from src.network_builder import NetworkBuilder
+from src.layout import layout_positions
+from benchmarks.synthetic_data import load_frames
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    print(f"  {label:<32} {time.perf_counter() - start:8.3f} 秒")
+    return result
+
+
+def edge_length_ratio(adjacency, pos, samples=20000, seed=0):
+    """平均边长与随机节点对平均距离之比"""
+    upper = sp.triu(adjacency, k=1).tocoo()
+    edge_length = np.linalg.norm(pos[upper.row] - pos[upper.col], axis=1).mean()
+    rng = np.random.default_rng(seed)
+    i, j = rng.integers(0, len(pos), (2, samples))
+    return edge_length / np.linalg.norm(pos[i] - pos[j], axis=1).mean()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help='子图节点数')
+    parser.add_argument('--iterations', type=int, default=50, help='迭代次数')
+    parser.add_argument('--networkx-nodes', type=int, default=2000,
+                        help='运行nx.spring_layout的最大节点数')
+    parser.add_argument('--seed', type=int, default=1, help='随机种子')
+    args = parser.parse_args()
+
+    _, cast_works_df, _ = load_frames()
+    graph = NetworkBuilder().build_global_network(cast_works_df, compact=True)
+    order = breadth_first_order(graph.adjacency, int(np.argmax(graph.degree())),
+                                directed=False, return_predecessors=False)
+
+    for size in args.sizes:
+        sample = graph.subgraph(order[:size])
+        adjacency = sample.adjacency.astype(bool)
+        print(f"\n子图: {sample.number_of_nodes()} 个节点, {sample.number_of_edges()} 条边")
+
+        pos = timed('barnes_hut (multilevel)', layout_positions, adjacency,
+                    args.iterations, args.seed)
+        print(f"  {'质量':<30} {edge_length_ratio(adjacency, pos):8.3f}")
+
+        if sample.number_of_nodes() <= args.networkx_nodes:
+            G = sample.to_networkx(include_isolates=True)
+            layout = timed('nx.spring_layout', nx.spring_layout, G, iterations=args.iterations,
+                           seed=args.seed, weight=None)
+            nx_pos = np.array([layout[node] for node in sample.node_ids.tolist()])
+            print(f"  {'质量':<30} {edge_length_ratio(adjacency, nx_pos):8.3f}")
+        else:
+            print(f"  nx.spring_layout 已跳过（节点数超过 {args.networkx_nodes}）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+共享数据快照基准测试
+Shared Snapshot Benchmark
+
+以全规模数据对比工作进程的两种加载方式：
+  frames    每个进程接收一份数据表并各自构建索引（CastNetwork.from_frames）
+  snapshot  数据快照发布一次，各进程以内存映射方式加载（CastNetwork.from_snapshot）
+报告发布耗时、进程池就绪时间、每个进程的初始化耗时，以及预热查询后每个进程的
+RSS / PSS（按共享进程数分摊后的内存）/ 私有内存（MB）。
+工作进程以 spawn 方式启动，不通过 fork 共享父进程的页面。内存读取自 /proc/self/smaps_rollup，
+非 Linux 系统上不显示。
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import shutil
+import sys
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src import CastNetwork
+from benchmarks.synthetic_data import load_frames
+
+_STATE = {}
+
+
+def memory_mb():
+    """当前进程的 RSS、PSS 和私有内存（MB），无法读取时返回 None"""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            fields = {line.split(':')[0]: int(line.split()[1]) for line in f if line.strip().endswith('kB')}
+    except OSError:
+        return None
+    private = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return fields['Rss'] / 1024, fields['Pss'] / 1024, private / 1024
+
+
+def init_frames(frames):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        _STATE['network'] = CastNetwork.from_frames(*frames)
+    _STATE['init'] = time.perf_counter() - start
+
+
+def init_snapshot(snapshot_dir):
+    start = time.perf_counter()
+    _STATE['network'] = CastNetwork.from_snapshot(snapshot_dir)
+    _STATE['init'] = time.perf_counter() - start
+
+
+def warm_up(cast_ids):
+    """执行一批查询后报告初始化耗时和内存"""
+    network = _STATE['network']
+    with contextlib.redirect_stdout(io.StringIO()):
+        for cast_id in cast_ids:
+            network.get_collaboration_frequency_by_id(cast_id, top_n=10)
+            network.build_actor_network_by_id(cast_id, interned=True)
+        network.get_genres_statistics()
+    return os.getpid(), _STATE['init'], memory_mb()
+
+
+def run_pool(label, initializer, initargs, processes, cast_ids):
+    context = multiprocessing.get_context('spawn')
+    start = time.perf_counter()
+    with ProcessPoolExecutor(processes, mp_context=context, initializer=initializer,
+                             initargs=initargs) as pool:
+        reports = {}
+        # 尽量让每个进程都执行一次预热；按进程号去重
+        for _ in range(10):
+            for pid, init, memory in pool.map(warm_up, [cast_ids] * processes):
+                reports[pid] = (init, memory)
+            if len(reports) >= processes:
+                break
+        ready = time.perf_counter() - start
+    inits = [init for init, _ in reports.values()]
+    print(f"\n{label}: 进程池就绪 {ready:.1f} 秒，初始化 平均 {np.mean(inits):.2f} 秒 / 最长 {max(inits):.2f} 秒")
+    memories = [memory for _, memory in reports.values() if memory is not None]
+    if memories:
+        rss, pss, private = np.array(memories).mean(axis=0)
+        print(f"  每进程 RSS {rss:8.1f} MB   PSS {pss:8.1f} MB   私有 {private:8.1f} MB")
+        print(f"  {processes} 个进程 PSS 合计 {pss * processes:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=4, help='工作进程数')
+    parser.add_argument('--snapshot-dir', default=None, help='快照目录，默认在 /dev/shm（不存在时为临时目录）下新建')
+    parser.add_argument('--queries', type=int, default=50, help='每个进程的预热查询数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        frames = load_frames()
+    network = CastNetwork.from_frames(*frames)
+    rng = np.random.default_rng(args.seed)
+    cast_ids = rng.choice(frames[1]['cast_id'].to_numpy(), args.queries).tolist()
+
+    temp_dir = None
+    snapshot_dir = args.snapshot_dir
+    if snapshot_dir is None:
+        temp_dir = tempfile.mkdtemp(dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+        snapshot_dir = os.path.join(temp_dir, 'snapshot')
+    try:
+        start = time.perf_counter()
+        network.publish_snapshot(snapshot_dir)
+        size = sum(entry.stat().st_size for entry in os.scandir(snapshot_dir) if entry.is_file())
+        print(f"发布快照 {time.perf_counter() - start:.1f} 秒，{size / 2 ** 20:.1f} MB -> {snapshot_dir}")
+
+        run_pool('frames', init_frames, (frames,), args.processes, cast_ids)
+        run_pool('snapshot', init_snapshot, (snapshot_dir,), args.processes, cast_ids)
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+SQLite 数据加载基准测试
+SQLite Data Loader Benchmark
+
+把全规模数据写成 CSV 后导入 SQLite，对比 SQLiteDataLoader 与 DataLoader 的
+常驻内存和各查询的单次延迟（p50 / p99，毫秒）。查询参数从数据库中随机抽取。
+导入在子进程中完成，主进程的内存只包含查询时打开的数据库连接。
+常驻内存读取自 /proc/self/status，非 Linux 系统上不显示。
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.data_loader import DataLoader
+from src.sqlite_loader import SQLiteDataLoader
+from benchmarks.synthetic_data import make_frames
+
+
+def rss_mb():
+    """当前进程的常驻内存（MB），无法读取时返回 None"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def write_csvs(directory, seed):
+    paths = [os.path.join(directory, name) for name in ('cast_data.csv', 'cast_works_data.csv', 'works_data.csv')]
+    for frame, path in zip(make_frames(seed=seed), paths):
+        frame.to_csv(path, index=False, encoding='utf-8')
+    return paths
+
+
+def ingest(db_path, paths):
+    start = time.perf_counter()
+    SQLiteDataLoader(db_path).load_data(*paths).close()
+    print(f"导入耗时 {time.perf_counter() - start:.1f} 秒，数据库 {os.path.getsize(db_path) / 2 ** 20:.1f} MB")
+
+
+def latency(label, func, arguments):
+    timings = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for args in arguments:
+            start = time.perf_counter()
+            func(*args)
+            timings.append((time.perf_counter() - start) * 1000)
+    p50, p99 = np.percentile(timings, [50, 99])
+    print(f"  {label:<36} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+
+def run_queries(loader, cast_ids, work_ids, names, roles):
+    latency('get_actor_works', loader.get_actor_works, [(c,) for c in cast_ids])
+    latency('get_work_cast', loader.get_work_cast, [(w,) for w in work_ids])
+    latency('get_cast_collaboration_data_by_id', loader.get_cast_collaboration_data_by_id,
+            [(c,) for c in cast_ids])
+    latency('  include_roles', loader.get_cast_collaboration_data_by_id, [(c, roles) for c in cast_ids])
+    latency('search_actors', loader.search_actors, [(n[:3],) for n in names])
+    latency('get_role_statistics', loader.get_role_statistics, [()] * 20)
+    latency('get_genres_statistics', loader.get_genres_statistics, [()] * 20)
+    latency('get_actor_genre_profile', loader.get_actor_genre_profile, [(c,) for c in cast_ids])
+    latency('get_genre_cooccurrence (1990-2000)', loader.get_genre_cooccurrence, [(1990, 2000)] * 5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--queries', type=int, default=200, help='每种查询的次数')
+    parser.add_argument('--seed', type=int, default=0, help='合成数据的随机种子')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_csvs(directory, args.seed)
+        db_path = os.path.join(directory, 'cast.sqlite')
+        process = multiprocessing.Process(target=ingest, args=(db_path, paths))
+        process.start()
+        process.join()
+
+        baseline = rss_mb()
+        loader = SQLiteDataLoader(db_path).load_data(*paths)
+        with contextlib.closing(sqlite3.connect(db_path)) as connection:
+            sample = lambda sql: [row[0] for row in connection.execute(sql, (args.queries,))]
+            cast_ids = sample('SELECT cast_id FROM cast_works ORDER BY random() LIMIT ?')
+            work_ids = sample('SELECT work_id FROM works_data ORDER BY random() LIMIT ?')
+            names = sample('SELECT cast_name FROM cast_data ORDER BY random() LIMIT ?')
+        roles = ['演员', '导演']
+
+        print("\nSQLiteDataLoader")
+        run_queries(loader, cast_ids, work_ids, names, roles)
+        if baseline is not None:
+            print(f"  常驻内存增加 {rss_mb() - baseline:.1f} MB")
+        loader.close()
+
+        print("\nDataLoader")
+        baseline = rss_mb()
+        frames = DataLoader()
+        with contextlib.redirect_stdout(io.StringIO()):
+            frames.load_data(*paths)
+        run_queries(frames, cast_ids, work_ids, names, roles)
+        if baseline is not None:
+            print(f"  常驻内存增加 {rss_mb() - baseline:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
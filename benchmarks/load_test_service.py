@@ -0,0 +1,163 @@
+"""
+查询服务压测
+Query Service Load Test
+
+在子进程中以全规模数据启动查询服务（或连接 --url 指定的已运行服务），
+由多个 keep-alive 连接并发发送混合查询，报告吞吐量和各查询的 p50 / p99 延迟（毫秒）。
+随后把同样的查询按 --batch-size 条一组经 POST /batch 发送，报告批量模式的吞吐量。
+查询参数从本地加载的同一份数据中随机抽取。
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import socket
+import sys
+import os
+import time
+import urllib.error
+import urllib.request
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src import CastNetwork
+from benchmarks.synthetic_data import load_frames
+
+# 查询名称 -> 占比
+MIX = {'search': 0.2, 'resolve': 0.15, 'collaborators': 0.25, 'ego': 0.2, 'path': 0.15, 'stats': 0.05}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_server(frames, port, processes):
+    CastNetwork.from_frames(*frames).serve(port=port, processes=processes)
+
+
+def wait_ready(url, timeout=600):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/health', timeout=5) as response:
+                return json.load(response)
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.5)
+    raise TimeoutError(f"服务未在 {timeout} 秒内就绪: {url}")
+
+
+def make_queries(frames, n, seed):
+    cast_data_df, cast_works_df, _ = frames
+    rng = np.random.default_rng(seed)
+    cast_ids = cast_works_df['cast_id'].to_numpy()
+    names = cast_data_df['cast_name'].dropna().to_numpy()
+    pick_id = lambda: cast_ids[rng.integers(len(cast_ids))].item()
+    pick_name = lambda: str(names[rng.integers(len(names))])
+    make = {
+        'search': lambda: {'keyword': pick_name()[:2], 'limit': 10},
+        'resolve': lambda: {'name': pick_name()},
+        'collaborators': lambda: {'cast_id': pick_id(), 'top_n': 10},
+        'ego': lambda: {'cast_id': pick_id(), 'limit': 50},
+        'path': lambda: {'source': pick_id(), 'target': pick_id()},
+        'stats': lambda: {'cast_id': pick_id()},
+    }
+    ops = rng.choice(list(MIX), size=n, p=list(MIX.values()))
+    return [(op, make[op]()) for op in ops]
+
+
+async def client(host, port, jobs, results):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while jobs:
+            label, path, payload = jobs.pop()
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            start = time.perf_counter()
+            writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while (line := await reader.readline()) not in (b'\r\n', b''):
+                key, _, value = line.decode('latin-1').partition(':')
+                if key.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            results.append((label, status, (time.perf_counter() - start) * 1000))
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, jobs, concurrency):
+    results = []
+    jobs = list(reversed(jobs))
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, jobs, results) for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+def report(results, seconds, n_queries):
+    timings = np.array([ms for _, _, ms in results])
+    errors = sum(status != 200 for _, status, _ in results)
+    print(f"  {len(results)} 个请求，{seconds:.1f} 秒，吞吐量 {n_queries / seconds:.0f} 查询/秒，"
+          f"错误 {errors}")
+    for label in sorted({label for label, _, _ in results}):
+        ms = timings[[i for i, (name, _, _) in enumerate(results) if name == label]]
+        p50, p99 = np.percentile(ms, [50, 99])
+        print(f"  {label:<14} {len(ms):6d} 次   p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default=None, help='已运行服务的地址，如 http://127.0.0.1:8765')
+    parser.add_argument('--processes', type=int, default=None, help='服务的工作进程数')
+    parser.add_argument('--requests', type=int, default=3000, help='查询总数')
+    parser.add_argument('--concurrency', type=int, default=32, help='并发连接数')
+    parser.add_argument('--batch-size', type=int, default=16, help='批量模式每个请求的查询数，0表示跳过')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        frames = load_frames()
+    queries = make_queries(frames, args.requests, args.seed)
+
+    server = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{free_port()}"
+        server = multiprocessing.Process(target=run_server,
+                                         args=(frames, int(url.rsplit(':', 1)[1]), args.processes))
+        server.start()
+    try:
+        start = time.perf_counter()
+        health = wait_ready(url)
+        print(f"服务就绪（{time.perf_counter() - start:.1f} 秒）: {health['actors']} 位演员，"
+              f"{health['works']} 部作品，{health['processes']} 个工作进程")
+        host, port = url.split('://', 1)[-1].rsplit(':', 1)
+        port = int(port)
+
+        print(f"\n单条查询（{args.concurrency} 个并发连接）")
+        results, seconds = asyncio.run(run_load(
+            host, port, [(op, '/' + op, params) for op, params in queries], args.concurrency))
+        report(results, seconds, len(queries))
+
+        if args.batch_size > 0:
+            size = args.batch_size
+            batches = [[{'op': op, 'params': params} for op, params in queries[i:i + size]]
+                       for i in range(0, len(queries), size)]
+            print(f"\n批量查询（每批 {size} 条，{args.concurrency} 个并发连接）")
+            results, seconds = asyncio.run(run_load(
+                host, port, [('batch', '/batch', batch) for batch in batches], args.concurrency))
+            report(results, seconds, len(queries))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -39,11 +39,15 @@ def demo_collaboration_visualization(cast_network, actor_name):
     if collaborations:
         # 合作频率热力图
         print("生成合作频率热力图...")
-        cast_network.visualizer.plot_collaboration_heatmap(collaborations)
+        cast_network.visualizer.plot_collaboration_heatmap(
+            collaborations, cast_works_df=cast_network.cast_works_df
+        )
         
         # 时间线分析
         print("生成合作时间线分析...")
-        cast_network.visualizer.plot_timeline_analysis(collaborations)
+        cast_network.visualizer.plot_timeline_analysis(
+            collaborations, cast_works_df=cast_network.cast_works_df
+        )
 
 def demo_network_comparison(cast_network):
     """网络对比可视化示例"""
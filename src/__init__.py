@@ -6,97 +6,257 @@ Chinese Cast Network Analysis Tool
 __version__ = "1.0.0"
 __author__ = "Your Name"
 
+import copy
+import threading
 from typing import Optional, List
 from .data_loader import DataLoader
+from .sqlite_loader import SQLiteDataLoader
 from .network_builder import NetworkBuilder
 from .visualizer import NetworkVisualizer
+from .recommender import CollaboratorRecommender, evaluate_temporal_split
+from .similarity import MinHashIndex
+from .components import ComponentIndex
+from .weighting import EdgeWeighting
+from .layout import LayoutCache, fast_layout
+from .backbone import extract_backbone
+from .graph_store import load_graph, save_graph
+from .ego_dataset import export_ego_dataset
+from .snapshot import DataSnapshot, EMPTY_SNAPSHOT
+from .snapshot_store import load_snapshot, save_snapshot
+from .service import QueryService, run_service
 
 class CastNetwork:
     """华语影视演员合作网络分析主类"""
     
-    def __init__(self):
-        self.data_loader = DataLoader()
+    def __init__(self, layout_cache_dir: Optional[str] = None):
+        """
+        Args:
+            layout_cache_dir: 布局缓存目录，设置后重复绘制同一网络时直接读取布局
+        """
         self.network_builder = NetworkBuilder()
-        self.visualizer = NetworkVisualizer()
-        self.cast_data_df = None
-        self.cast_works_df = None
-        self.works_data_df = None
+        self.visualizer = NetworkVisualizer(
+            LayoutCache(layout_cache_dir) if layout_cache_dir else None
+        )
+        # 每次查询只读取一次 self._snapshot，之后都使用同一快照；重新加载时整体替换，读取不加锁
+        self._snapshot = EMPTY_SNAPSHOT
+        self._reload_lock = threading.Lock()
     
     def load_data(self, cast_data_path='data/cast_data.csv', 
                   cast_works_path='data/cast_works_data.csv',
                   works_data_path='data/works_data.csv'):
-        """加载数据文件"""
-        self.cast_data_df, self.cast_works_df, self.works_data_df = self.data_loader.load_data(
-            cast_data_path, cast_works_path, works_data_path
-        )
+        """加载数据文件：构建新的数据快照后整体替换，进行中的查询继续使用旧快照"""
+        with self._reload_lock:
+            self._snapshot = DataSnapshot.load(cast_data_path, cast_works_path, works_data_path)
         return self
     
-    def build_actor_network(self, cast_name):
-        """构建指定演员的合作网络"""
-        if self.cast_data_df is None or self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+    @classmethod
+    def from_frames(cls, cast_data_df, cast_works_df, works_data_df=None, **kwargs):
+        """用已加载的数据表创建实例（不读取文件），用于工作进程等已持有数据的场合"""
+        network = cls(**kwargs)
+        network.swap_snapshot(DataSnapshot(cast_data_df, cast_works_df, works_data_df))
+        return network
+    
+    @classmethod
+    def from_snapshot(cls, snapshot_dir: str, mmap: bool = True, **kwargs):
+        """用 publish_snapshot() 发布的快照目录创建实例：索引不重新构建，数值数组内存映射，多个进程共享同一份物理内存"""
+        network = cls(**kwargs)
+        network.swap_snapshot(load_snapshot(snapshot_dir, mmap))
+        return network
+    
+    def publish_snapshot(self, snapshot_dir: str, similarity=()) -> str:
+        """把当前数据快照发布到目录（建议放在 /dev/shm），供其他进程以 from_snapshot() 共享加载"""
+        return save_snapshot(self._snapshot, snapshot_dir, similarity)
+    
+    def swap_snapshot(self, snapshot: DataSnapshot) -> DataSnapshot:
+        """
+        替换当前数据快照（如在后台线程中用新数据构建好快照后切换），不阻塞进行中的查询
+        
+        Args:
+            snapshot: 新快照
+            
+        Returns:
+            DataSnapshot: 被替换的旧快照
+        """
+        with self._reload_lock:
+            previous, self._snapshot = self._snapshot, snapshot
+        return previous
+    
+    def pinned(self) -> 'CastNetwork':
+        """固定在当前快照上的浅拷贝，之后的重新加载不影响它；用于由多步组成、需看到同一版本数据的查询"""
+        return copy.copy(self)
+    
+    @property
+    def snapshot(self) -> DataSnapshot:
+        """当前数据快照；需要多次读取数据时应先取得快照，保证看到同一版本"""
+        return self._snapshot
+    
+    def _replace_frames(self, **frames) -> None:
+        """用替换了部分数据表的新快照整体替换当前快照"""
+        with self._reload_lock:
+            current = self._snapshot
+            self._snapshot = DataSnapshot(
+                frames.get('cast_data_df', current.cast_data_df),
+                frames.get('cast_works_df', current.cast_works_df),
+                frames.get('works_data_df', current.works_data_df),
+            )
+    
+    # 以下属性的赋值（兼容旧用法）会构建新快照后整体替换；同时替换多张表时应使用 from_frames() 或 swap_snapshot()
+    @property
+    def data_loader(self) -> DataLoader:
+        return self._snapshot.data_loader
+    
+    @data_loader.setter
+    def data_loader(self, loader: DataLoader) -> None:
+        self._replace_frames(cast_data_df=loader.cast_data_df, cast_works_df=loader.cast_works_df,
+                             works_data_df=loader.works_data_df)
+    
+    @property
+    def cast_data_df(self):
+        return self._snapshot.cast_data_df
+    
+    @cast_data_df.setter
+    def cast_data_df(self, df) -> None:
+        self._replace_frames(cast_data_df=df)
+    
+    @property
+    def cast_works_df(self):
+        return self._snapshot.cast_works_df
+    
+    @cast_works_df.setter
+    def cast_works_df(self, df) -> None:
+        self._replace_frames(cast_works_df=df)
+    
+    @property
+    def works_data_df(self):
+        return self._snapshot.works_data_df
+    
+    @works_data_df.setter
+    def works_data_df(self, df) -> None:
+        self._replace_frames(works_data_df=df)
+    
+    def build_actor_network(self, cast_name, start_year: Optional[int] = None,
+                            end_year: Optional[int] = None, interned: bool = False,
+                            weighting: Optional[EdgeWeighting] = None,
+                            genres: Optional[List[str]] = None):
+        """构建指定演员的合作网络，可按年份范围和题材筛选；interned=True 时边只保存作品编码"""
+        data = self._snapshot.require()
         
         return self.network_builder.build_actor_network(
-            cast_name, self.cast_data_df, self.cast_works_df
+            cast_name, data.cast_data_df, data.cast_works_df,
+            start_year=start_year, end_year=end_year, interned=interned, weighting=weighting,
+            genres=genres
         )
     
-    def build_actor_network_by_id(self, cast_id: int, include_roles: Optional[List[str]] = None):
+    def build_actor_network_by_id(self, cast_id: int, include_roles: Optional[List[str]] = None,
+                                  start_year: Optional[int] = None, end_year: Optional[int] = None,
+                                  interned: bool = False, weighting: Optional[EdgeWeighting] = None,
+                                  genres: Optional[List[str]] = None):
         """根据演员ID构建合作网络（用于处理重名情况）
         
         Args:
             cast_id: 演员ID
             include_roles: 要包含的职能列表，如 ['演员', '导演']。None表示包含所有职能
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+            interned: 为True时边只保存作品编码，标题等信息按需从共享作品表查询
+            weighting: 边权重方案（时间衰减、番位、职能组合），None表示按合作记录数
+            genres: 只保留属于任一给定题材的作品，None表示不限
             
         Returns:
             nx.Graph: 演员合作网络图
         """
-        if self.cast_data_df is None or self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require()
         
         return self.network_builder.build_actor_network_by_id(
-            cast_id, self.cast_data_df, self.cast_works_df, include_roles
+            cast_id, data.cast_data_df, data.cast_works_df, include_roles,
+            start_year=start_year, end_year=end_year, interned=interned, weighting=weighting,
+            genres=genres
         )
     
     def get_actors_by_name_with_selection(self, cast_name):
         """获取同名演员列表供用户选择"""
-        if self.cast_data_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require(cast_works=False)
         
-        return self.data_loader.get_actors_by_name_with_selection(cast_name)
+        return data.data_loader.get_actors_by_name_with_selection(cast_name)
     
-    def build_multi_actor_network(self, cast_names):
-        """构建多个演员的合作网络"""
-        if self.cast_data_df is None or self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+    def build_multi_actor_network(self, cast_names, start_year: Optional[int] = None,
+                                  end_year: Optional[int] = None, interned: bool = False,
+                                  weighting: Optional[EdgeWeighting] = None,
+                                  genres: Optional[List[str]] = None):
+        """构建多个演员的合作网络，可按年份范围和题材筛选；interned=True 时边只保存作品编码"""
+        data = self._snapshot.require()
         
         return self.network_builder.build_multi_actor_network(
-            cast_names, self.cast_data_df, self.cast_works_df
+            cast_names, data.cast_data_df, data.cast_works_df,
+            start_year=start_year, end_year=end_year, interned=interned, weighting=weighting,
+            genres=genres
+        )
+    
+    def build_global_network(self, start_year: Optional[int] = None, end_year: Optional[int] = None,
+                             include_roles: Optional[List[str]] = None, compact: bool = False,
+                             weighting: Optional[EdgeWeighting] = None,
+                             genres: Optional[List[str]] = None):
+        """构建全行业合作网络（节点以cast_id为键），可指定边权重方案和题材"""
+        data = self._snapshot.require(cast_data=False)
+        
+        return self.network_builder.build_global_network(
+            data.cast_works_df, start_year, end_year, include_roles, compact, weighting, genres
+        )
+    
+    def iter_network_windows(self, window_size: int = 10, step: int = 1,
+                             start_year: Optional[int] = None, end_year: Optional[int] = None,
+                             include_roles: Optional[List[str]] = None,
+                             genres: Optional[List[str]] = None):
+        """按滑动时间窗口迭代全局合作网络，窗口之间增量更新"""
+        data = self._snapshot.require(cast_data=False)
+        
+        return self.network_builder.iter_network_windows(
+            data.cast_works_df, window_size, step, start_year, end_year, include_roles, genres
+        )
+    
+    def build_role_pair_network(self, source_role, target_role, cast_id=None,
+                                start_year: Optional[int] = None, end_year: Optional[int] = None,
+                                genres: Optional[List[str]] = None):
+        """构建职能对有向网络（如 导演 -> 演员），可只看某位演员相关的边
+        
+        Args:
+            source_role: 起点职能（字符串或职能列表）
+            target_role: 终点职能（字符串或职能列表）
+            cast_id: 种子演员ID，None表示全部数据
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+            genres: 只统计属于任一给定题材的作品，None表示不限
+            
+        Returns:
+            nx.DiGraph: 以cast_id为节点的有向网络，边权重为共同署名的作品数
+        """
+        data = self._snapshot.require(cast_data=False)
+        
+        return self.network_builder.build_role_pair_network(
+            data.cast_works_df, source_role, target_role, cast_id, start_year, end_year, genres
         )
     
     def get_collaboration_frequency(self, cast_name, top_n=10):
         """获取演员的合作频率统计"""
-        if self.cast_data_df is None or self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require()
         
         return self.network_builder.get_collaboration_frequency(
-            cast_name, self.cast_data_df, self.cast_works_df, top_n
+            cast_name, data.cast_data_df, data.cast_works_df, top_n
         )
     
     def get_collaboration_frequency_by_id(self, cast_id, top_n=10):
         """根据演员ID获取合作频率统计（用于处理重名情况）"""
-        if self.cast_data_df is None or self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require()
         
         return self.network_builder.get_collaboration_frequency_by_id(
-            cast_id, self.cast_data_df, self.cast_works_df, top_n
+            cast_id, data.cast_data_df, data.cast_works_df, top_n
         )
     
     def get_cast_collaboration_data(self, cast_name):
         """获取指定演员的所有合作数据"""
-        if self.cast_data_df is None or self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require()
         
-        return self.data_loader.get_cast_collaboration_data(cast_name)
+        return data.data_loader.get_cast_collaboration_data(cast_name)
     
     def get_cast_collaboration_data_by_id(self, cast_id: int, include_roles: Optional[List[str]] = None):
         """根据演员ID获取合作数据（用于处理重名情况）
@@ -108,51 +268,154 @@ class CastNetwork:
         Returns:
             pd.DataFrame: 合作数据
         """
-        if self.cast_data_df is None or self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require()
         
-        return self.data_loader.get_cast_collaboration_data_by_id(cast_id, include_roles)
+        return data.data_loader.get_cast_collaboration_data_by_id(cast_id, include_roles)
     
     def get_available_roles(self):
         """获取数据中所有可用的职能列表"""
-        if self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require(cast_data=False)
         
-        return self.data_loader.get_available_roles()
+        return data.data_loader.get_available_roles()
     
     def get_role_statistics(self):
         """获取各职能的统计信息"""
-        if self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require(cast_data=False)
         
-        return self.data_loader.get_role_statistics()
+        return data.data_loader.get_role_statistics()
     
     def get_genres_statistics(self):
         """获取作品题材的统计信息"""
-        if self.cast_works_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require(cast_data=False)
+        
+        return data.data_loader.get_genres_statistics()
+    
+    def get_genre_cooccurrence(self, start_year: Optional[int] = None, end_year: Optional[int] = None):
+        """获取题材 x 题材 共现矩阵（同时属于两个题材的作品数）"""
+        data = self._snapshot.require(cast_data=False)
+        
+        return data.data_loader.get_genre_cooccurrence(start_year, end_year)
+    
+    def get_actor_genre_profile(self, cast_id, normalize: bool = False):
+        """获取演员参与作品的题材分布"""
+        data = self._snapshot.require(cast_data=False)
         
-        return self.data_loader.get_genres_statistics()
+        return data.data_loader.get_actor_genre_profile(cast_id, normalize)
+    
+    def recommend_collaborators(self, cast_ids, method: str = 'adamic_adar', top_k: int = 10,
+                                start_year: Optional[int] = None, end_year: Optional[int] = None,
+                                weighting: Optional[EdgeWeighting] = None):
+        """推荐潜在合作者
+        
+        Args:
+            cast_ids: 单个演员ID或演员ID列表
+            method: 打分方法 ('common_neighbors', 'adamic_adar', 'resource_allocation', 'jaccard')
+            top_k: 每位演员返回的推荐数
+            start_year: 只用该年份及之后的合作打分
+            end_year: 只用该年份及之前的合作打分
+            weighting: 边权重方案，给定时按加权网络打分
+            
+        Returns:
+            单个ID时返回推荐列表，ID列表时返回 {cast_id: 推荐列表}
+        """
+        data = self._snapshot.require(cast_data=False)
+        
+        key = ('recommender', start_year, end_year, weighting.key if weighting is not None else None)
+        recommender = data.derived(key, lambda: CollaboratorRecommender.from_data(
+            data.cast_works_df, start_year, end_year, weighting
+        ))
+        
+        if isinstance(cast_ids, (list, tuple, set)):
+            return recommender.recommend_batch(cast_ids, method, top_k)
+        return recommender.recommend(cast_ids, method, top_k)
+    
+    def find_similar_actors(self, cast_id, kind: str = 'collaborators', top_k: int = 10,
+                            min_similarity: float = 0.0):
+        """查找合作圈子或作品集合相似的演员
+        
+        Args:
+            cast_id: 演员ID
+            kind: 'collaborators' 按合作者集合，'works' 按作品集合
+            top_k: 返回数量
+            min_similarity: 估计Jaccard相似度的下限
+            
+        Returns:
+            List[Dict]: 按估计相似度降序排列的结果
+        """
+        data = self._snapshot.require(cast_data=False)
+        
+        index = data.derived(('similarity', kind), lambda: MinHashIndex.for_actors(data.cast_works_df, kind))
+        return index.query(cast_id, top_k, min_similarity)
+    
+    def _shared_components(self) -> ComponentIndex:
+        """快照上只读的连通分量索引（首次使用时构建），各线程共享"""
+        data = self._snapshot.require(cast_data=False)
+        
+        return data.derived('components', lambda: ComponentIndex.from_data(data.cast_works_df).freeze())
+    
+    def get_component_index(self):
+        """获取连通分量索引的副本，可用 add_credits() 增量更新，不影响其他调用者"""
+        return self._shared_components().copy()
+    
+    def are_actors_connected(self, cast_id_a, cast_id_b) -> bool:
+        """两位演员是否通过合作关系（可经过中间人）连通"""
+        return self._shared_components().connected(cast_id_a, cast_id_b)
     
     def search_actors(self, keyword, limit=10):
         """搜索演员"""
-        if self.cast_data_df is None:
-            raise ValueError("请先调用 load_data() 加载数据")
+        data = self._snapshot.require(cast_works=False)
         
-        return self.data_loader.search_actors(keyword, limit)
+        return data.data_loader.search_actors(keyword, limit)
     
     def visualize_network(self, network, **kwargs):
         """可视化网络"""
         return self.visualizer.plot_network(network, **kwargs)
     
-    def visualize_interactive_network(self, network, title="演员合作网络"):
+    def render_network_figure(self, network, **kwargs):
+        """把网络绘制到独立的 Figure（Agg 画布，不经过 pyplot 全局状态），可在后台线程和工作进程中调用"""
+        return self.visualizer.render_network_figure(network, **kwargs)
+    
+    def visualize_interactive_network(self, network, title="演员合作网络", **kwargs):
         """创建交互式网络可视化"""
-        return self.visualizer.plot_interactive_network(network, title)
+        return self.visualizer.plot_interactive_network(network, title, **kwargs)
+    
+    def render_networks(self, cast_ids, output_dir, formats=('png',), processes=None, **kwargs):
+        """批量渲染演员合作网络（无界面、多进程），返回每位演员的耗时和内存报告"""
+        data = self._snapshot.require()
+        
+        return self.visualizer.render_batch(cast_ids, data.cast_data_df, data.cast_works_df,
+                                            output_dir, formats, processes, **kwargs)
     
     def get_network_stats(self, network):
         """获取网络统计信息"""
         return self.network_builder.get_network_stats(network)
     
-    def export_network(self, network, filepath, format='gexf'):
-        """导出网络数据"""
-        return self.visualizer.export_network(network, filepath, format)
+    def extract_backbone(self, network, methods='disparity', keep_isolates=True, **params):
+        """提取骨干网络（'disparity' / 'top_k' / 'spanning_forest'，可组合），结果可直接用于可视化和统计"""
+        return extract_backbone(network, methods, keep_isolates=keep_isolates, **params)
+    
+    def export_network(self, network, filepath, format='gexf', compress=None):
+        """导出网络数据（'gexf' / 'graphml' / 'json' / 'ndjson' / 'gml' / 'npz'），文件名以 .gz 结尾时压缩"""
+        return self.visualizer.export_network(network, filepath, format, compress)
+    
+    def export_ego_dataset(self, output_dir, n_shards=64, format='jsonl', processes=None, resume=True,
+                           **kwargs):
+        """把所有演员的个人网络边表导出为分片数据集（多进程，带 manifest，可断点续写）"""
+        data = self._snapshot.require(cast_data=False)
+        
+        return export_ego_dataset(data.cast_works_df, output_dir, n_shards, format, processes,
+                                  resume=resume, **kwargs)
+    
+    def load_network(self, filepath, compact=False):
+        """加载以 'npz' 格式导出的网络，compact=True 时返回 CompactGraph"""
+        return load_graph(filepath, compact=compact)
+    
+    def serve(self, host='127.0.0.1', port=8765, processes=None, **kwargs):
+        """以已加载的数据启动本地 HTTP 查询服务（阻塞运行），计算量大的查询交给工作进程池"""
+        self._snapshot.require()
+        
+        run_service(self, host, port, processes, **kwargs)
+
+
+# AsyncCastNetwork 包装 CastNetwork 的方法，需在 CastNetwork 定义之后导入
+from .async_network import AsyncCastNetwork
@@ -0,0 +1,238 @@
+"""
+异步接口模块
+Asyncio API Module
+
+AsyncCastNetwork 把 CastNetwork 的公开方法包装为协程，供基于 asyncio 的后端调用，
+阻塞的计算交给线程池或进程池执行，不占用事件循环。
+
+- 同时到达的相同调用（方法名和参数相同）只计算一次，所有调用者得到同一个结果对象
+- 调用被取消或超时时，若没有其他调用者在等待同一计算，则取消尚未开始的计算；
+  已经开始的计算无法中断，完成后结果被丢弃
+- 进程池的每个工作进程只接收一次数据；重新加载数据后进程池随之重建
+- 设置 snapshot_dir 时数据快照发布到该目录，工作进程以内存映射方式共享同一份数据
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Union
+
+from . import CastNetwork
+from .snapshot_store import save_snapshot
+
+# 包装为协程的 CastNetwork 方法（iter_network_windows 为生成器，serve 阻塞运行，
+# visualize_network 使用 pyplot 全局状态并调用 plt.show()，均不包装；绘图使用 render_network_figure）
+ASYNC_METHODS = (
+    'build_actor_network', 'build_actor_network_by_id', 'get_actors_by_name_with_selection',
+    'build_multi_actor_network', 'build_global_network', 'build_role_pair_network',
+    'get_collaboration_frequency', 'get_collaboration_frequency_by_id',
+    'get_cast_collaboration_data', 'get_cast_collaboration_data_by_id',
+    'get_available_roles', 'get_role_statistics', 'get_genres_statistics',
+    'get_genre_cooccurrence', 'get_actor_genre_profile', 'recommend_collaborators',
+    'find_similar_actors', 'get_component_index', 'are_actors_connected', 'search_actors',
+    'render_network_figure', 'visualize_interactive_network', 'render_networks',
+    'get_network_stats', 'extract_backbone', 'export_network', 'export_ego_dataset', 'load_network',
+)
+
+# 工作进程的状态（已加载数据的 CastNetwork），由 _init_async_worker 设置
+_ASYNC_STATE: Dict = {}
+
+
+def _init_async_worker(frames, layout_cache_dir: Optional[str]) -> None:
+    """工作进程的初始化：每个进程只接收一次数据"""
+    _ASYNC_STATE['network'] = CastNetwork.from_frames(*frames, layout_cache_dir=layout_cache_dir)
+
+
+def _attach_async_worker(snapshot_dir: str, layout_cache_dir: Optional[str]) -> None:
+    """工作进程的初始化：以内存映射方式加载已发布的数据快照"""
+    _ASYNC_STATE['network'] = CastNetwork.from_snapshot(snapshot_dir, layout_cache_dir=layout_cache_dir)
+
+
+def _call_in_worker(name: str, args: tuple, kwargs: Dict):
+    return getattr(_ASYNC_STATE['network'], name)(*args, **kwargs)
+
+
+def _freeze(value):
+    """把参数转换为可哈希的键，列表、字典、集合按内容比较，其他对象按自身的哈希"""
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return ('dict',) + tuple(sorted((repr(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return ('set', frozenset(_freeze(item) for item in value))
+    hash(value)
+    return (type(value).__qualname__, value)
+
+
+class AsyncCastNetwork:
+    """CastNetwork 的 asyncio 外观
+
+    ASYNC_METHODS 中的方法与 CastNetwork 同名同参数，均可 await，另外接受关键字参数 timeout（秒）。
+    """
+
+    def __init__(self, network: Optional[CastNetwork] = None,
+                 executor: Union[str, Executor] = 'thread', max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None, coalesce: bool = True,
+                 layout_cache_dir: Optional[str] = None, snapshot_dir: Optional[str] = None):
+        """
+        Args:
+            network: 被包装的实例，None表示新建（之后调用 load_data()）
+            executor: 'thread'（线程池，共享数据）、'process'（进程池，每个进程一份数据，
+                参数和结果需可 pickle）或已有的 Executor（按线程池方式使用，不由本对象关闭）
+            max_workers: 线程数或进程数，None表示由执行器决定
+            timeout: 每次调用的默认超时（秒），None表示不限
+            coalesce: 为True时合并同时进行的相同调用
+            layout_cache_dir: 新建实例时的布局缓存目录
+            snapshot_dir: 使用进程池时，把数据快照发布到该目录（建议放在 /dev/shm），
+                工作进程以内存映射方式共享加载，不再各自接收数据表
+        """
+        if isinstance(executor, str) and executor not in ('thread', 'process'):
+            raise ValueError(f"不支持的执行器: {executor}，可选: ['thread', 'process']")
+        self.network = network if network is not None else CastNetwork(layout_cache_dir)
+        self.executor_kind = executor if isinstance(executor, str) else 'external'
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.coalesce = coalesce
+        self._layout_cache_dir = layout_cache_dir
+        self.snapshot_dir = snapshot_dir
+        self._published = None
+        self._executor = executor if isinstance(executor, Executor) else None
+        self._inflight: Dict = {}
+        self._load_lock = None
+
+    @property
+    def cast_data_df(self):
+        return self.network.cast_data_df
+
+    @property
+    def cast_works_df(self):
+        return self.network.cast_works_df
+
+    @property
+    def works_data_df(self):
+        return self.network.works_data_df
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == 'process' and self.snapshot_dir is not None:
+                self._publish()
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_attach_async_worker,
+                                                     initargs=(self.snapshot_dir, self._layout_cache_dir))
+            elif self.executor_kind == 'process':
+                network = self.network
+                frames = (network.cast_data_df, network.cast_works_df, network.works_data_df)
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_async_worker,
+                                                     initargs=(frames, self._layout_cache_dir))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='cast-network')
+        return self._executor
+
+    def _publish(self) -> None:
+        """把当前快照发布到 snapshot_dir，同一快照只发布一次"""
+        snapshot = self.network.snapshot
+        if self._published is not snapshot:
+            save_snapshot(snapshot, self.snapshot_dir)
+            self._published = snapshot
+
+    def _shutdown_executor(self, wait: bool = True, cancel_futures: bool = True) -> None:
+        if self._executor is not None and self.executor_kind != 'external':
+            self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+            self._executor = None
+
+    async def load_data(self, cast_data_path='data/cast_data.csv',
+                        cast_works_path='data/cast_works_data.csv',
+                        works_data_path='data/works_data.csv') -> 'AsyncCastNetwork':
+        """加载数据文件（在线程中执行）；使用进程池时，之后的调用由以新数据重建的进程池执行"""
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            await asyncio.wait_for(
+                asyncio.to_thread(self.network.load_data, cast_data_path, cast_works_path, works_data_path),
+                self.timeout
+            )
+            if self.executor_kind == 'process' and self.snapshot_dir is not None:
+                await asyncio.to_thread(self._publish)
+            # 进行中的调用仍在旧数据上完成，但不再与之后的调用合并
+            self._inflight.clear()
+            if self.executor_kind == 'process':
+                self._shutdown_executor(wait=False, cancel_futures=False)
+        return self
+
+    async def call(self, name: str, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        在执行器中调用 CastNetwork 的方法
+
+        Args:
+            name: 方法名，见 ASYNC_METHODS
+            *args: 位置参数
+            timeout: 超时（秒），None表示使用默认超时；超时抛出 asyncio.TimeoutError
+            **kwargs: 关键字参数
+
+        Returns:
+            方法的返回值；合并的调用返回同一个对象，调用者不应原地修改
+        """
+        if name not in ASYNC_METHODS:
+            raise ValueError(f"不支持异步调用的方法: {name}")
+        key = None
+        if self.coalesce:
+            try:
+                key = (name, _freeze(args), _freeze(kwargs))
+            except TypeError:  # 参数不可哈希（如 DataFrame），不合并
+                key = None
+        timeout = self.timeout if timeout is None else timeout
+        return await asyncio.wait_for(self._shared(key, name, args, kwargs), timeout)
+
+    def _submit(self, name: str, args: tuple, kwargs: Dict) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if self.executor_kind == 'process':
+            return loop.run_in_executor(executor, _call_in_worker, name, args, kwargs)
+        return loop.run_in_executor(executor, functools.partial(getattr(self.network, name), *args, **kwargs))
+
+    async def _shared(self, key, name: str, args: tuple, kwargs: Dict):
+        """等待一次计算，相同键的并发调用共享同一计算；最后一个等待者离开时取消未完成的计算"""
+        if key is None:
+            return await self._submit(name, args, kwargs)
+
+        entry = self._inflight.get(key)
+        if entry is None:
+            future = self._submit(name, args, kwargs)
+            entry = self._inflight[key] = [future, 0]
+            future.add_done_callback(lambda _: self._inflight.pop(key, None)
+                                     if self._inflight.get(key) is entry else None)
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+
+    async def close(self) -> None:
+        """关闭本对象创建的执行器"""
+        await asyncio.to_thread(self._shutdown_executor)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def _async_method(name: str):
+    method = getattr(CastNetwork, name)
+
+    @functools.wraps(method)
+    async def call(self, *args, **kwargs):
+        return await self.call(name, *args, **kwargs)
+
+    call.__qualname__ = f"AsyncCastNetwork.{name}"
+    return call
+
+
+for _name in ASYNC_METHODS:
+    setattr(AsyncCastNetwork, _name, _async_method(_name))
+del _name
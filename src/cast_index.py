@@ -0,0 +1,837 @@
+"""
+演员作品索引模块
+Cast-Work Index Module
+
+把演员作品关系表编码成整数列和稀疏关联矩阵，供网络构建器复用。
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .compact_graph import CompactGraph
+
+
+def _expand_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """把若干 [start, end) 区间展开成一个连续的下标数组"""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return np.arange(total, dtype=np.int64) + offsets
+
+
+class WorkTable:
+    """共享的作品信息表
+
+    网络边只保存作品编码数组 (work_refs)，标题、类型、题材和年份在输出时
+    才从这张表中查出。同名的翻拍作品编码不同，不会被合并成一条。
+    """
+
+    def __init__(self, work_ids: np.ndarray, titles: np.ndarray, types: np.ndarray,
+                 genres: np.ndarray, years: np.ndarray, role_names: np.ndarray):
+        """
+        Args:
+            work_ids: 每个作品编码对应的作品ID
+            titles: 作品标题
+            types: 作品类型
+            genres: 作品题材
+            years: 作品年份（无年份为NaN）
+            role_names: 每个职能编码对应的职能名称
+        """
+        self.work_ids = work_ids
+        self.titles = titles
+        self.types = types
+        self.genres = genres
+        self.years = years
+        self.role_names = role_names
+
+    def describe(self, work_refs: np.ndarray, role_refs: Iterable[int] = ()) -> Dict:
+        """
+        把作品编码还原为与旧版边属性相同格式的字典
+
+        Args:
+            work_refs: 作品编码数组
+            role_refs: 职能编码
+
+        Returns:
+            Dict: 包含 work_ids, works, work_types, genres, years, collaborator_roles
+        """
+        work_refs = np.asarray(work_refs)
+        years = self.years[work_refs]
+        return {
+            'work_ids': self.work_ids[work_refs].tolist(),
+            'works': self.titles[work_refs].tolist(),
+            'work_types': list(dict.fromkeys(self.types[work_refs].tolist())),
+            'genres': list(dict.fromkeys(self.genres[work_refs].tolist())),
+            'years': sorted(set(years[~np.isnan(years)].tolist())),
+            'collaborator_roles': [self.role_names[code] if code >= 0 else None for code in role_refs]
+        }
+
+
+class CastIndex:
+    """演员作品关系的列式索引
+
+    演员和作品都被编码为连续整数 (code)。作品按年份排序后分区存放，
+    年份区间筛选只需要在有序数组上做一次二分查找。
+    """
+
+    def __init__(self, cast_works_df: pd.DataFrame):
+        """
+        Args:
+            cast_works_df: 演员作品关系数据
+        """
+        actor_codes, actor_ids = pd.factorize(cast_works_df['cast_id'], sort=True)
+        work_codes, work_ids = pd.factorize(cast_works_df['work_id'], sort=True)
+
+        self.n_rows = len(cast_works_df)
+        self.actor_ids = np.asarray(actor_ids)
+        self.work_ids = np.asarray(work_ids)
+        self.n_actors = len(self.actor_ids)
+        self.n_works = len(self.work_ids)
+        self._actor_lookup = pd.Index(actor_ids)
+        self._work_lookup = pd.Index(work_ids)
+
+        # 行级别的列
+        self.row_actor = actor_codes.astype(np.int32)
+        self.row_work = work_codes.astype(np.int32)
+        self.row_name = cast_works_df['cast_name'].to_numpy(dtype=object)
+        self.row_role = cast_works_df['cast_role'].to_numpy(dtype=object)
+        if 'cast_order' in cast_works_df.columns:
+            self.row_order = pd.to_numeric(cast_works_df['cast_order'], errors='coerce').to_numpy(dtype=float)
+        else:
+            self.row_order = np.full(self.n_rows, np.nan)
+
+        # 职能分区：职能编码（空值为-1）和按职能分组的行下标
+        role_codes, role_names = pd.factorize(cast_works_df['cast_role'], sort=True)
+        self.row_role_code = role_codes.astype(np.int32)
+        self.role_names = np.asarray(role_names, dtype=object)
+        self.n_roles = len(self.role_names)
+        self._role_lookup = pd.Index(role_names)
+        valid_role_rows = np.flatnonzero(self.row_role_code >= 0)
+        self._rows_by_role = valid_role_rows[np.argsort(self.row_role_code[valid_role_rows], kind='stable')]
+        self._role_row_ptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.row_role_code[valid_role_rows], minlength=self.n_roles)))
+        )
+        self._role_cache = OrderedDict()
+        self.role_statistics = self._compute_role_statistics(
+            cast_works_df['cast_name'].notna().to_numpy()
+        )
+
+        # 演员姓名（取该演员的第一条记录）
+        first_actor_rows = np.full(self.n_actors, self.n_rows, dtype=np.int64)
+        np.minimum.at(first_actor_rows, self.row_actor, np.arange(self.n_rows))
+        self.actor_names = self.row_name[first_actor_rows]
+
+        # 作品信息表（取该作品的第一条记录）
+        first_work_rows = np.full(self.n_works, self.n_rows, dtype=np.int64)
+        np.minimum.at(first_work_rows, self.row_work, np.arange(self.n_rows))
+        self.work_titles = cast_works_df['work_title'].to_numpy(dtype=object)[first_work_rows]
+        self.work_types = cast_works_df['work_type'].to_numpy(dtype=object)[first_work_rows]
+        self.work_genres = cast_works_df['work_genres'].to_numpy(dtype=object)[first_work_rows]
+        self.work_year = pd.to_numeric(
+            cast_works_df['work_year'], errors='coerce'
+        ).to_numpy(dtype=float)[first_work_rows]
+
+        # 按作品分组的行下标
+        self._rows_by_work = np.argsort(self.row_work, kind='stable')
+        self._work_row_ptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.row_work, minlength=self.n_works)))
+        )
+
+        # 按年份分区：作品按年份排序，无年份的作品排在最后
+        self._works_by_year = np.argsort(self.work_year, kind='stable')
+        self._sorted_years = self.work_year[self._works_by_year]
+        self._year_rank = np.empty(self.n_works, dtype=np.int64)
+        self._year_rank[self._works_by_year] = np.arange(self.n_works)
+
+        # 关联矩阵：演员 x 作品，值为记录条数
+        self.incidence = sp.csr_matrix(
+            (np.ones(self.n_rows, dtype=np.int32), (self.row_actor, self.row_work)),
+            shape=(self.n_actors, self.n_works)
+        )
+        self.incidence.sum_duplicates()
+
+        # 列按年份顺序重排的二值关联矩阵，年份区间对应连续的列切片
+        binary = self.incidence.copy()
+        binary.data[:] = 1
+        self._year_ordered_incidence = binary[:, self._works_by_year].tocsc()
+
+        self._genre_matrix = None
+        self.work_table = WorkTable(self.work_ids, self.work_titles, self.work_types,
+                                    self.work_genres, self.work_year, self.role_names)
+
+    def _compute_role_statistics(self, name_notna: np.ndarray) -> pd.DataFrame:
+        """预先计算各职能的人数、作品数和记录数"""
+        valid = self.row_role_code >= 0
+        roles = self.row_role_code[valid].astype(np.int64)
+        actor_pairs = np.unique(roles * self.n_actors + self.row_actor[valid])
+        work_pairs = np.unique(roles * self.n_works + self.row_work[valid])
+        stats = pd.DataFrame({
+            '人数': np.bincount(actor_pairs // self.n_actors, minlength=self.n_roles),
+            '作品数': np.bincount(work_pairs // self.n_works, minlength=self.n_roles),
+            '记录数': np.bincount(roles, weights=name_notna[valid], minlength=self.n_roles).astype(np.int64)
+        }, index=pd.Index(self.role_names, name='cast_role'))
+        return stats.sort_values('记录数', ascending=False, kind='stable')
+
+    def freeze(self) -> 'CastIndex':
+        """
+        预先构建按需生成的题材矩阵，并把全部数组设为只读
+
+        冻结后的索引可以被多个线程同时查询；职能组合缓存仍按需填充，
+        填充过程对并发读取是安全的。
+
+        Returns:
+            CastIndex: 索引本身
+        """
+        self._ensure_genres()
+        for owner in (self, self.work_table):
+            for value in vars(owner).values():
+                if sp.issparse(value):
+                    arrays = [value.data, value.indices, value.indptr]
+                else:
+                    arrays = [value] if isinstance(value, np.ndarray) else []
+                for array in arrays:
+                    array.flags.writeable = False
+        return self
+
+    @property
+    def available_roles(self) -> List[str]:
+        """数据中所有职能（已排序，不含空值）"""
+        return self.role_names.tolist()
+
+    def _cached_role_entry(self, include_roles: Iterable[str]) -> Dict:
+        """
+        获取某个职能组合的缓存项，常用组合只计算一次
+
+        缓存项包含职能编码掩码 ``codes``，以及按需生成的全表行掩码 ``rows``
+        和关联矩阵 ``incidence``。
+        """
+        key = frozenset(include_roles)
+        entry = self._role_cache.get(key)
+        if entry is not None:
+            try:
+                self._role_cache.move_to_end(key)
+            except KeyError:  # 其他线程刚把它淘汰，本次仍可使用
+                pass
+            return entry
+
+        codes = self._role_lookup.get_indexer(list(key))
+        selected = np.zeros(self.n_roles + 1, dtype=bool)  # 最后一位对应空值(-1)
+        selected[codes[codes >= 0]] = True
+        entry = {'codes': selected}
+        self._role_cache[key] = entry
+        while len(self._role_cache) > 32:
+            try:
+                self._role_cache.popitem(last=False)
+            except KeyError:
+                break
+        return entry
+
+    def role_mask(self, include_roles: Iterable[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        职能筛选掩码
+
+        Args:
+            include_roles: 要包含的职能列表
+            rows: 候选行下标，None表示全表
+
+        Returns:
+            np.ndarray: 与 rows（或全表）等长的布尔掩码
+        """
+        entry = self._cached_role_entry(include_roles)
+        if rows is not None:
+            return entry['codes'][self.row_role_code[rows]]
+        if 'rows' not in entry:
+            entry['rows'] = entry['codes'][self.row_role_code]
+        return entry['rows']
+
+    def rows_of_roles(self, include_roles: Iterable[str]) -> np.ndarray:
+        """返回给定职能的全部关系行下标（按职能分区拼接）"""
+        codes = self._role_lookup.get_indexer(list(include_roles))
+        codes = np.unique(codes[codes >= 0])
+        return self._rows_by_role[_expand_ranges(self._role_row_ptr[codes],
+                                                 self._role_row_ptr[codes + 1])]
+
+    def role_incidence(self, include_roles: Iterable[str]) -> sp.csr_matrix:
+        """
+        只包含给定职能记录的演员 x 作品关联矩阵，按职能组合缓存
+
+        Args:
+            include_roles: 要包含的职能列表
+
+        Returns:
+            sp.csr_matrix: 值为记录条数的关联矩阵
+        """
+        entry = self._cached_role_entry(include_roles)
+        if 'incidence' not in entry:
+            rows = self.rows_of_roles(include_roles)
+            matrix = sp.csr_matrix(
+                (np.ones(len(rows), dtype=np.int32), (self.row_actor[rows], self.row_work[rows])),
+                shape=(self.n_actors, self.n_works)
+            )
+            matrix.sum_duplicates()
+            entry['incidence'] = matrix
+        return entry['incidence']
+
+    def actor_code(self, cast_id) -> int:
+        """返回演员ID对应的编码，不存在时返回 -1"""
+        return int(self._actor_lookup.get_indexer([cast_id])[0])
+
+    def work_code(self, work_id) -> int:
+        """返回作品ID对应的编码，不存在时返回 -1"""
+        return int(self._work_lookup.get_indexer([work_id])[0])
+
+    def role_code(self, role: str) -> int:
+        """返回职能名称对应的编码，不存在时返回 -1"""
+        return int(self._role_lookup.get_indexer([role])[0])
+
+    def actor_codes(self, cast_ids: Iterable) -> np.ndarray:
+        """批量查询演员编码，未找到的为-1"""
+        return self._actor_lookup.get_indexer(list(cast_ids))
+
+    def work_codes(self, work_ids: Iterable) -> np.ndarray:
+        """批量查询作品编码，未找到的为-1"""
+        return self._work_lookup.get_indexer(list(work_ids))
+
+    def _actor_rows(self, actor_codes: np.ndarray,
+                    work_codes: Optional[np.ndarray] = None) -> sp.csr_matrix:
+        """切出给定演员（和作品）的二值关联子矩阵"""
+        rows = self.incidence[np.asarray(actor_codes, dtype=np.int64)]
+        if work_codes is not None:
+            rows = rows[:, np.asarray(work_codes, dtype=np.int64)]
+        rows.data[:] = 1
+        return rows
+
+    def pair_cocredits(self, actor_codes: np.ndarray,
+                       work_codes: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        给定演员两两之间的共同作品数
+
+        只切出这些演员的行做一次小规模稀疏乘积，不涉及其他演员。
+
+        Args:
+            actor_codes: 演员编码
+            work_codes: 只统计这些作品，None表示全部作品
+
+        Returns:
+            np.ndarray: N x N 矩阵，对角线为0
+        """
+        rows = self._actor_rows(actor_codes, work_codes)
+        matrix = (rows @ rows.T).toarray()
+        np.fill_diagonal(matrix, 0)
+        return matrix
+
+    def actor_year_counts(self, actor_codes: np.ndarray,
+                          work_codes: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        演员 x 年份 的作品数矩阵（无年份的作品不计）
+
+        Args:
+            actor_codes: 演员编码
+            work_codes: 只统计这些作品，None表示全部作品
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: N x 年份数 的矩阵和升序的年份
+        """
+        rows = self._actor_rows(actor_codes, work_codes)
+        years = self.work_year if work_codes is None else self.work_year[np.asarray(work_codes, dtype=np.int64)]
+        dated = np.flatnonzero(~np.isnan(years))
+        year_values, year_of_work = np.unique(years[dated], return_inverse=True)
+        by_year = sp.csr_matrix((np.ones(len(dated), dtype=np.int32), (dated, year_of_work)),
+                                shape=(len(years), len(year_values)))
+        return (rows @ by_year).toarray(), year_values.astype(int)
+
+    def works_of_actor(self, actor_code: int,
+                       include_roles: Optional[Iterable[str]] = None) -> np.ndarray:
+        """返回演员参与的全部作品编码（去重、升序），可只看指定职能的记录"""
+        matrix = self.incidence if include_roles is None else self.role_incidence(include_roles)
+        start, end = matrix.indptr[actor_code], matrix.indptr[actor_code + 1]
+        return matrix.indices[start:end]
+
+    def rows_of_works(self, work_codes: np.ndarray) -> np.ndarray:
+        """返回给定作品的全部关系行下标"""
+        work_codes = np.asarray(work_codes, dtype=np.int64)
+        rows = _expand_ranges(self._work_row_ptr[work_codes], self._work_row_ptr[work_codes + 1])
+        return self._rows_by_work[rows]
+
+    def rows_in_years(self, start_year: Optional[int] = None, end_year: Optional[int] = None,
+                      row_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """返回年份区间内作品的全部关系行下标，可再用行掩码筛选"""
+        rows = self.rows_of_works(self.works_in_years(start_year, end_year))
+        if row_mask is not None:
+            rows = rows[row_mask[rows]]
+        return rows
+
+    def collaborator_counts(self, actor_code: int,
+                            work_codes: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        统计合作者在给定作品中的记录条数
+
+        Args:
+            actor_code: 目标演员编码
+            work_codes: 参与统计的作品编码，None表示该演员的全部作品
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 合作者编码（升序）和对应的记录条数
+        """
+        if work_codes is None:
+            work_codes = self.works_of_actor(actor_code)
+        actors = self.row_actor[self.rows_of_works(work_codes)]
+        return np.unique(actors[actors != actor_code], return_counts=True)
+
+    def top_collaborators(self, actor_code: int, top_n: Optional[int] = 10,
+                          work_codes: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        选出合作次数最多的前N位合作者，不构建图
+
+        Args:
+            actor_code: 目标演员编码
+            top_n: 返回数量，None表示全部
+            work_codes: 参与统计的作品编码，None表示该演员的全部作品
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 按合作次数降序排列的合作者编码和次数
+        """
+        codes, counts = self.collaborator_counts(actor_code, work_codes)
+        if top_n is not None and top_n < len(codes):
+            if top_n <= 0:
+                return codes[:0], counts[:0]
+            selected = np.argpartition(-counts, top_n - 1)[:top_n]
+            codes, counts = codes[selected], counts[selected]
+        order = np.lexsort((codes, -counts))
+        return codes[order], counts[order]
+
+    def ego_edges(self, actor_codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                            np.ndarray, np.ndarray]:
+        """
+        一批演员的个人网络边表，一次向量化计算
+
+        合作者按演员编码区分（不按姓名合并），权重与 build_actor_network_by_id 相同，
+        为合作者在目标演员作品中的记录条数。
+
+        Args:
+            actor_codes: 目标演员编码
+
+        Returns:
+            Tuple: 按 (目标演员位置, 合作者编码) 排序的
+                目标演员在 actor_codes 中的位置、合作者编码、权重、
+                共同作品的偏移数组（长度为边数 + 1）和共同作品编码（升序）
+        """
+        actor_codes = np.asarray(actor_codes, dtype=np.int64)
+        starts, ends = self.incidence.indptr[actor_codes], self.incidence.indptr[actor_codes + 1]
+        works = self.incidence.indices[_expand_ranges(starts, ends)]
+        work_ego = np.repeat(np.arange(len(actor_codes)), ends - starts)
+
+        # 目标演员每部作品的全部关系行，去掉目标演员自己的行
+        row_counts = self._work_row_ptr[works + 1] - self._work_row_ptr[works]
+        rows = self.rows_of_works(works)
+        row_ego = np.repeat(work_ego, row_counts)
+        row_actor = self.row_actor[rows]
+        keep = row_actor != actor_codes[row_ego]
+        row_ego, row_actor, rows = row_ego[keep], row_actor[keep], rows[keep]
+
+        pairs, pair_of_row, weights = np.unique(row_ego * self.n_actors + row_actor,
+                                                return_inverse=True, return_counts=True)
+        pair_works = np.unique(pair_of_row.astype(np.int64) * self.n_works + self.row_work[rows])
+        offsets = np.searchsorted(pair_works // self.n_works, np.arange(len(pairs) + 1))
+        return (pairs // self.n_actors, (pairs % self.n_actors).astype(np.int32), weights,
+                offsets, (pair_works % self.n_works).astype(np.int32))
+
+    def shared_works(self, actor_a: int, actor_b: int) -> np.ndarray:
+        """两位演员共同参与的作品编码"""
+        return np.intersect1d(self.works_of_actor(actor_a), self.works_of_actor(actor_b),
+                              assume_unique=True)
+
+    def collaboration_path(self, source: int, target: int,
+                           max_hops: Optional[int] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        两位演员之间经共同作品相连的最短路径，不构建全局网络
+
+        在演员-作品关联矩阵上从两端交替做整层扩展的双向广度优先搜索，
+        每次扩展当前较小的一侧，每部作品在每一侧只展开一次。
+
+        Args:
+            source: 起点演员编码
+            target: 终点演员编码
+            max_hops: 最多经过的合作次数，None表示不限
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: 路径上的演员编码（含两端）和
+                相邻两人之间的一部共同作品编码；不连通或超过 max_hops 时返回 None
+        """
+        if source == target:
+            return np.array([source], dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        depth = np.full((2, self.n_actors), -1, dtype=np.int64)
+        parent = np.full((2, self.n_actors), -1, dtype=np.int64)
+        via = np.full((2, self.n_actors), -1, dtype=np.int64)
+        expanded = np.zeros((2, self.n_works), dtype=bool)
+        depth[0, source] = depth[1, target] = 0
+        frontiers = [np.array([source], dtype=np.int64), np.array([target], dtype=np.int64)]
+        levels = [0, 0]
+
+        while len(frontiers[0]) and len(frontiers[1]):
+            if max_hops is not None and levels[0] + levels[1] >= max_hops:
+                return None
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            frontier = frontiers[side]
+
+            # 前沿演员的作品（每部作品只展开一次）
+            starts, ends = self.incidence.indptr[frontier], self.incidence.indptr[frontier + 1]
+            works = self.incidence.indices[_expand_ranges(starts, ends)].astype(np.int64)
+            origins = np.repeat(frontier, ends - starts)
+            works, first = np.unique(works, return_index=True)
+            origins = origins[first]
+            fresh = ~expanded[side, works]
+            works, origins = works[fresh], origins[fresh]
+            expanded[side, works] = True
+
+            # 这些作品中尚未到达的演员
+            row_counts = self._work_row_ptr[works + 1] - self._work_row_ptr[works]
+            actors = self.row_actor[self.rows_of_works(works)].astype(np.int64)
+            from_actor = np.repeat(origins, row_counts)
+            from_work = np.repeat(works, row_counts)
+            new = depth[side, actors] < 0
+            actors, first = np.unique(actors[new], return_index=True)
+            levels[side] += 1
+            depth[side, actors] = levels[side]
+            parent[side, actors] = from_actor[new][first]
+            via[side, actors] = from_work[new][first]
+            frontiers[side] = actors
+
+            met = actors[depth[1 - side, actors] >= 0]
+            if len(met):
+                middle = int(met[np.argmin(depth[1 - side, met])])
+                return self._join_path(parent, via, middle)
+        return None
+
+    @staticmethod
+    def _join_path(parent: np.ndarray, via: np.ndarray, middle: int) -> Tuple[np.ndarray, np.ndarray]:
+        """从双向搜索的相遇点沿两侧的父节点拼出完整路径"""
+        head, head_works = [middle], []
+        while parent[0, head[-1]] >= 0:
+            head_works.append(via[0, head[-1]])
+            head.append(parent[0, head[-1]])
+        tail, tail_works = [middle], []
+        while parent[1, tail[-1]] >= 0:
+            tail_works.append(via[1, tail[-1]])
+            tail.append(parent[1, tail[-1]])
+        actors = head[::-1] + tail[1:]
+        works = head_works[::-1] + tail_works
+        return np.asarray(actors, dtype=np.int64), np.asarray(works, dtype=np.int64)
+
+    def year_slice(self, start_year: Optional[int] = None,
+                   end_year: Optional[int] = None) -> Tuple[int, int]:
+        """
+        返回年份区间在按年份排序的作品数组中的位置 [lo, hi)
+
+        Args:
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+
+        Returns:
+            Tuple[int, int]: 切片位置
+        """
+        if start_year is None and end_year is None:
+            return 0, self.n_works
+        lo = 0 if start_year is None else int(np.searchsorted(self._sorted_years, start_year, 'left'))
+        if end_year is None:
+            # 不包含无年份的作品
+            hi = int(np.searchsorted(self._sorted_years, np.inf, 'right'))
+        else:
+            hi = int(np.searchsorted(self._sorted_years, end_year, 'right'))
+        return lo, max(lo, hi)
+
+    def works_in_years(self, start_year: Optional[int] = None,
+                       end_year: Optional[int] = None) -> np.ndarray:
+        """返回年份区间内的作品编码"""
+        lo, hi = self.year_slice(start_year, end_year)
+        return self._works_by_year[lo:hi]
+
+    def filter_works_by_year(self, work_codes: np.ndarray, start_year: Optional[int] = None,
+                             end_year: Optional[int] = None) -> np.ndarray:
+        """从作品编码中保留年份区间内的作品"""
+        if start_year is None and end_year is None:
+            return work_codes
+        lo, hi = self.year_slice(start_year, end_year)
+        ranks = self._year_rank[work_codes]
+        return work_codes[(ranks >= lo) & (ranks < hi)]
+
+    def year_range(self) -> Tuple[Optional[int], Optional[int]]:
+        """返回数据覆盖的最早和最晚年份"""
+        years = self._sorted_years[~np.isnan(self._sorted_years)]
+        if len(years) == 0:
+            return None, None
+        return int(years[0]), int(years[-1])
+
+    def _ensure_genres(self) -> None:
+        """把 '/' 分隔的题材字符串一次性拆分为 作品 x 题材 的二值矩阵"""
+        if self._genre_matrix is not None:
+            return
+        genres = pd.Series(self.work_genres, dtype=object)
+        genres = genres[genres.map(lambda value: isinstance(value, str))]
+        exploded = genres.str.split('/').explode().str.strip()
+        exploded = exploded[exploded.str.len() > 0]
+        genre_codes, genre_names = pd.factorize(exploded, sort=True)
+        matrix = sp.csr_matrix(
+            (np.ones(len(genre_codes), dtype=np.int32), (exploded.index.to_numpy(), genre_codes)),
+            shape=(self.n_works, len(genre_names))
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        self._genre_names = np.asarray(genre_names, dtype=object)
+        self._genre_lookup = pd.Index(genre_names)
+        self._genre_matrix = matrix
+
+    @property
+    def genre_matrix(self) -> sp.csr_matrix:
+        """作品 x 题材 二值矩阵，首次访问时构建"""
+        self._ensure_genres()
+        return self._genre_matrix
+
+    @property
+    def genre_names(self) -> np.ndarray:
+        """所有题材（已排序）"""
+        self._ensure_genres()
+        return self._genre_names
+
+    def genre_code(self, genre: str) -> int:
+        """返回题材名称对应的编码，不存在时返回 -1"""
+        self._ensure_genres()
+        return int(self._genre_lookup.get_indexer([genre])[0])
+
+    def works_of_genres(self, genres: Iterable[str]) -> np.ndarray:
+        """返回属于任一给定题材的作品编码（升序）"""
+        self._ensure_genres()
+        codes = self._genre_lookup.get_indexer(list(genres))
+        codes = codes[codes >= 0]
+        selected = self.genre_matrix[:, codes].tocsr()
+        return np.flatnonzero(np.diff(selected.indptr) > 0)
+
+    def genre_row_mask(self, genres: Iterable[str]) -> np.ndarray:
+        """关系行掩码：该行的作品属于任一给定题材"""
+        work_mask = np.zeros(self.n_works, dtype=bool)
+        work_mask[self.works_of_genres(genres)] = True
+        return work_mask[self.row_work]
+
+    def genre_statistics(self) -> pd.DataFrame:
+        """
+        各题材的作品数（按作品计数，不按演职员记录计数）
+
+        Returns:
+            pd.DataFrame: 包含 题材, 作品数 两列，按作品数降序排列
+        """
+        counts = np.bincount(self.genre_matrix.indices, minlength=len(self.genre_names))
+        order = np.lexsort((np.arange(len(counts)), -counts))
+        return pd.DataFrame({'题材': self.genre_names[order], '作品数': counts[order]})
+
+    def genre_cooccurrence(self, start_year: Optional[int] = None,
+                           end_year: Optional[int] = None) -> sp.csr_matrix:
+        """
+        题材 x 题材 共现矩阵
+
+        Args:
+            start_year: 起始年份（含）
+            end_year: 结束年份（含）
+
+        Returns:
+            sp.csr_matrix: 值为同时属于两个题材的作品数，对角线为该题材的作品数
+        """
+        matrix = self.genre_matrix[self.works_in_years(start_year, end_year)]
+        return (matrix.T @ matrix).tocsr()
+
+    def actor_genre_profiles(self, start_year: Optional[int] = None,
+                             end_year: Optional[int] = None) -> sp.csr_matrix:
+        """
+        演员 x 题材 矩阵
+
+        Args:
+            start_year: 起始年份（含）
+            end_year: 结束年份（含）
+
+        Returns:
+            sp.csr_matrix: 值为演员参与的该题材作品数
+        """
+        lo, hi = self.year_slice(start_year, end_year)
+        works = self._works_by_year[lo:hi]
+        return (self._year_ordered_incidence[:, lo:hi] @ self.genre_matrix[works]).tocsr()
+
+    def _binary_incidence(self, lo: int, hi: int,
+                          row_mask: Optional[np.ndarray] = None) -> sp.csc_matrix:
+        """返回按年份排序后第 [lo, hi) 列的二值关联矩阵"""
+        if row_mask is None:
+            return self._year_ordered_incidence[:, lo:hi]
+        rows = np.flatnonzero(row_mask)
+        ranks = self._year_rank[self.row_work[rows]]
+        keep = (ranks >= lo) & (ranks < hi)
+        matrix = sp.csc_matrix(
+            (np.ones(int(keep.sum()), dtype=np.int32),
+             (self.row_actor[rows[keep]], ranks[keep] - lo)),
+            shape=(self.n_actors, hi - lo)
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix
+
+    def cooccurrence(self, start_year: Optional[int] = None, end_year: Optional[int] = None,
+                     row_mask: Optional[np.ndarray] = None) -> sp.csr_matrix:
+        """
+        计算年份区间内的演员共现矩阵
+
+        Args:
+            start_year: 起始年份（含）
+            end_year: 结束年份（含）
+            row_mask: 关系行掩码，只统计为True的行
+
+        Returns:
+            sp.csr_matrix: 演员 x 演员矩阵，值为共同作品数，对角线为0
+        """
+        lo, hi = self.year_slice(start_year, end_year)
+        binary = self._binary_incidence(lo, hi, row_mask)
+        matrix = (binary @ binary.T).tocsr()
+        matrix = matrix - sp.diags(matrix.diagonal(), format='csr', dtype=matrix.dtype)
+        matrix.eliminate_zeros()
+        return matrix
+
+    def role_projection(self, source_roles: Iterable[str], target_roles: Iterable[str],
+                        work_codes: Optional[np.ndarray] = None,
+                        seed: Optional[int] = None) -> sp.csr_matrix:
+        """
+        职能对投影：以 source_roles 署名的人指向在同一作品中以 target_roles 署名的人
+
+        Args:
+            source_roles: 起点职能列表，如 ['导演']
+            target_roles: 终点职能列表，如 ['演员']
+            work_codes: 参与统计的作品编码，None表示全部作品
+            seed: 只计算与该演员编码相关的边（出边和入边），None表示全部
+
+        Returns:
+            sp.csr_matrix: 演员 x 演员有向矩阵，[i, j] 为 i 以起点职能、j 以终点职能共同署名的作品数，
+                对角线为0
+        """
+        source = self.role_incidence(source_roles).sign()
+        target = self.role_incidence(target_roles).sign()
+        if work_codes is not None:
+            columns = np.zeros(self.n_works, dtype=source.dtype)
+            columns[work_codes] = 1
+            source = (source @ sp.diags(columns, dtype=columns.dtype)).tocsr()
+            source.eliminate_zeros()
+
+        if seed is None:
+            matrix = (source @ target.T).tocsr()
+        else:
+            # 只需要种子所在的一行和一列
+            selector = sp.csr_matrix(([1], ([seed], [seed])), shape=(self.n_actors, self.n_actors))
+            matrix = (selector @ source @ target.T + source @ (selector @ target).T).tocsr()
+        matrix = matrix - sp.diags(matrix.diagonal(), format='csr', dtype=matrix.dtype)
+        matrix.eliminate_zeros()
+        return matrix
+
+    def to_compact_graph(self, adjacency: sp.csr_matrix) -> CompactGraph:
+        """用索引中的演员信息包装邻接矩阵"""
+        return CompactGraph(adjacency, self.actor_ids, self.actor_names)
+
+    def iter_year_windows(self, window_size: int, step: int = 1,
+                          start_year: Optional[int] = None, end_year: Optional[int] = None,
+                          row_mask: Optional[np.ndarray] = None
+                          ) -> Iterator[Tuple[int, int, sp.csr_matrix]]:
+        """
+        滑动时间窗口迭代共现矩阵
+
+        窗口前进时只加上新进入年份、减去离开年份的共现矩阵，
+        每个年份的矩阵只计算一次。
+
+        Args:
+            window_size: 窗口长度（年）
+            step: 每次前进的年数
+            start_year: 第一个窗口的起始年份，None表示数据中最早年份
+            end_year: 最后一个窗口允许的结束年份，None表示数据中最晚年份
+            row_mask: 关系行掩码
+
+        Yields:
+            Tuple[int, int, sp.csr_matrix]: 窗口起始年份、结束年份（含）和共现矩阵
+        """
+        if window_size < 1 or step < 1:
+            raise ValueError("window_size 和 step 必须为正整数")
+
+        first, last = self.year_range()
+        if first is None:
+            return
+        start_year = first if start_year is None else int(start_year)
+        end_year = last if end_year is None else int(end_year)
+
+        yearly: Dict[int, sp.csr_matrix] = {}
+
+        def year_matrix(year):
+            if year not in yearly:
+                yearly[year] = self.cooccurrence(year, year, row_mask)
+            return yearly[year]
+
+        current = sp.csr_matrix((self.n_actors, self.n_actors), dtype=np.int64)
+        covered = set()
+        window_start = start_year
+        while window_start + window_size - 1 <= end_year:
+            window_years = set(range(window_start, window_start + window_size))
+            for year in sorted(covered - window_years):
+                current = current - yearly.pop(year)
+            for year in sorted(window_years - covered):
+                current = current + year_matrix(year)
+            current.eliminate_zeros()
+            covered = window_years
+            yield window_start, window_start + window_size - 1, current
+            window_start += step
+
+
+_INDEX_CACHE: Dict[int, Tuple[weakref.ref, CastIndex]] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_index(cast_works_df: pd.DataFrame) -> CastIndex:
+    """
+    获取演员作品关系数据对应的索引，同一个DataFrame对象只构建一次
+    索引构建后不应再原地修改该DataFrame，否则需要传入新的DataFrame对象
+
+    Args:
+        cast_works_df: 演员作品关系数据
+
+    Returns:
+        CastIndex: 索引
+    """
+    key = id(cast_works_df)
+    entry = _INDEX_CACHE.get(key)
+    if entry is not None and entry[0]() is cast_works_df:
+        return entry[1]
+
+    # 只在未命中时加锁，避免多个线程重复构建同一索引
+    with _INDEX_LOCK:
+        entry = _INDEX_CACHE.get(key)
+        if entry is not None and entry[0]() is cast_works_df:
+            return entry[1]
+        for stale_key in [k for k, (ref, _) in list(_INDEX_CACHE.items()) if ref() is None]:
+            _INDEX_CACHE.pop(stale_key, None)
+
+        index = CastIndex(cast_works_df)
+        _INDEX_CACHE[key] = (weakref.ref(cast_works_df), index)
+    return index
+
+
+def register_index(cast_works_df: pd.DataFrame, index: CastIndex) -> CastIndex:
+    """
+    把已构建的索引（如从快照目录加载的索引）登记为该DataFrame的索引，之后 get_index() 直接返回它
+
+    Args:
+        cast_works_df: 演员作品关系数据
+        index: 由该数据构建的索引
+
+    Returns:
+        CastIndex: 索引本身
+    """
+    with _INDEX_LOCK:
+        _INDEX_CACHE[id(cast_works_df)] = (weakref.ref(cast_works_df), index)
+    return index
@@ -0,0 +1,129 @@
+"""
+紧凑图模块
+Compact Graph Module
+
+以CSR邻接矩阵保存的无向带权图，适合全行业规模的网络。
+"""
+
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+from typing import Optional
+
+
+class CompactGraph:
+    """基于CSR邻接矩阵的无向带权图
+
+    节点是连续整数，``node_ids`` 和 ``node_names`` 保存对应的演员ID和姓名。
+    邻接矩阵必须对称且对角线为0。
+    """
+
+    def __init__(self, adjacency: sp.spmatrix, node_ids: np.ndarray,
+                 node_names: Optional[np.ndarray] = None):
+        """
+        Args:
+            adjacency: 对称邻接矩阵，值为边权重
+            node_ids: 每个节点对应的演员ID
+            node_names: 每个节点对应的演员姓名
+        """
+        self.adjacency = sp.csr_matrix(adjacency)
+        self.adjacency.sort_indices()
+        self.node_ids = np.asarray(node_ids)
+        self.node_names = np.asarray(node_names if node_names is not None else node_ids, dtype=object)
+
+        if self.adjacency.shape[0] != len(self.node_ids):
+            raise ValueError("邻接矩阵大小与节点数不一致")
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph, weight: Optional[str] = 'weight') -> 'CompactGraph':
+        """
+        从networkx图构建，节点按 G.nodes() 的顺序编号，自环被忽略
+
+        Args:
+            G: 网络图
+            weight: 作为边权重的属性名，None表示所有边权重为1
+
+        Returns:
+            CompactGraph: 紧凑图
+        """
+        nodes = list(G.nodes())
+        adjacency = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=weight, format='csr')
+        adjacency = sp.csr_matrix(adjacency)
+        adjacency.setdiag(0)
+        adjacency.eliminate_zeros()
+        node_ids = np.empty(len(nodes), dtype=object)
+        node_ids[:] = nodes
+        names = [G.nodes[node].get('cast_name', node) for node in nodes]
+        return cls(adjacency, node_ids, np.array(names, dtype=object))
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self.adjacency.indptr
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self.adjacency.indices
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self.adjacency.data
+
+    def number_of_nodes(self) -> int:
+        """节点数（包含孤立节点）"""
+        return self.adjacency.shape[0]
+
+    def number_of_edges(self) -> int:
+        """无向边数"""
+        return self.adjacency.nnz // 2
+
+    def degree(self) -> np.ndarray:
+        """每个节点的度"""
+        return np.diff(self.adjacency.indptr)
+
+    def weighted_degree(self) -> np.ndarray:
+        """每个节点的加权度"""
+        return np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+    def neighbors(self, node: int) -> np.ndarray:
+        """节点的邻居（升序）"""
+        return self.adjacency.indices[self.adjacency.indptr[node]:self.adjacency.indptr[node + 1]]
+
+    def active_nodes(self) -> np.ndarray:
+        """度大于0的节点"""
+        return np.flatnonzero(self.degree() > 0)
+
+    def edge_arrays(self):
+        """
+        返回上三角的边数组
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: 起点、终点、权重（每条无向边一次）
+        """
+        upper = sp.triu(self.adjacency, k=1).tocoo()
+        return upper.row, upper.col, upper.data
+
+    def subgraph(self, nodes: np.ndarray) -> 'CompactGraph':
+        """返回由给定节点诱导的子图，节点按给定顺序重新编号"""
+        nodes = np.asarray(nodes)
+        return CompactGraph(self.adjacency[nodes][:, nodes],
+                            self.node_ids[nodes], self.node_names[nodes])
+
+    def to_networkx(self, include_isolates: bool = False) -> nx.Graph:
+        """
+        转换为networkx图，节点以演员ID为键
+
+        Args:
+            include_isolates: 是否保留孤立节点
+
+        Returns:
+            nx.Graph: 网络图
+        """
+        G = nx.Graph()
+        nodes = np.arange(self.number_of_nodes()) if include_isolates else self.active_nodes()
+        ids = self.node_ids.tolist()
+        G.add_nodes_from((ids[i], {'cast_name': self.node_names[i]}) for i in nodes.tolist())
+        rows, cols, data = self.edge_arrays()
+        G.add_weighted_edges_from(
+            zip(self.node_ids[rows].tolist(), self.node_ids[cols].tolist(), data.tolist())
+        )
+        return G
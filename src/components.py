@@ -0,0 +1,286 @@
+"""
+连通分量模块
+Connected Components Module
+
+用并查集维护连通分量：批量构建时向量化合并，新增合作记录时逐条增量合并，
+查询分量编号和大小的均摊代价为 O(α(n))。
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Hashable, Iterable, List, Optional
+
+from .cast_index import get_index
+
+
+class UnionFind:
+    """带权重的并查集（按大小合并 + 路径减半）
+
+    每个节点有一个权重，根节点记录所在分量的权重之和，
+    可用来只统计分量中的某一类节点（例如只数演员，不数作品）。
+    """
+
+    def __init__(self, n: int = 0, weights: Optional[np.ndarray] = None):
+        """
+        Args:
+            n: 初始节点数
+            weights: 每个节点的权重，None表示全部为1
+        """
+        self.parent = np.arange(n, dtype=np.int64)
+        self.size = np.ones(n, dtype=np.int64)
+        self.weight = np.ones(n, dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64).copy()
+        self._component_weight = self.weight.copy()
+        self.n = n
+        self.n_components = n
+
+    def add_nodes(self, count: int, weight: int = 1) -> np.ndarray:
+        """追加节点，返回新节点编号"""
+        new = np.arange(self.n, self.n + count)
+        if self.n + count > len(self.parent):
+            capacity = max(self.n + count, 2 * len(self.parent))
+            for name in ('parent', 'size', 'weight', '_component_weight'):
+                grown = np.zeros(capacity, dtype=np.int64)
+                grown[:self.n] = getattr(self, name)[:self.n]
+                setattr(self, name, grown)
+        self.parent[new] = new
+        self.size[new] = 1
+        self.weight[new] = weight
+        self._component_weight[new] = weight
+        self.n += count
+        self.n_components += count
+        return new
+
+    def find(self, x: int) -> int:
+        """返回x所在分量的根节点"""
+        parent = self.parent
+        while parent[x] != x:
+            grandparent = parent[parent[x]]
+            # 已压缩的路径不再写入，冻结的只读数组也可查询
+            if grandparent != parent[x]:
+                parent[x] = grandparent
+            x = grandparent
+        return int(x)
+
+    def union(self, a: int, b: int) -> int:
+        """合并a和b所在的分量，返回新的根节点"""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        self._component_weight[ra] += self._component_weight[rb]
+        self.n_components -= 1
+        return ra
+
+    def union_arrays(self, a: np.ndarray, b: np.ndarray) -> None:
+        """
+        批量合并节点对
+
+        反复把较大的根挂到较小的根下并做指针跳跃，直到所有节点对都在同一分量，
+        迭代次数通常只有几轮。完成后重新统计分量大小和权重。
+        """
+        parent = self.roots()
+        a, b = np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64)
+        while True:
+            ra, rb = parent[a], parent[b]
+            pending = ra != rb
+            if not pending.any():
+                break
+            a, b, ra, rb = a[pending], b[pending], ra[pending], rb[pending]
+            np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+            while True:
+                jumped = parent[parent]
+                if np.array_equal(jumped, parent):
+                    break
+                parent = jumped
+        self.parent[:self.n] = parent
+        self._recount()
+
+    def roots(self) -> np.ndarray:
+        """返回所有节点的根节点（同时压缩路径）"""
+        parent = self.parent[:self.n].copy()
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+        if self.parent.flags.writeable:
+            self.parent[:self.n] = parent
+        return parent
+
+    def copy(self) -> 'UnionFind':
+        """可独立修改的副本"""
+        other = UnionFind.__new__(UnionFind)
+        for name in ('parent', 'size', 'weight', '_component_weight'):
+            setattr(other, name, getattr(self, name).copy())
+        other.n = self.n
+        other.n_components = self.n_components
+        return other
+
+    def freeze(self) -> 'UnionFind':
+        """压缩全部路径后把数组设为只读，之后的查询不再写入，可被多个线程同时查询"""
+        self.roots()
+        for name in ('parent', 'size', 'weight', '_component_weight'):
+            getattr(self, name).flags.writeable = False
+        return self
+
+    def _recount(self) -> None:
+        roots = self.parent[:self.n]
+        self.size[:self.n] = np.bincount(roots, minlength=self.n)
+        self._component_weight[:self.n] = np.bincount(roots, weights=self.weight[:self.n],
+                                                      minlength=self.n).astype(np.int64)
+        self.n_components = int(np.count_nonzero(roots == np.arange(self.n)))
+
+    def component_weight(self, x: int) -> int:
+        """x所在分量的权重之和"""
+        return int(self._component_weight[self.find(x)])
+
+    def connected(self, a: int, b: int) -> bool:
+        return self.find(a) == self.find(b)
+
+    @classmethod
+    def from_edges(cls, n: int, u: np.ndarray, v: np.ndarray) -> 'UnionFind':
+        """由边数组批量构建"""
+        uf = cls(n)
+        uf.union_arrays(u, v)
+        return uf
+
+
+class ComponentIndex:
+    """演员-作品二部图上的连通分量索引
+
+    演员和作品都是并查集中的节点，每条演职员记录合并一对（演员，作品）。
+    两位演员连通当且仅当他们在合作网络中连通。分量大小只统计演员。
+    """
+
+    def __init__(self):
+        self._uf = UnionFind()
+        self._actor_nodes: Dict[Hashable, int] = {}
+        self._work_nodes: Dict[Hashable, int] = {}
+        self._node_actor_ids: List = []
+
+    @classmethod
+    def from_data(cls, cast_works_df: pd.DataFrame) -> 'ComponentIndex':
+        """
+        由演员作品关系数据一次性构建
+
+        Args:
+            cast_works_df: 演员作品关系数据
+
+        Returns:
+            ComponentIndex: 连通分量索引
+        """
+        index = get_index(cast_works_df)
+        components = cls()
+        components._uf = UnionFind(index.n_actors + index.n_works, weights=np.concatenate(
+            (np.ones(index.n_actors, dtype=np.int64), np.zeros(index.n_works, dtype=np.int64))
+        ))
+        actor_ids = index.actor_ids.tolist()
+        components._actor_nodes = dict(zip(actor_ids, range(index.n_actors)))
+        components._work_nodes = dict(zip(index.work_ids.tolist(),
+                                          range(index.n_actors, index.n_actors + index.n_works)))
+        components._node_actor_ids = actor_ids + [None] * index.n_works
+        components._uf.union_arrays(index.row_actor, index.row_work.astype(np.int64) + index.n_actors)
+        return components
+
+    def _node(self, mapping: Dict, key, is_actor: bool) -> int:
+        node = mapping.get(key)
+        if node is None:
+            node = int(self._uf.add_nodes(1, weight=1 if is_actor else 0)[0])
+            mapping[key] = node
+            self._node_actor_ids.append(key if is_actor else None)
+        return node
+
+    def add_credits(self, cast_ids: Iterable, work_ids: Iterable, bulk_threshold: int = 100000) -> None:
+        """
+        增量加入新的演职员记录
+
+        Args:
+            cast_ids: 演员ID序列
+            work_ids: 与cast_ids一一对应的作品ID序列
+            bulk_threshold: 记录数超过该值时改用批量合并
+        """
+        if not self._uf.parent.flags.writeable:
+            raise ValueError("连通分量索引已冻结，请先调用 copy() 获得可更新的副本")
+        # 先检查全部输入（长度、ID可哈希），通过后才修改索引，出错时索引保持不变
+        cast_ids, work_ids = list(cast_ids), list(work_ids)
+        if len(cast_ids) != len(work_ids):
+            raise ValueError("cast_ids 与 work_ids 的长度不一致")
+        for key in cast_ids + work_ids:
+            hash(key)
+
+        actor_nodes = [self._node(self._actor_nodes, cid, True) for cid in cast_ids]
+        work_nodes = [self._node(self._work_nodes, wid, False) for wid in work_ids]
+
+        if len(actor_nodes) > bulk_threshold:
+            self._uf.union_arrays(np.array(actor_nodes), np.array(work_nodes))
+        else:
+            for actor_node, work_node in zip(actor_nodes, work_nodes):
+                self._uf.union(actor_node, work_node)
+
+    def copy(self) -> 'ComponentIndex':
+        """可独立增量更新的副本（冻结的索引也可复制）"""
+        other = ComponentIndex()
+        other._uf = self._uf.copy()
+        other._actor_nodes = dict(self._actor_nodes)
+        other._work_nodes = dict(self._work_nodes)
+        other._node_actor_ids = list(self._node_actor_ids)
+        return other
+
+    def freeze(self) -> 'ComponentIndex':
+        """
+        把索引设为只读，之后可被多个线程同时查询；add_credits() 会抛出 ValueError，需先 copy()
+
+        Returns:
+            ComponentIndex: 索引本身
+        """
+        self._uf.freeze()
+        return self
+
+    def _actor_node(self, cast_id) -> int:
+        node = self._actor_nodes.get(cast_id)
+        if node is None:
+            raise ValueError(f"未找到演员ID: {cast_id}")
+        return node
+
+    def component_id(self, cast_id) -> int:
+        """演员所在分量的编号（分量合并后编号可能变化）"""
+        return self._uf.find(self._actor_node(cast_id))
+
+    def component_size(self, cast_id) -> int:
+        """演员所在分量中的演员数"""
+        return self._uf.component_weight(self._actor_node(cast_id))
+
+    def connected(self, cast_id_a, cast_id_b) -> bool:
+        """两位演员是否通过合作关系连通"""
+        return self._uf.connected(self._actor_node(cast_id_a), self._actor_node(cast_id_b))
+
+    @property
+    def n_components(self) -> int:
+        """包含至少一位演员的分量数"""
+        roots = self._uf.roots()
+        return int(np.count_nonzero(np.bincount(roots, weights=self._uf.weight[:self._uf.n]) > 0))
+
+    def largest_component(self) -> List:
+        """最大分量中的全部演员ID"""
+        roots = self._uf.roots()
+        weights = np.bincount(roots, weights=self._uf.weight[:self._uf.n])
+        members = np.flatnonzero((roots == np.argmax(weights)) & (self._uf.weight[:self._uf.n] > 0))
+        return [self._node_actor_ids[node] for node in members.tolist()]
+
+
+def graph_components(G) -> np.ndarray:
+    """
+    用并查集给networkx图的节点标注分量
+
+    Args:
+        G: 网络图
+
+    Returns:
+        np.ndarray: 按 G.nodes() 顺序排列的分量根节点编号
+    """
+    position = {node: i for i, node in enumerate(G.nodes())}
+    edges = np.array([(position[u], position[v]) for u, v in G.edges()], dtype=np.int64).reshape(-1, 2)
+    return UnionFind.from_edges(len(position), edges[:, 0], edges[:, 1]).roots()
@@ -3,9 +3,12 @@
 Data Loading Module
 """
 
+import numpy as np
 import pandas as pd
 import os
-from typing import Tuple, List
+from typing import Tuple, List, Optional
+
+from .cast_index import get_index
 
 class DataLoader:
     """数据加载器"""
@@ -215,30 +218,29 @@ class DataLoader:
         Returns:
             pd.DataFrame: 合作数据
         """
-        # 2. 使用cast_id从cast_works_data表筛选出该cast的所有作品
-        actor_works = self.get_actor_works(cast_id)
+        index = get_index(self.cast_works_df)
+        
+        # 2. 通过索引取出该cast的所有作品
+        actor_code = index.actor_code(cast_id)
+        all_work_ids = index.works_of_actor(actor_code) if actor_code >= 0 else []
         
-        if actor_works.empty:
+        if len(all_work_ids) == 0:
             print(f"演员 {cast_name} (ID: {cast_id}) 没有作品记录")
             return pd.DataFrame()
         
-        # 3. 获取这些作品的所有cast数据
-        all_work_ids = actor_works['work_id'].unique()
-        
-        # 获取这些作品中的所有演员数据
-        collaboration_data = self.cast_works_df[
-            self.cast_works_df['work_id'].isin(all_work_ids)
-        ].copy()
+        # 3. 获取这些作品中的所有演员数据
+        rows = index.rows_of_works(all_work_ids)
         
         # 4. 根据职能筛选数据
         if include_roles is not None:
-            before_filter = len(collaboration_data)
-            collaboration_data = collaboration_data[
-                collaboration_data['cast_role'].isin(include_roles)
-            ]
-            after_filter = len(collaboration_data)
+            before_filter = len(rows)
+            rows = rows[index.role_mask(include_roles, rows)]
+            after_filter = len(rows)
             print(f"职能筛选: {before_filter} -> {after_filter} 条记录 (保留职能: {', '.join(include_roles)})")
         
+        # 保持原表中的行顺序
+        collaboration_data = self.cast_works_df.iloc[np.sort(rows)].copy()
+        
         print(f"演员 {cast_name} (ID: {cast_id}) 共参演 {len(all_work_ids)} 部作品，涉及 {len(collaboration_data)} 条演员记录")
         
         return collaboration_data
@@ -274,9 +276,8 @@ class DataLoader:
         if self.cast_works_df is None:
             raise ValueError("请先加载数据")
         
-        roles = self.cast_works_df['cast_role'].unique().tolist()
-        roles = [role for role in roles if pd.notna(role)]  # 过滤空值
-        return sorted(roles)
+        # 职能列表在构建索引时已经去重排序（不含空值）
+        return get_index(self.cast_works_df).available_roles
     
     def get_role_statistics(self) -> pd.DataFrame:
         """
@@ -288,21 +289,12 @@ class DataLoader:
         if self.cast_works_df is None:
             raise ValueError("请先加载数据")
         
-        role_stats = self.cast_works_df.groupby('cast_role').agg({
-            'cast_id': 'nunique',  # 不重复人数
-            'work_id': 'nunique',  # 参与作品数
-            'cast_name': 'count'   # 总记录数
-        }).rename(columns={
-            'cast_id': '人数',
-            'work_id': '作品数',
-            'cast_name': '记录数'
-        }).sort_values('记录数', ascending=False)
-        
-        return role_stats
+        # 人数、作品数、记录数在构建索引时预先计算
+        return get_index(self.cast_works_df).role_statistics.copy()
     
     def get_genres_statistics(self) -> pd.DataFrame:
         """
-        获取作品题材统计信息
+        获取作品题材统计信息（每部作品只计一次）
         
         Returns:
             pd.DataFrame: 题材统计结果
@@ -310,21 +302,51 @@ class DataLoader:
         if self.cast_works_df is None:
             raise ValueError("请先加载数据")
         
-        # 处理多个题材的情况（用/分隔）
-        all_genres = []
-        for genres_str in self.cast_works_df['work_genres'].dropna():
-            if isinstance(genres_str, str):
-                genres = [g.strip() for g in genres_str.split('/')]
-                all_genres.extend(genres)
+        # 题材字符串在索引中一次性拆分为 作品 x 题材 矩阵，按列计数即可
+        return get_index(self.cast_works_df).genre_statistics()
+    
+    def get_genre_cooccurrence(self, start_year: Optional[int] = None,
+                               end_year: Optional[int] = None) -> pd.DataFrame:
+        """
+        获取题材共现矩阵
+        
+        Args:
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+            
+        Returns:
+            pd.DataFrame: 题材 x 题材，值为同时属于两个题材的作品数，对角线为该题材的作品数
+        """
+        if self.cast_works_df is None:
+            raise ValueError("请先加载数据")
+        
+        index = get_index(self.cast_works_df)
+        return pd.DataFrame(index.genre_cooccurrence(start_year, end_year).toarray(),
+                            index=index.genre_names, columns=index.genre_names)
+    
+    def get_actor_genre_profile(self, cast_id, normalize: bool = False) -> pd.Series:
+        """
+        获取演员的题材分布
         
-        # 统计题材出现频次
-        from collections import Counter
-        genre_counts = Counter(all_genres)
+        Args:
+            cast_id: 演员ID
+            normalize: 是否换算为占比
+            
+        Returns:
+            pd.Series: 题材 -> 作品数（或占比），按降序排列，不含数量为0的题材
+        """
+        if self.cast_works_df is None:
+            raise ValueError("请先加载数据")
         
-        # 转换为DataFrame
-        genre_stats = pd.DataFrame([
-            {'题材': genre, '作品数': count} 
-            for genre, count in genre_counts.most_common()
-        ])
+        index = get_index(self.cast_works_df)
+        actor_code = index.actor_code(cast_id)
+        if actor_code < 0:
+            raise ValueError(f"未找到演员ID: {cast_id}")
         
-        return genre_stats
+        counts = np.asarray(index.genre_matrix[index.works_of_actor(actor_code)].sum(axis=0)).ravel()
+        present = np.flatnonzero(counts)
+        profile = pd.Series(counts[present], index=index.genre_names[present], name=cast_id)
+        profile = profile.sort_values(ascending=False, kind='stable')
+        if normalize and profile.sum() > 0:
+            profile = profile / profile.sum()
+        return profile
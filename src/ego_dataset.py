@@ -0,0 +1,269 @@
+"""
+个人网络数据集导出模块
+Ego Network Dataset Export
+
+把每位演员的合作网络边表批量写成固定数量的分片文件，供下游直接读取。
+
+- 边表由 CastIndex.ego_edges 按批向量化计算，不逐个构建 nx 图
+- 演员按 crc32(str(cast_id)) % n_shards 分配到分片，同一演员的全部边在同一分片中
+- 分片由多个进程并行写出，先写临时文件再原子改名
+- 输出目录中的 manifest.json 记录参数、数据规模、数据内容指纹和已完成的分片；中断后重新运行会跳过
+  已完成的分片，数据内容有变化（即使行数相同）时拒绝续写
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet 为可选格式
+    pa = pq = None
+
+from .cast_index import CastIndex, get_index
+
+MANIFEST_FILE = 'manifest.json'
+DATASET_FORMATS = ('jsonl', 'parquet')
+COLUMNS = ['ego_id', 'ego_name', 'collaborator_id', 'collaborator_name', 'weight', 'work_ids']
+
+# 导出工作进程的状态（索引、参数），只由 _init_dataset_worker 在工作进程中设置
+_DATASET_STATE: Dict = {}
+
+
+def shard_of(cast_ids, n_shards: int) -> np.ndarray:
+    """
+    演员所在的分片号，与进程和运行无关
+
+    Args:
+        cast_ids: 演员ID列表
+        n_shards: 分片数
+
+    Returns:
+        np.ndarray: 每个演员的分片号
+    """
+    return np.fromiter((zlib.crc32(str(cast_id).encode('utf-8')) % n_shards for cast_id in cast_ids),
+                       dtype=np.int64)
+
+
+def shard_file(shard: int, format: str) -> str:
+    """分片文件名"""
+    return f"part-{shard:05d}.jsonl.gz" if format == 'jsonl' else f"part-{shard:05d}.parquet"
+
+
+def iter_ego_tables(index: CastIndex, actor_codes: np.ndarray,
+                    batch_size: int = 2048) -> Iterator[pd.DataFrame]:
+    """
+    按批产出个人网络边表
+
+    Args:
+        index: 演员作品索引
+        actor_codes: 目标演员编码
+        batch_size: 每批的目标演员数
+
+    Returns:
+        Iterator[pd.DataFrame]: 列为 ego_id、ego_name、collaborator_id、collaborator_name、
+        weight（合作记录数）、work_ids（共同作品ID列表），每批一个
+    """
+    for start in range(0, len(actor_codes), batch_size):
+        egos = np.asarray(actor_codes[start:start + batch_size], dtype=np.int64)
+        ego_pos, collaborators, weights, offsets, works = index.ego_edges(egos)
+        ego_codes = egos[ego_pos]
+        work_ids = index.work_ids[works].tolist()
+        bounds = offsets.tolist()
+        yield pd.DataFrame({
+            'ego_id': index.actor_ids[ego_codes],
+            'ego_name': index.actor_names[ego_codes],
+            'collaborator_id': index.actor_ids[collaborators],
+            'collaborator_name': index.actor_names[collaborators],
+            'weight': weights,
+            'work_ids': [work_ids[a:b] for a, b in zip(bounds[:-1], bounds[1:])],
+        }, columns=COLUMNS)
+
+
+def source_fingerprint(index: CastIndex) -> str:
+    """
+    数据内容指纹：关系行（演员、作品、职能）、作品年份以及演员和作品的ID、姓名
+
+    Args:
+        index: 演员作品索引
+
+    Returns:
+        str: 十六进制摘要，任何一项内容变化时都会改变
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for values in (index.row_actor, index.row_work, index.row_role_code, index.work_year):
+        digest.update(np.ascontiguousarray(values).tobytes())
+    for values in (index.actor_ids, index.actor_names, index.work_ids):
+        digest.update('\x1f'.join(map(str, values.tolist())).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def _dataset_state(index: CastIndex, options: Dict) -> Dict:
+    """一次导出的状态：索引、参数和每位演员的分片号"""
+    return {'index': index, 'options': options,
+            'shards': shard_of(index.actor_ids.tolist(), options['n_shards'])}
+
+
+def _init_dataset_worker(cast_works_df: pd.DataFrame, options: Dict) -> None:
+    """导出工作进程的初始化：每个进程只接收一次数据并构建一次索引"""
+    _DATASET_STATE.update(_dataset_state(get_index(cast_works_df), options))
+
+
+def _write_shard(shard: int) -> Dict:
+    """工作进程中写出一个分片"""
+    return _write_shard_with(_DATASET_STATE, shard)
+
+
+def _write_shard_with(state: Dict, shard: int) -> Dict:
+    """写出一个分片，返回写入 manifest 的记录"""
+    options, index = state['options'], state['index']
+    start = time.perf_counter()
+    egos = np.flatnonzero(state['shards'] == shard)
+    filename = shard_file(shard, options['format'])
+    path = os.path.join(options['output_dir'], filename)
+    tmp = path + '.tmp'
+    edges = 0
+    tables = iter_ego_tables(index, egos, options['batch_size'])
+
+    if options['format'] == 'jsonl':
+        with gzip.open(tmp, 'wt', compresslevel=6, encoding='utf-8', newline='\n') as handle:
+            for table in tables:
+                if len(table):
+                    handle.write(table.to_json(orient='records', lines=True, force_ascii=False))
+                    handle.write('\n')
+                    edges += len(table)
+    else:
+        writer = None
+        try:
+            for table in tables:
+                if len(table) == 0:
+                    continue
+                batch = pa.Table.from_pandas(table, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, batch.schema)
+                writer.write_table(batch.cast(writer.schema))
+                edges += len(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            pd.DataFrame(columns=COLUMNS).to_parquet(tmp, index=False)
+
+    os.replace(tmp, path)
+    return {'shard': shard, 'file': filename, 'egos': len(egos), 'edges': edges,
+            'bytes': os.path.getsize(path), 'seconds': round(time.perf_counter() - start, 3)}
+
+
+def _write_manifest(output_dir: str, manifest: Dict) -> None:
+    """原子地写出 manifest"""
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _completed_shards(manifest: Dict, output_dir: str) -> Dict[int, Dict]:
+    """manifest 中记录为完成、且文件大小一致的分片"""
+    completed = {}
+    for record in manifest.get('shards', {}).values():
+        path = os.path.join(output_dir, record['file'])
+        if os.path.exists(path) and os.path.getsize(path) == record['bytes']:
+            completed[record['shard']] = record
+    return completed
+
+
+def export_ego_dataset(cast_works_df: pd.DataFrame, output_dir: str, n_shards: int = 64,
+                       format: str = 'jsonl', processes: Optional[int] = None,
+                       batch_size: int = 2048, resume: bool = True) -> Dict:
+    """
+    把所有演员的个人网络边表导出为分片数据集
+
+    每个分片包含分到该分片的演员的全部边（每位合作者一行），列见 iter_ego_tables。
+    合作者按 cast_id 区分，不按姓名合并。
+
+    Args:
+        cast_works_df: 演员作品关系数据
+        output_dir: 输出目录
+        n_shards: 分片数
+        format: 'jsonl'（gzip 压缩的按行 JSON）或 'parquet'（需要 pyarrow）
+        processes: 进程数，None表示CPU核数，1表示在当前进程中顺序执行
+        batch_size: 每批计算的目标演员数，决定单个进程的峰值内存
+        resume: 为True时跳过 manifest 中已完成的分片（参数或数据内容不同时抛出 ValueError）；
+            为False时全部重写
+
+    Returns:
+        Dict: manifest 内容
+    """
+    if format not in DATASET_FORMATS:
+        raise ValueError(f"不支持的格式: {format}，可选: {list(DATASET_FORMATS)}")
+    if format == 'parquet' and pq is None:
+        raise ImportError("导出 Parquet 需要安装 pyarrow")
+    if n_shards < 1:
+        raise ValueError("n_shards 必须为正整数")
+
+    index = get_index(cast_works_df)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {
+        'format': format,
+        'n_shards': n_shards,
+        'partition': 'crc32(str(cast_id)) % n_shards',
+        'columns': COLUMNS,
+        'source': {'rows': index.n_rows, 'actors': index.n_actors, 'works': index.n_works,
+                   'fingerprint': source_fingerprint(index)},
+        'shards': {},
+        'complete': False,
+    }
+
+    completed = {}
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    if resume and os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        for key in ('format', 'n_shards', 'source'):
+            if previous.get(key) != manifest[key]:
+                detail = '数据内容' if key == 'source' else key
+                raise ValueError(f"输出目录中已有不同参数的数据集（{detail} 不一致），请更换目录或设置 resume=False")
+        completed = _completed_shards(previous, output_dir)
+    manifest['shards'] = {str(shard): record for shard, record in sorted(completed.items())}
+    _write_manifest(output_dir, manifest)
+
+    pending = [shard for shard in range(n_shards) if shard not in completed]
+    if completed:
+        print(f"跳过已完成的 {len(completed)} 个分片")
+    options = {'output_dir': output_dir, 'format': format, 'n_shards': n_shards, 'batch_size': batch_size}
+
+    def finish(record):
+        manifest['shards'][str(record['shard'])] = record
+        _write_manifest(output_dir, manifest)
+
+    start = time.perf_counter()
+    if processes == 1:
+        # 在当前进程中执行时使用局部状态，不修改模块全局状态，可被多个线程同时调用
+        state = _dataset_state(index, options)
+        for shard in pending:
+            finish(_write_shard_with(state, shard))
+    elif pending:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_dataset_worker,
+                                 initargs=(cast_works_df, options)) as executor:
+            futures = [executor.submit(_write_shard, shard) for shard in pending]
+            for future in as_completed(futures):
+                finish(future.result())
+
+    manifest['shards'] = dict(sorted(manifest['shards'].items(), key=lambda item: int(item[0])))
+    manifest['complete'] = len(manifest['shards']) == n_shards
+    manifest['egos'] = sum(record['egos'] for record in manifest['shards'].values())
+    manifest['edges'] = sum(record['edges'] for record in manifest['shards'].values())
+    _write_manifest(output_dir, manifest)
+    print(f"数据集导出完成: {n_shards} 个分片，{manifest['edges']} 条边，"
+          f"耗时 {time.perf_counter() - start:.1f} 秒")
+    return manifest
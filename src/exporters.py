@@ -0,0 +1,453 @@
+"""
+流式导出模块
+Streaming Graph Exporters
+
+把网络逐个节点、逐条边写入文件句柄，不在内存中构建整个文档，峰值内存与网络规模无关。
+支持 GEXF、GraphML、node-link JSON 和按行分隔的 JSON（NDJSON）；二进制列式格式见 graph_store 模块。
+
+- 列表属性（works、years 等）在 GEXF 中写为 liststring（以 '|' 分隔，Gephi 的约定），
+  在 GraphML 中写为 JSON 数组字符串（读取后用 json.loads 还原），在 JSON/NDJSON 中保持为数组
+- 只保存作品编码的边（interned=True）逐条还原，不会先复制整个网络
+- 输入可以是 nx 图或 CompactGraph；文件名以 .gz 结尾时用 gzip 压缩
+"""
+
+import contextlib
+import gzip
+import json
+import os
+from typing import Dict, Iterable, Iterator, Optional, TextIO, Tuple, Union
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+import networkx as nx
+
+from .compact_graph import CompactGraph
+from .network_builder import edge_work_attributes, materialize_work_attributes
+
+EXPORT_FORMATS = ('gexf', 'graphml', 'json', 'ndjson', 'gml', 'npz')
+
+# 扩展名对应的格式（去掉 .gz 后判断）
+_EXTENSIONS = {'.gexf': 'gexf', '.graphml': 'graphml', '.json': 'json',
+               '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.gml': 'gml', '.npz': 'npz'}
+
+# 只保存作品编码的边还原后的属性类型，与 WorkTable.describe() 的输出一致
+_WORK_ATTRIBUTE_TYPES = {
+    'work_ids': ('list', 'long'),
+    'works': ('list', 'string'),
+    'work_types': ('list', 'string'),
+    'genres': ('list', 'string'),
+    'years': ('list', 'double'),
+    'collaborator_roles': ('list', 'string'),
+}
+
+_SCALAR_ORDER = ('boolean', 'long', 'double', 'string')
+
+GraphLike = Union[nx.Graph, CompactGraph]
+
+
+@contextlib.contextmanager
+def open_output(target: Union[str, os.PathLike, TextIO],
+                compress: Optional[bool] = None) -> Iterator[TextIO]:
+    """
+    打开输出文件，已打开的文本句柄原样返回（不会被关闭）
+
+    Args:
+        target: 文件路径或文本文件句柄
+        compress: 是否gzip压缩，None表示按文件名是否以 .gz 结尾判断
+
+    Returns:
+        上下文管理器，产出文本文件句柄
+    """
+    if hasattr(target, 'write'):
+        yield target
+        return
+    path = os.fspath(target)
+    if compress is None:
+        compress = path.endswith('.gz')
+    if compress:
+        handle = gzip.open(path, 'wt', compresslevel=6, encoding='utf-8', newline='\n')
+    else:
+        handle = open(path, 'w', encoding='utf-8', newline='\n')
+    with handle:
+        yield handle
+
+
+def _plain(value):
+    """NumPy 标量和数组转换为 Python 对象"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def _scalar_type(value) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return 'boolean'
+    if isinstance(value, (int, np.integer)):
+        return 'long'
+    if isinstance(value, (float, np.floating)):
+        return 'double'
+    return 'string'
+
+
+def _merge_scalar(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    if a is None or b is None:
+        return a or b
+    return _SCALAR_ORDER[max(_SCALAR_ORDER.index(a), _SCALAR_ORDER.index(b))]
+
+
+def _value_type(value):
+    """属性值的类型：标量类型名，或 ('list', 元素类型)；None 不参与推断"""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set, frozenset, np.ndarray)):
+        element = None
+        for item in value:
+            if item is not None:
+                element = _merge_scalar(element, _scalar_type(item))
+        return ('list', element or 'string')
+    if isinstance(value, dict):
+        return 'string'
+    return _scalar_type(value)
+
+
+def _merge_type(a, b):
+    if a is None or b is None:
+        return a or b
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return ('list', _merge_scalar(a[1], b[1]))
+    if isinstance(a, tuple) or isinstance(b, tuple):
+        return 'string'
+    return _merge_scalar(a, b)
+
+
+def _update_schema(schema: Dict, attributes: Dict, skip: Iterable[str] = ()) -> None:
+    for key, value in attributes.items():
+        if key not in skip:
+            schema[key] = _merge_type(schema.get(key), _value_type(value))
+
+
+def _edge_attributes(G: nx.Graph, data: Dict) -> Dict:
+    """边属性，只保存编码的边逐条还原为字符串列表"""
+    if 'work_refs' not in data:
+        return data
+    attributes = {key: value for key, value in data.items() if key not in ('work_refs', 'role_refs')}
+    attributes.update(edge_work_attributes(G, data))
+    return attributes
+
+
+def _graph_schema(G: nx.Graph, weight: Optional[str]) -> Tuple[Dict, Dict]:
+    """扫描一遍节点和边属性，得到 GEXF/GraphML 需要预先声明的属性名和类型"""
+    node_schema, edge_schema = {}, {}
+    for _, data in G.nodes(data=True):
+        _update_schema(node_schema, data)
+    skip = {'work_refs', 'role_refs', weight}
+    interned = False
+    for _, _, data in G.edges(data=True):
+        _update_schema(edge_schema, data, skip)
+        interned = interned or 'work_refs' in data
+    if interned:
+        for key, kind in _WORK_ATTRIBUTE_TYPES.items():
+            edge_schema[key] = _merge_type(edge_schema.get(key), kind)
+    # 全部为None的属性按字符串处理
+    for schema in (node_schema, edge_schema):
+        for key, kind in schema.items():
+            schema[key] = kind or 'string'
+    return node_schema, edge_schema
+
+
+def _iter_compact_edges(graph: CompactGraph) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """按行遍历 CompactGraph 的上三角，每次产出一个节点的 (行号, 邻居, 权重)"""
+    indptr, indices, weights = graph.indptr, graph.indices, graph.weights
+    for row in range(graph.number_of_nodes()):
+        start, end = indptr[row], indptr[row + 1]
+        # 列号已排序，只保留大于行号的部分
+        first = start + np.searchsorted(indices[start:end], row, side='right')
+        if first < end:
+            yield row, indices[first:end], weights[first:end]
+
+
+def _xml_value(value, kind, separator: str = '|') -> str:
+    value = _plain(value)
+    if isinstance(kind, tuple):
+        return separator.join('' if item is None else _xml_value(item, kind[1]) for item in value)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_plain)
+    return str(value)
+
+
+def write_gexf(G: GraphLike, target: Union[str, os.PathLike, TextIO],
+               compress: Optional[bool] = None, weight: Optional[str] = 'weight') -> None:
+    """
+    以 GEXF 1.2 格式流式写出网络
+
+    列表属性声明为 liststring，元素以 '|' 连接（元素本身不应包含 '|'）。
+
+    Args:
+        G: 网络图（nx.Graph / nx.DiGraph 或 CompactGraph）
+        target: 文件路径或文本文件句柄
+        compress: 是否gzip压缩，None表示按文件名判断
+        weight: 写为 <edge weight="..."> 的边属性名
+    """
+    with open_output(target, compress) as handle:
+        directed = not isinstance(G, CompactGraph) and G.is_directed()
+        handle.write("<?xml version='1.0' encoding='utf-8'?>\n"
+                     '<gexf xmlns="http://www.gexf.net/1.2draft" version="1.2">\n'
+                     '  <meta>\n    <creator>chinese-cast-network</creator>\n  </meta>\n'
+                     f'  <graph defaultedgetype="{"directed" if directed else "undirected"}" mode="static">\n')
+
+        if isinstance(G, CompactGraph):
+            handle.write('    <nodes>\n')
+            for node_id, name in zip(G.node_ids.tolist(), G.node_names.tolist()):
+                handle.write(f'      <node id={quoteattr(str(node_id))} label={quoteattr(str(name))} />\n')
+            handle.write('    </nodes>\n    <edges>\n')
+            ids = [quoteattr(str(node_id)) for node_id in G.node_ids.tolist()]
+            edge_id = 0
+            for row, neighbours, values in _iter_compact_edges(G):
+                handle.write(''.join(
+                    f'      <edge id="{edge_id + i}" source={ids[row]} target={ids[col]} weight="{value!r}" />\n'
+                    for i, (col, value) in enumerate(zip(neighbours.tolist(), values.tolist()))
+                ))
+                edge_id += len(neighbours)
+            handle.write('    </edges>\n  </graph>\n</gexf>\n')
+            return
+
+        node_schema, edge_schema = _graph_schema(G, weight)
+        node_keys = {key: (str(i), kind) for i, (key, kind) in enumerate(node_schema.items())}
+        edge_keys = {key: (str(i), kind) for i, (key, kind) in enumerate(edge_schema.items())}
+        for cls, keys in (('node', node_keys), ('edge', edge_keys)):
+            if keys:
+                handle.write(f'    <attributes class="{cls}" mode="static">\n')
+                for key, (key_id, kind) in keys.items():
+                    gexf_type = 'liststring' if isinstance(kind, tuple) else kind
+                    handle.write(f'      <attribute id="{key_id}" title={quoteattr(str(key))} type="{gexf_type}" />\n')
+                handle.write('    </attributes>\n')
+
+        def attvalues(attributes, keys):
+            values = ''.join(
+                f'<attvalue for="{keys[key][0]}" value={quoteattr(_xml_value(value, keys[key][1]))} />'
+                for key, value in attributes.items() if key in keys and value is not None
+            )
+            return f'<attvalues>{values}</attvalues>' if values else ''
+
+        handle.write('    <nodes>\n')
+        for node, data in G.nodes(data=True):
+            label = data.get('label', data.get('cast_name', node))
+            body = attvalues(data, node_keys)
+            opening = f'      <node id={quoteattr(str(node))} label={quoteattr(str(label))}'
+            handle.write(f'{opening}>{body}</node>\n' if body else f'{opening} />\n')
+        handle.write('    </nodes>\n    <edges>\n')
+        for edge_id, (u, v, data) in enumerate(G.edges(data=True)):
+            attributes = _edge_attributes(G, data)
+            opening = f'      <edge id="{edge_id}" source={quoteattr(str(u))} target={quoteattr(str(v))}'
+            if weight is not None and attributes.get(weight) is not None:
+                opening += f' weight="{_xml_value(attributes[weight], "double")}"'
+            body = attvalues(attributes, edge_keys)
+            handle.write(f'{opening}>{body}</edge>\n' if body else f'{opening} />\n')
+        handle.write('    </edges>\n  </graph>\n</gexf>\n')
+
+
+def write_graphml(G: GraphLike, target: Union[str, os.PathLike, TextIO],
+                  compress: Optional[bool] = None) -> None:
+    """
+    以 GraphML 格式流式写出网络
+
+    GraphML 没有列表类型，列表属性写为 JSON 数组字符串。
+
+    Args:
+        G: 网络图（nx.Graph / nx.DiGraph 或 CompactGraph）
+        target: 文件路径或文本文件句柄
+        compress: 是否gzip压缩，None表示按文件名判断
+    """
+    with open_output(target, compress) as handle:
+        directed = not isinstance(G, CompactGraph) and G.is_directed()
+        handle.write("<?xml version='1.0' encoding='utf-8'?>\n"
+                     '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+                     'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+                     'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+                     'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n')
+
+        if isinstance(G, CompactGraph):
+            handle.write('  <key id="d0" for="node" attr.name="cast_name" attr.type="string" />\n'
+                         '  <key id="d1" for="edge" attr.name="weight" attr.type="double" />\n'
+                         '  <graph edgedefault="undirected">\n')
+            ids = [quoteattr(str(node_id)) for node_id in G.node_ids.tolist()]
+            for node_id, name in zip(ids, G.node_names.tolist()):
+                handle.write(f'    <node id={node_id}><data key="d0">{escape(str(name))}</data></node>\n')
+            for row, neighbours, values in _iter_compact_edges(G):
+                handle.write(''.join(
+                    f'    <edge source={ids[row]} target={ids[col]}><data key="d1">{value!r}</data></edge>\n'
+                    for col, value in zip(neighbours.tolist(), values.tolist())
+                ))
+            handle.write('  </graph>\n</graphml>\n')
+            return
+
+        graph_attributes = {key: value for key, value in G.graph.items() if key != 'work_table'}
+        graph_schema = {}
+        _update_schema(graph_schema, graph_attributes)
+        node_schema, edge_schema = _graph_schema(G, None)
+        keys = {}
+        for cls, schema in (('graph', graph_schema), ('node', node_schema), ('edge', edge_schema)):
+            keys[cls] = {}
+            for key, kind in schema.items():
+                key_id = f'd{sum(map(len, keys.values()))}'
+                kind = kind or 'string'
+                keys[cls][key] = (key_id, kind)
+                graphml_type = 'string' if isinstance(kind, tuple) else kind
+                handle.write(f'  <key id="{key_id}" for="{cls}" attr.name={quoteattr(str(key))} '
+                             f'attr.type="{graphml_type}" />\n')
+
+        def data_elements(attributes, cls_keys):
+            return ''.join(
+                f'<data key="{cls_keys[key][0]}">{escape(_graphml_value(value, cls_keys[key][1]))}</data>'
+                for key, value in attributes.items() if key in cls_keys and value is not None
+            )
+
+        handle.write(f'  <graph edgedefault="{"directed" if directed else "undirected"}">\n')
+        graph_data = data_elements(graph_attributes, keys['graph'])
+        if graph_data:
+            handle.write(f'    {graph_data}\n')
+        for node, data in G.nodes(data=True):
+            handle.write(f'    <node id={quoteattr(str(node))}>{data_elements(data, keys["node"])}</node>\n')
+        for u, v, data in G.edges(data=True):
+            body = data_elements(_edge_attributes(G, data), keys['edge'])
+            handle.write(f'    <edge source={quoteattr(str(u))} target={quoteattr(str(v))}>{body}</edge>\n')
+        handle.write('  </graph>\n</graphml>\n')
+
+
+def _graphml_value(value, kind) -> str:
+    value = _plain(value)
+    if isinstance(kind, tuple) or isinstance(value, (dict, list, set, frozenset)):
+        return json.dumps(list(value) if isinstance(value, (set, frozenset)) else value,
+                          ensure_ascii=False, default=_plain)
+    return _xml_value(value, kind)
+
+
+def _json_line(record: Dict) -> str:
+    return json.dumps(record, ensure_ascii=False, default=_plain)
+
+
+def _iter_records(G: GraphLike, include_nodes: bool = True) -> Iterator[Tuple[str, Dict]]:
+    """依次产出 ('node', 记录) 和 ('edge', 记录)"""
+    if isinstance(G, CompactGraph):
+        ids = G.node_ids.tolist()
+        if include_nodes:
+            for node_id, name in zip(ids, G.node_names.tolist()):
+                yield 'node', {'id': node_id, 'cast_name': name}
+        for row, neighbours, values in _iter_compact_edges(G):
+            for col, value in zip(neighbours.tolist(), values.tolist()):
+                yield 'edge', {'source': ids[row], 'target': ids[col], 'weight': value}
+        return
+    if include_nodes:
+        for node, data in G.nodes(data=True):
+            yield 'node', {'id': node, **data}
+    for u, v, data in G.edges(data=True):
+        yield 'edge', {'source': u, 'target': v, **_edge_attributes(G, data)}
+
+
+def write_ndjson(G: GraphLike, target: Union[str, os.PathLike, TextIO],
+                 compress: Optional[bool] = None, include_nodes: bool = True) -> None:
+    """
+    以按行分隔的 JSON 流式写出网络，每行一个对象
+
+    节点行为 {"type": "node", "id": ..., 节点属性}，边行为
+    {"type": "edge", "source": ..., "target": ..., 边属性}，节点行在前。
+    可用 pandas.read_json(path, lines=True) 读取。
+
+    Args:
+        G: 网络图（nx 图或 CompactGraph）
+        target: 文件路径或文本文件句柄
+        compress: 是否gzip压缩，None表示按文件名判断
+        include_nodes: 是否写出节点行，False 时只有边
+    """
+    with open_output(target, compress) as handle:
+        for kind, record in _iter_records(G, include_nodes):
+            handle.write(_json_line({'type': kind, **record}) + '\n')
+
+
+def write_node_link_json(G: GraphLike, target: Union[str, os.PathLike, TextIO],
+                         compress: Optional[bool] = None) -> None:
+    """
+    流式写出 node-link JSON，结构与 json_graph.node_link_data(G, edges='edges') 相同
+
+    Args:
+        G: 网络图（nx 图或 CompactGraph）
+        target: 文件路径或文本文件句柄
+        compress: 是否gzip压缩，None表示按文件名判断
+    """
+    with open_output(target, compress) as handle:
+        if isinstance(G, CompactGraph):
+            directed, graph_attributes = False, {}
+        else:
+            directed = G.is_directed()
+            graph_attributes = {key: value for key, value in G.graph.items() if key != 'work_table'}
+        handle.write(f'{{"directed": {json.dumps(directed)}, "multigraph": false, '
+                     f'"graph": {_json_line(graph_attributes)}, "nodes": [')
+        section = 'node'
+        separator = '\n'
+        for kind, record in _iter_records(G):
+            if kind != section:
+                handle.write('\n], "edges": [')
+                section, separator = kind, '\n'
+            handle.write(separator + _json_line(record))
+            separator = ',\n'
+        if section == 'node':
+            handle.write('\n], "edges": [')
+        handle.write('\n]}\n')
+
+
+def _infer_format(path: str) -> str:
+    stem = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(stem)[1].lower()
+    if extension not in _EXTENSIONS:
+        raise ValueError(f"无法从文件名判断导出格式: {path}，请指定 format")
+    return _EXTENSIONS[extension]
+
+
+def export_graph(G: GraphLike, target: Union[str, os.PathLike, TextIO],
+                 format: Optional[str] = None, compress: Optional[bool] = None) -> None:
+    """
+    按格式导出网络
+
+    GML 由 networkx 写出（先还原作品编码）；'npz' 为二进制列式格式（graph_store.save_graph，
+    可用 graph_store.load_graph 读回）；其余格式均为流式写出。
+
+    Args:
+        G: 网络图（nx 图或 CompactGraph）
+        target: 文件路径或文件句柄（'npz' 需要二进制句柄，其余为文本句柄）
+        format: 'gexf'、'graphml'、'json'、'ndjson'、'gml' 或 'npz'，None 表示按扩展名判断
+            （.gexf / .graphml / .json / .ndjson / .jsonl / .gml，可带 .gz；.npz）
+        compress: 是否压缩，None表示按文件名判断；'npz' 格式压缩各列而不是整个文件
+    """
+    if format is None:
+        if hasattr(target, 'write'):
+            raise ValueError("写入文件句柄时必须指定 format")
+        format = _infer_format(os.fspath(target))
+    format = format.lower()
+
+    if format == 'gexf':
+        write_gexf(G, target, compress)
+    elif format == 'graphml':
+        write_graphml(G, target, compress)
+    elif format == 'json':
+        write_node_link_json(G, target, compress)
+    elif format == 'ndjson':
+        write_ndjson(G, target, compress)
+    elif format == 'npz':
+        # graph_store 依赖本模块的类型推断，在这里导入以避免循环导入
+        from .graph_store import save_graph
+        save_graph(G, target, compress=bool(compress))
+    elif format == 'gml':
+        if isinstance(G, CompactGraph):
+            G = G.to_networkx(include_isolates=True)
+        elif 'work_table' in G.graph:
+            G = materialize_work_attributes(G)
+        with open_output(target, compress) as handle:
+            handle.writelines(line + '\n' for line in nx.generate_gml(G))
+    else:
+        raise ValueError(f"不支持的格式: {format}，可选: {list(EXPORT_FORMATS)}")
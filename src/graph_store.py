@@ -0,0 +1,419 @@
+"""
+二进制列式存储模块
+Binary Columnar Graph Store
+
+把网络保存为一个 .npz 文件：节点表和边表按列存放，读写都是整列的数组操作。
+
+- 数值列为 NumPy 数组加缺失掩码；字符串列为 UTF-8 字符缓冲区加字符偏移，不使用 pickle
+- 列表属性（works、years 等）为扁平数组加偏移数组
+- 只保存作品编码的边（interned=True）把 work_refs / role_refs 按偏移编码保存，
+  共享的作品表一并写入，加载后仍是编码边
+- CompactGraph 保存上三角的边数组，可加载为 CompactGraph 或 nx 图
+"""
+
+import contextlib
+import gc
+import itertools
+import json
+import os
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+import scipy.sparse as sp
+
+from .cast_index import WorkTable
+from .compact_graph import CompactGraph
+from .exporters import _merge_scalar, _plain
+
+FORMAT_NAME = 'chinese-cast-network'
+FORMAT_VERSION = 1
+
+# 作品编码边中由 WorkTable 提供的列
+_WORK_TABLE_COLUMNS = ('work_ids', 'titles', 'types', 'genres', 'years', 'role_names')
+
+# 解码后表示属性不存在的占位值
+_ABSENT = object()
+
+_CONTAINERS = (list, tuple, set, frozenset, np.ndarray)
+
+GraphLike = Union[nx.Graph, CompactGraph]
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    编码和解码期间暂停循环垃圾回收
+
+    逐行的属性字典和列表会触发多轮分代回收，每轮都要扫描整个网络，
+    这些对象之间没有循环引用，暂停回收不会泄漏内存。
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _pack_strings(values) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    字符串列编码为 UTF-8 缓冲区、字符偏移和存在掩码
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: 字节缓冲区 (uint8)、字符偏移 (n + 1)、存在掩码
+    """
+    series = pd.Series(values, dtype=object)
+    present = series.notna().to_numpy()
+    texts = series.where(present, '').astype(str)
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(texts.str.len().to_numpy(dtype=np.int64), out=offsets[1:])
+    chars = np.frombuffer(''.join(texts.tolist()).encode('utf-8'), dtype=np.uint8)
+    return chars, offsets, present
+
+
+def _unpack_strings(chars: np.ndarray, offsets: np.ndarray, present: np.ndarray) -> List:
+    """_pack_strings 的逆操作，缺失值为 None"""
+    text = chars.tobytes().decode('utf-8')
+    bounds = offsets.tolist()
+    return [text[start:end] if keep else None
+            for start, end, keep in zip(bounds[:-1], bounds[1:], present.tolist())]
+
+
+def _scalar_arrays(values: List, kind: str, present: np.ndarray) -> Dict[str, np.ndarray]:
+    if kind == 'string':
+        chars, offsets, _ = _pack_strings([value if keep else None
+                                           for value, keep in zip(values, present.tolist())])
+        return {'chars': chars, 'offsets': offsets, 'present': present}
+    dtype = {'boolean': bool, 'long': np.int64, 'double': np.float64}[kind]
+    filled = [value if keep else 0 for value, keep in zip(values, present.tolist())]
+    return {'values': np.array(filled, dtype=dtype), 'present': present}
+
+
+def _scalar_values(arrays: Dict[str, np.ndarray], kind: str) -> List:
+    if kind == 'string':
+        return _unpack_strings(arrays['chars'], arrays['offsets'], arrays['present'])
+    values = arrays['values'].tolist()
+    return [value if keep else None for value, keep in zip(values, arrays['present'].tolist())]
+
+
+def _scalar_kind(types: Iterable[type]) -> Optional[str]:
+    """一组 Python 类型合并后的标量类型名，只有 None 时返回 None"""
+    kind = None
+    for value_type in types:
+        if value_type is type(None):
+            continue
+        if issubclass(value_type, (bool, np.bool_)):
+            value_kind = 'boolean'
+        elif issubclass(value_type, (int, np.integer)):
+            value_kind = 'long'
+        elif issubclass(value_type, (float, np.floating)):
+            value_kind = 'double'
+        else:
+            value_kind = 'string'
+        kind = _merge_scalar(kind, value_kind)
+    return kind
+
+
+def _column_kind(values: List):
+    """
+    列类型：标量类型名、['list', 元素类型] 或 'json'
+
+    按值的 Python 类型集合推断，不逐个检查元素。字典、嵌套列表、列表与标量混合、
+    含空元素的数值列表等无法按列存放的值保存为 JSON 字符串。
+    """
+    types = set(map(type, values))
+    if any(issubclass(value_type, dict) for value_type in types):
+        return 'json'
+    containers = {value_type for value_type in types if issubclass(value_type, _CONTAINERS)}
+    if not containers:
+        return _scalar_kind(types) or 'string'
+    if containers != types:
+        return 'json'
+    element_types = set(map(type, itertools.chain.from_iterable(values)))
+    if any(issubclass(value_type, (dict,) + _CONTAINERS) for value_type in element_types):
+        return 'json'
+    element_kind = _scalar_kind(element_types) or 'string'
+    if element_kind != 'string' and type(None) in element_types:
+        return 'json'
+    return ['list', element_kind]
+
+
+def _encode_column(values: List) -> Tuple[object, Dict[str, np.ndarray]]:
+    """
+    把一列属性值（缺失为 _ABSENT）编码为数组
+
+    Returns:
+        Tuple: (列类型, 数组字典)
+    """
+    present = np.array([value is not _ABSENT and value is not None for value in values], dtype=bool)
+    kept = list(itertools.compress(values, present.tolist()))
+    kind = _column_kind(kept)
+    if kind == 'json':
+        texts = [json.dumps(_plain(value), ensure_ascii=False, default=_plain) if keep else None
+                 for value, keep in zip(values, present.tolist())]
+        return kind, _scalar_arrays(texts, 'string', present)
+    if not isinstance(kind, list):
+        return kind, _scalar_arrays(values, kind, present)
+
+    lengths = np.zeros(len(values), dtype=np.int64)
+    lengths[present] = np.fromiter(map(len, kept), dtype=np.int64, count=len(kept))
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = list(itertools.chain.from_iterable(kept))
+    element_present = np.array([item is not None for item in flat], dtype=bool)
+    arrays = {'list_offsets': offsets, 'list_present': present}
+    arrays.update(_scalar_arrays(flat, kind[1], element_present))
+    return kind, arrays
+
+
+def _decode_column(kind, arrays: Dict[str, np.ndarray]) -> List:
+    """_encode_column 的逆操作，缺失值为 _ABSENT"""
+    if kind == 'json':
+        texts = _scalar_values(arrays, 'string')
+        return [json.loads(text) if text is not None else _ABSENT for text in texts]
+    if not isinstance(kind, list):
+        return [_ABSENT if value is None else value for value in _scalar_values(arrays, kind)]
+    flat = _scalar_values(arrays, kind[1])
+    bounds = arrays['list_offsets'].tolist()
+    return [flat[start:end] if keep else _ABSENT
+            for start, end, keep in zip(bounds[:-1], bounds[1:], arrays['list_present'].tolist())]
+
+
+def _node_keys(nodes: List) -> Tuple[str, Dict[str, np.ndarray]]:
+    """节点键必须全部是整数或全部是字符串"""
+    if all(isinstance(node, (int, np.integer)) and not isinstance(node, bool) for node in nodes):
+        return 'long', {'values': np.array(nodes, dtype=np.int64)}
+    if all(isinstance(node, str) for node in nodes):
+        chars, offsets, present = _pack_strings(nodes)
+        return 'string', {'chars': chars, 'offsets': offsets, 'present': present}
+    raise ValueError("节点键必须全部为整数或全部为字符串")
+
+
+def _decode_node_keys(kind: str, arrays: Dict[str, np.ndarray]) -> List:
+    if kind == 'long':
+        return arrays['values'].tolist()
+    return _scalar_values(arrays, 'string')
+
+
+def _offsets_of(arrays: List[np.ndarray]) -> np.ndarray:
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum([len(array) for array in arrays], out=offsets[1:])
+    return offsets
+
+
+def _put(store: Dict[str, np.ndarray], prefix: str, arrays: Dict[str, np.ndarray]) -> None:
+    for name, array in arrays.items():
+        store[f'{prefix}.{name}'] = array
+
+
+def _take(data, prefix: str) -> Dict[str, np.ndarray]:
+    start = len(prefix) + 1
+    return {key[start:]: data[key] for key in data.files if key.startswith(prefix + '.')}
+
+
+def _save_work_table(store: Dict[str, np.ndarray], table: WorkTable) -> None:
+    work_ids = np.asarray(table.work_ids)
+    if np.issubdtype(work_ids.dtype, np.number):
+        store['work_table.work_ids.values'] = work_ids
+    else:
+        _put(store, 'work_table.work_ids', dict(zip(('chars', 'offsets', 'present'),
+                                                     _pack_strings(work_ids))))
+    for name in ('titles', 'types', 'genres', 'role_names'):
+        _put(store, f'work_table.{name}', dict(zip(('chars', 'offsets', 'present'),
+                                                    _pack_strings(getattr(table, name)))))
+    store['work_table.years'] = np.asarray(table.years, dtype=float)
+
+
+def _load_work_table(data) -> WorkTable:
+    columns = {}
+    for name in _WORK_TABLE_COLUMNS:
+        if name == 'years':
+            columns[name] = data['work_table.years']
+            continue
+        arrays = _take(data, f'work_table.{name}')
+        if 'values' in arrays:
+            columns[name] = arrays['values']
+        else:
+            columns[name] = np.array(_scalar_values(arrays, 'string'), dtype=object)
+    return WorkTable(columns['work_ids'], columns['titles'], columns['types'],
+                     columns['genres'], columns['years'], columns['role_names'])
+
+
+def _graph_tables(G: nx.Graph) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """nx 图编码为元数据和数组"""
+    store = {}
+    nodes = list(G.nodes())
+    key_kind, key_arrays = _node_keys(nodes)
+    _put(store, 'node_key', key_arrays)
+
+    node_columns = {}
+    node_data = [data for _, data in G.nodes(data=True)]
+    names = list(dict.fromkeys(key for data in node_data for key in data))
+    for i, name in enumerate(names):
+        kind, arrays = _encode_column([data.get(name, _ABSENT) for data in node_data])
+        node_columns[name] = [i, kind]
+        _put(store, f'node.{i}', arrays)
+
+    position = {node: i for i, node in enumerate(nodes)}
+    edges = list(G.edges(data=True))
+    store['edge_source'] = np.fromiter((position[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+    store['edge_target'] = np.fromiter((position[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))
+
+    interned = 'work_table' in G.graph and any('work_refs' in data for _, _, data in edges)
+    if interned:
+        work_refs = [np.asarray(data.get('work_refs', ()), dtype=np.int32) for _, _, data in edges]
+        role_refs = [np.asarray(data.get('role_refs', ()), dtype=np.int32) for _, _, data in edges]
+        store['edge_work_offsets'] = _offsets_of(work_refs)
+        store['edge_work_refs'] = np.concatenate(work_refs) if work_refs else np.empty(0, np.int32)
+        store['edge_role_offsets'] = _offsets_of(role_refs)
+        store['edge_role_refs'] = np.concatenate(role_refs) if role_refs else np.empty(0, np.int32)
+        _save_work_table(store, G.graph['work_table'])
+
+    edge_columns = {}
+    skip = {'work_refs', 'role_refs'} if interned else set()
+    names = list(dict.fromkeys(key for _, _, data in edges for key in data if key not in skip))
+    for i, name in enumerate(names):
+        kind, arrays = _encode_column([data.get(name, _ABSENT) for _, _, data in edges])
+        edge_columns[name] = [i, kind]
+        _put(store, f'edge.{i}', arrays)
+
+    meta = {
+        'graph_type': 'networkx',
+        'directed': G.is_directed(),
+        'graph': {key: _plain(value) for key, value in G.graph.items() if key != 'work_table'},
+        'node_key': key_kind,
+        'node_columns': node_columns,
+        'edge_columns': edge_columns,
+        'interned': interned,
+    }
+    return meta, store
+
+
+def _compact_tables(graph: CompactGraph) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """CompactGraph 编码为元数据和数组"""
+    store = {}
+    key_kind, key_arrays = _node_keys(graph.node_ids.tolist())
+    _put(store, 'node_key', key_arrays)
+    _put(store, 'node_name', dict(zip(('chars', 'offsets', 'present'), _pack_strings(graph.node_names))))
+    rows, cols, weights = graph.edge_arrays()
+    store['edge_source'] = rows.astype(np.int64)
+    store['edge_target'] = cols.astype(np.int64)
+    store['edge_weight'] = weights
+    meta = {'graph_type': 'compact', 'directed': False, 'node_key': key_kind}
+    return meta, store
+
+
+def save_graph(G: GraphLike, target: Union[str, os.PathLike, BinaryIO],
+               compress: bool = False) -> None:
+    """
+    把网络保存为二进制列式文件（.npz）
+
+    Args:
+        G: 网络图（nx.Graph / nx.DiGraph、作品编码网络或 CompactGraph）
+        target: 文件路径或二进制文件句柄
+        compress: 是否用 zip deflate 压缩各列（文件更小，读写更慢）
+    """
+    if isinstance(G, CompactGraph):
+        meta, store = _compact_tables(G)
+    elif G.is_multigraph():
+        raise ValueError("不支持多重图")
+    else:
+        with _gc_paused():
+            meta, store = _graph_tables(G)
+    meta.update(format=FORMAT_NAME, version=FORMAT_VERSION)
+    store['meta'] = np.array(json.dumps(meta, ensure_ascii=False, default=_plain))
+
+    writer = np.savez_compressed if compress else np.savez
+    if hasattr(target, 'write'):
+        writer(target, **store)
+    else:
+        # 直接传路径时 numpy 会补 .npz 后缀，这里按给定文件名写出
+        with open(target, 'wb') as handle:
+            writer(handle, **store)
+
+
+def _load_compact(meta: Dict, data) -> CompactGraph:
+    node_ids = _decode_node_keys(meta['node_key'], _take(data, 'node_key'))
+    n = len(node_ids)
+    rows, cols = data['edge_source'], data['edge_target']
+    if meta['graph_type'] == 'compact':
+        names = np.array(_scalar_values(_take(data, 'node_name'), 'string'), dtype=object)
+        weights = data['edge_weight']
+    else:
+        if meta['directed']:
+            raise ValueError("有向图不能加载为 CompactGraph")
+        names = np.array(node_ids, dtype=object)
+        if 'cast_name' in meta['node_columns']:
+            index, kind = meta['node_columns']['cast_name']
+            column = _decode_column(kind, _take(data, f'node.{index}'))
+            names = np.array([node if name is _ABSENT else name for node, name in zip(node_ids, column)],
+                             dtype=object)
+        weights = np.ones(len(rows))
+        if 'weight' in meta['edge_columns']:
+            index, kind = meta['edge_columns']['weight']
+            weights = np.array([1 if w is _ABSENT else w for w in _decode_column(kind, _take(data, f'edge.{index}'))],
+                               dtype=float)
+        # 与 CompactGraph.from_networkx 一致：忽略自环
+        keep = rows != cols
+        rows, cols, weights = rows[keep], cols[keep], weights[keep]
+    upper = sp.coo_matrix((weights, (rows, cols)), shape=(n, n))
+    ids = np.empty(n, dtype=object)
+    ids[:] = node_ids
+    return CompactGraph((upper + upper.T).tocsr(), ids, names)
+
+
+def _load_networkx(meta: Dict, data) -> nx.Graph:
+    G = nx.DiGraph() if meta['directed'] else nx.Graph()
+    G.graph.update(meta['graph'])
+    nodes = _decode_node_keys(meta['node_key'], _take(data, 'node_key'))
+
+    def rows_of(columns: Dict, prefix: str, n: int) -> List[Dict]:
+        records = [{} for _ in range(n)]
+        for name, (index, kind) in columns.items():
+            for record, value in zip(records, _decode_column(kind, _take(data, f'{prefix}.{index}'))):
+                if value is not _ABSENT:
+                    record[name] = value
+        return records
+
+    G.add_nodes_from(zip(nodes, rows_of(meta['node_columns'], 'node', len(nodes))))
+    sources, targets = data['edge_source'].tolist(), data['edge_target'].tolist()
+    edge_records = rows_of(meta['edge_columns'], 'edge', len(sources))
+    if meta['interned']:
+        G.graph['work_table'] = _load_work_table(data)
+        # 各边的编码数组是同一块缓冲区上的视图
+        work_refs = np.split(data['edge_work_refs'], data['edge_work_offsets'][1:-1])
+        role_refs = np.split(data['edge_role_refs'], data['edge_role_offsets'][1:-1])
+        for record, works, roles in zip(edge_records, work_refs, role_refs):
+            record['work_refs'] = works
+            record['role_refs'] = tuple(roles.tolist())
+    G.add_edges_from((nodes[u], nodes[v], record) for u, v, record in zip(sources, targets, edge_records))
+    return G
+
+
+def load_graph(source: Union[str, os.PathLike, BinaryIO], compact: bool = False) -> GraphLike:
+    """
+    加载 save_graph 保存的网络
+
+    Args:
+        source: 文件路径或二进制文件句柄
+        compact: 为True时返回 CompactGraph（以节点键为 node_ids，cast_name 为 node_names），
+            否则返回 nx 图；CompactGraph 保存的文件加载为 nx 图时与 to_networkx(include_isolates=True) 相同
+
+    Returns:
+        nx.Graph 或 CompactGraph
+    """
+    with np.load(source, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        if meta.get('format') != FORMAT_NAME:
+            raise ValueError("不是演员合作网络的二进制文件")
+        if meta['version'] > FORMAT_VERSION:
+            raise ValueError(f"不支持的文件版本: {meta['version']}")
+        if compact:
+            return _load_compact(meta, data)
+        if meta['graph_type'] == 'compact':
+            return _load_compact(meta, data).to_networkx(include_isolates=True)
+        with _gc_paused():
+            return _load_networkx(meta, data)
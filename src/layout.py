@@ -0,0 +1,591 @@
+"""
+快速布局模块
+Fast Layout Module
+
+Fruchterman-Reingold 力导向布局：斥力用 Barnes-Hut 四叉树近似，
+并在多层粗化的图上由粗到细逐层求解。四叉树按 Morton 编码排序后逐层构建，
+节点与单元的相互作用以 (节点, 单元) 对数组的形式逐层展开，全程向量化。
+
+LayoutCache 把布局按图结构哈希保存在磁盘上，图只有少量变化时用旧布局热启动。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from .cast_index import _expand_ranges
+from .compact_graph import CompactGraph
+
+_MAX_DEPTH = 16
+
+
+def _interleave_bits(values: np.ndarray) -> np.ndarray:
+    """把16位整数的各位间隔展开，用于计算 Morton 编码"""
+    values = values.astype(np.uint64) & np.uint64(0xFFFF)
+    values = (values | (values << np.uint64(8))) & np.uint64(0x00FF00FF)
+    values = (values | (values << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    values = (values | (values << np.uint64(2))) & np.uint64(0x33333333)
+    values = (values | (values << np.uint64(1))) & np.uint64(0x55555555)
+    return values
+
+
+class _QuadTree:
+    """按 Morton 编码排序的四叉树，每一层的单元都是排序后节点数组上的连续区间"""
+
+    def __init__(self, pos: np.ndarray, mass: np.ndarray, depth: int):
+        n = len(pos)
+        lower = pos.min(axis=0)
+        self.span = float(max((pos.max(axis=0) - lower).max(), 1e-12))
+        grid = np.floor((pos - lower) / self.span * (1 << depth)).astype(np.int64)
+        grid = np.clip(grid, 0, (1 << depth) - 1)
+        codes = _interleave_bits(grid[:, 0]) | (_interleave_bits(grid[:, 1]) << np.uint64(1))
+
+        self.order = np.argsort(codes, kind='stable')
+        codes = codes[self.order]
+        self.pos = pos[self.order]
+        self.mass = mass[self.order]
+        self.depth = depth
+
+        weighted = self.pos * self.mass[:, None]
+        self.cell_mass: List[np.ndarray] = [None]
+        self.cell_com: List[np.ndarray] = [None]
+        self.cell_count: List[np.ndarray] = [None]
+        self.node_cell: List[np.ndarray] = [None]
+        prefixes = [None]
+        for level in range(1, depth + 1):
+            prefix = codes >> np.uint64(2 * (depth - level))
+            starts = np.flatnonzero(np.concatenate(([True], prefix[1:] != prefix[:-1])))
+            count = np.diff(np.append(starts, n))
+            cell_mass = np.add.reduceat(self.mass, starts)
+            self.cell_mass.append(cell_mass)
+            self.cell_com.append(np.add.reduceat(weighted, starts, axis=0) / cell_mass[:, None])
+            self.cell_count.append(count)
+            self.node_cell.append(np.repeat(np.arange(len(starts)), count))
+            prefixes.append(prefix[starts])
+
+        # 第 level 层单元的子单元是第 level+1 层中的连续区间
+        self.child_start: List[np.ndarray] = [None]
+        self.child_end: List[np.ndarray] = [None]
+        for level in range(1, depth):
+            parents = prefixes[level + 1] >> np.uint64(2)
+            self.child_start.append(np.searchsorted(parents, prefixes[level], 'left'))
+            self.child_end.append(np.searchsorted(parents, prefixes[level], 'right'))
+
+    def repulsion(self, k: float, theta: float) -> np.ndarray:
+        """
+        每个节点受到的斥力 Σ k² m_j (x_i - x_j) / |x_i - x_j|²
+
+        距离足够远（单元宽度 / 距离 < theta）的单元按质心整体计算，否则展开到下一层；
+        最底层的单元直接按质心计算（同单元的节点扣除自身后计算）。
+        """
+        n = len(self.pos)
+        force = np.zeros((n, 2))
+        nodes = np.repeat(np.arange(n), len(self.cell_mass[1]))
+        cells = np.tile(np.arange(len(self.cell_mass[1])), n)
+
+        for level in range(1, self.depth + 1):
+            if len(nodes) == 0:
+                break
+            own = self.node_cell[level][nodes] == cells
+            single = self.cell_count[level][cells] == 1
+            delta = self.pos[nodes] - self.cell_com[level][cells]
+            dist2 = np.einsum('ij,ij->i', delta, delta)
+            width = self.span / (1 << level)
+            final = level == self.depth
+
+            accept = ~own & (single | (width * width < theta * theta * dist2) | final)
+            self._accumulate(force, nodes[accept], delta[accept], dist2[accept],
+                             self.cell_mass[level][cells[accept]], k)
+
+            if final:
+                # 同一个最底层单元中的其他节点：扣除自身后的质心
+                shared = own & ~single
+                nodes, cells = nodes[shared], cells[shared]
+                mass = self.cell_mass[level][cells] - self.mass[nodes]
+                com = (self.cell_com[level][cells] * self.cell_mass[level][cells][:, None]
+                       - self.pos[nodes] * self.mass[nodes][:, None]) / mass[:, None]
+                delta = self.pos[nodes] - com
+                self._accumulate(force, nodes, delta, np.einsum('ij,ij->i', delta, delta), mass, k)
+                break
+
+            expand = ~accept & ~(own & single)
+            nodes, cells = nodes[expand], cells[expand]
+            starts = self.child_start[level][cells]
+            ends = self.child_end[level][cells]
+            nodes = np.repeat(nodes, ends - starts)
+            cells = _expand_ranges(starts, ends)
+
+        unsorted = np.empty_like(force)
+        unsorted[self.order] = force
+        return unsorted
+
+    @staticmethod
+    def _accumulate(force: np.ndarray, nodes: np.ndarray, delta: np.ndarray,
+                    dist2: np.ndarray, mass: np.ndarray, k: float) -> None:
+        n = len(force)
+        scale = k * k * mass / np.maximum(dist2, 1e-12 * k * k)
+        force[:, 0] += np.bincount(nodes, weights=delta[:, 0] * scale, minlength=n)
+        force[:, 1] += np.bincount(nodes, weights=delta[:, 1] * scale, minlength=n)
+
+
+def _tree_depth(n: int) -> int:
+    """四叉树深度：平均每个最底层单元不到一个节点"""
+    return int(min(_MAX_DEPTH, max(2, np.ceil(np.log(max(n, 2)) / np.log(4)) + 2)))
+
+
+def _force_directed(adjacency: sp.csr_matrix, pos: np.ndarray, mass: np.ndarray,
+                    iterations: int, temperature: float, theta: float,
+                    gravity: float) -> np.ndarray:
+    """
+    在给定初始坐标上运行 Fruchterman-Reingold 迭代
+
+    Args:
+        adjacency: 对称邻接矩阵，值为边权重
+        pos: 初始坐标 (n x 2)
+        mass: 节点质量（粗化后为包含的原始节点数）
+        iterations: 迭代次数
+        temperature: 初始最大位移，按迭代线性降到0
+        theta: Barnes-Hut 开角参数，越小越精确
+        gravity: 向中心的引力系数，防止不连通的分量漂散
+
+    Returns:
+        np.ndarray: 坐标 (n x 2)
+    """
+    n = len(pos)
+    if n <= 1 or iterations <= 0:
+        return pos
+    k = np.sqrt(1.0 / n)
+    upper = sp.triu(adjacency, k=1).tocoo()
+    rows, cols, weights = upper.row, upper.col, upper.data.astype(np.float64)
+    depth = _tree_depth(n)
+    step = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        force = _QuadTree(pos, mass, depth).repulsion(k, theta)
+
+        delta = pos[rows] - pos[cols]
+        distance = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+        pull = delta * (distance * weights / k)[:, None]
+        for axis in range(2):
+            force[:, axis] -= np.bincount(rows, weights=pull[:, axis], minlength=n)
+            force[:, axis] += np.bincount(cols, weights=pull[:, axis], minlength=n)
+
+        if gravity > 0:
+            force -= gravity * mass[:, None] * (pos - pos.mean(axis=0))
+
+        length = np.sqrt(np.einsum('ij,ij->i', force, force))
+        length = np.where(length < 1e-12, 1e-12, length)
+        pos = pos + force * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= step
+    return pos
+
+
+def _coarsen(adjacency: sp.csr_matrix, mass: np.ndarray, rng: np.random.Generator,
+             rounds: int = 8) -> Tuple[np.ndarray, sp.csr_matrix, np.ndarray]:
+    """
+    一层粗化：多轮重边互选匹配，再把同一邻居下未匹配的叶子节点两两合并
+
+    Returns:
+        Tuple[np.ndarray, sp.csr_matrix, np.ndarray]: 细节点 -> 粗节点映射、粗图邻接矩阵、粗节点质量
+    """
+    n = adjacency.shape[0]
+    degree = np.diff(adjacency.indptr)
+    coo = adjacency.tocoo()
+    # 按 w / (m_u * m_v) 选边，避免粗节点越并越大。打破平局的扰动对 (u, v) 和 (v, u)
+    # 必须相同，否则无权图上各节点的选择互不相干，几乎不会互选
+    salt = np.uint64(rng.integers(1, 1 << 62))
+    low = np.minimum(coo.row, coo.col).astype(np.uint64)
+    pair = low * np.uint64(n) + np.maximum(coo.row, coo.col).astype(np.uint64)
+    noise = ((pair ^ salt) * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(11)
+    score = coo.data / (mass[coo.row] * mass[coo.col]) * (1.0 + 1e-3 * noise / float(1 << 53))
+
+    # 多轮互选匹配：每轮每个未匹配节点选分数最高的未匹配邻居，互相选中的成对合并
+    group = np.arange(n)
+    matched = np.zeros(n, dtype=bool)
+    has_edges = degree > 0
+    for _ in range(rounds):
+        free = ~matched[coo.row] & ~matched[coo.col]
+        if not free.any():
+            break
+        masked = np.where(free, score, -1.0)
+        best = np.full(n, -1.0)
+        best[has_edges] = np.maximum.reduceat(masked, adjacency.indptr[:-1][has_edges])
+        chosen = free & (masked == best[coo.row])
+        partner = np.full(n, -1, dtype=np.int64)
+        partner[coo.row[chosen]] = coo.col[chosen]
+        proposers = np.flatnonzero(partner >= 0)
+        mutual = proposers[partner[partner[proposers]] == proposers]
+        if len(mutual) == 0:
+            break
+        matched[mutual] = True
+        group[mutual] = np.minimum(mutual, partner[mutual])
+
+    # 星形结构几乎没有互选：同一个邻居下的未匹配叶子两两合并
+    leaves = np.flatnonzero(~matched & (degree == 1))
+    if len(leaves) > 1:
+        hub = adjacency.indices[adjacency.indptr[leaves]]
+        order = np.argsort(hub, kind='stable')
+        leaves, hub = leaves[order], hub[order]
+        rank = np.arange(len(leaves)) - np.searchsorted(hub, hub, 'left')
+        second = np.flatnonzero(rank % 2 == 1)
+        group[leaves[second]] = leaves[second - 1]
+
+    labels, coarse_of = np.unique(group, return_inverse=True)
+    m = len(labels)
+    between = coarse_of[coo.row] != coarse_of[coo.col]
+    coarse = sp.csr_matrix((coo.data[between], (coarse_of[coo.row[between]], coarse_of[coo.col[between]])),
+                           shape=(m, m))
+    coarse.sum_duplicates()
+    return coarse_of, coarse, np.bincount(coarse_of, weights=mass, minlength=m)
+
+
+def _warm_positions(adjacency: sp.csr_matrix, initial: np.ndarray,
+                    rng: np.random.Generator) -> np.ndarray:
+    """
+    补全热启动的初始坐标：新节点放在已知邻居的平均位置，没有已知邻居的随机放置
+
+    Args:
+        adjacency: 对称邻接矩阵
+        initial: 已有坐标 (n x 2)，取值 [-1, 1]，未知节点为 NaN
+
+    Returns:
+        np.ndarray: 单位正方形内的初始坐标 (n x 2)
+    """
+    pos = (np.asarray(initial, dtype=np.float64) + 1.0) / 2.0
+    known = ~np.isnan(pos).any(axis=1)
+    unknown = np.flatnonzero(~known)
+    if len(unknown) == 0:
+        return pos
+    links = adjacency[unknown][:, np.flatnonzero(known)].astype(bool).astype(np.float64)
+    count = np.asarray(links.sum(axis=1)).ravel()
+    placed = (links @ pos[known]) / np.maximum(count, 1)[:, None]
+    k = np.sqrt(1.0 / len(pos))
+    jitter = (rng.random((len(unknown), 2)) - 0.5) * k
+    pos[unknown] = np.where(count[:, None] > 0, placed + jitter, rng.random((len(unknown), 2)))
+    return pos
+
+
+def layout_positions(adjacency: sp.spmatrix, iterations: int = 50, seed: Optional[int] = None,
+                     theta: float = 0.9, multilevel: bool = True, min_coarse_nodes: int = 50,
+                     gravity: float = 0.05, initial: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    计算邻接矩阵对应的布局坐标
+
+    Args:
+        adjacency: 对称邻接矩阵，值为边权重
+        iterations: 每一层的迭代次数
+        seed: 随机种子
+        theta: Barnes-Hut 开角参数
+        multilevel: 是否先在粗化图上布局
+        min_coarse_nodes: 粗化到不超过该节点数时停止
+        gravity: 向中心的引力系数
+        initial: 热启动坐标 (n x 2)，取值 [-1, 1]，新节点为 NaN。给定时跳过粗化，
+            只在原图上以较低温度微调，已有节点基本保持原位
+
+    Returns:
+        np.ndarray: 坐标 (n x 2)，缩放到 [-1, 1]
+    """
+    rng = np.random.default_rng(seed)
+    adjacency = sp.csr_matrix(adjacency, dtype=np.float64)
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.empty((0, 2))
+
+    if initial is not None:
+        pos = _warm_positions(adjacency, initial, rng)
+        k = np.sqrt(1.0 / n)
+        pos = _force_directed(adjacency, pos, np.ones(n), max(5, iterations // 5), k, theta, gravity)
+        return _rescale(pos)
+
+    levels = [(adjacency, np.ones(n))]
+    mappings = []
+    while multilevel and levels[-1][0].shape[0] > min_coarse_nodes:
+        coarse_of, coarse, mass = _coarsen(levels[-1][0], levels[-1][1], rng)
+        if coarse.shape[0] > 0.9 * levels[-1][0].shape[0]:
+            break
+        mappings.append(coarse_of)
+        levels.append((coarse, mass))
+
+    adjacency, mass = levels[-1]
+    pos = rng.random((adjacency.shape[0], 2))
+    pos = _force_directed(adjacency, pos, mass, iterations, 0.1, theta, gravity)
+    for level in range(len(levels) - 2, -1, -1):
+        adjacency, mass = levels[level]
+        # 细节点从所属粗节点的位置出发，加少量抖动后继续迭代
+        k = np.sqrt(1.0 / adjacency.shape[0])
+        pos = pos[mappings[level]] + (rng.random((adjacency.shape[0], 2)) - 0.5) * k
+        pos = _force_directed(adjacency, pos, mass, max(5, iterations // 5), 2 * k, theta, gravity)
+    return _rescale(pos)
+
+
+def _rescale(pos: np.ndarray) -> np.ndarray:
+    """平移到原点并缩放到 [-1, 1]"""
+    pos = pos - pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    return pos / extent if extent > 0 else pos
+
+
+def fast_layout(G: Union[nx.Graph, CompactGraph], iterations: int = 50, seed: Optional[int] = None,
+                weight: Optional[str] = 'weight', theta: float = 0.9, multilevel: bool = True,
+                gravity: float = 0.05, initial: Optional[Union[Dict, np.ndarray]] = None
+                ) -> Union[Dict, np.ndarray]:
+    """
+    Barnes-Hut + 多层粗化的力导向布局，可替代 nx.spring_layout
+
+    Args:
+        G: 网络图（nx.Graph 或 CompactGraph）
+        iterations: 每一层的迭代次数
+        seed: 随机种子，相同种子得到相同布局
+        weight: 作为边权重的属性名，None表示不使用边权重（对CompactGraph同样适用）
+        theta: Barnes-Hut 开角参数，越小越精确、越慢
+        multilevel: 是否使用多层粗化
+        gravity: 向中心的引力系数
+        initial: 热启动坐标。nx图为 {节点: 坐标}，可以只包含部分节点；
+            CompactGraph 为 (节点数 x 2) 数组，未知节点为 NaN
+
+    Returns:
+        nx.Graph 输入返回 {节点: 坐标数组}，与 nx.spring_layout 相同；
+        CompactGraph 输入返回 (节点数 x 2) 数组
+    """
+    if isinstance(G, CompactGraph):
+        adjacency = G.adjacency if weight is not None else G.adjacency.astype(bool)
+        return layout_positions(adjacency, iterations, seed, theta, multilevel, gravity=gravity,
+                                initial=initial)
+
+    nodes = list(G.nodes())
+    if not nodes:
+        return {}
+    adjacency = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=weight, format='csr')
+    adjacency = sp.csr_matrix(adjacency)
+    adjacency = adjacency.maximum(adjacency.T)
+    if initial is not None:
+        initial = np.array([initial.get(node, (np.nan, np.nan)) for node in nodes], dtype=np.float64)
+    pos = layout_positions(adjacency, iterations, seed, theta, multilevel, gravity=gravity,
+                           initial=initial)
+    return dict(zip(nodes, pos))
+
+
+def graph_fingerprint(G: nx.Graph, params: Optional[Dict] = None, weight: Optional[str] = 'weight') -> str:
+    """
+    图结构的哈希：节点、边和边权重相同（与插入顺序无关）且参数相同的图得到相同的值
+
+    Args:
+        G: 网络图
+        params: 布局参数，一并计入哈希
+        weight: 计入哈希的边权重属性名，None表示只看连边
+
+    Returns:
+        str: 十六进制哈希值
+    """
+    nodes = list(G.nodes())
+    keys = [repr(node) for node in nodes]
+    order = np.argsort(keys, kind='stable').tolist()
+    nodelist = [nodes[i] for i in order]
+    adjacency = sp.triu(nx.to_scipy_sparse_array(G, nodelist=nodelist, weight=weight, format='csr')
+                        if nodelist else sp.csr_matrix((0, 0)), format='csr')
+    adjacency.sort_indices()
+
+    digest = hashlib.sha1()
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8'))
+    digest.update('\0'.join(keys[i] for i in order).encode('utf-8'))
+    digest.update(adjacency.indptr.astype(np.int64).tobytes())
+    digest.update(adjacency.indices.astype(np.int64).tobytes())
+    digest.update(np.round(adjacency.data.astype(np.float64), 9).tobytes())
+    return digest.hexdigest()
+
+
+class LayoutCache:
+    """磁盘上的布局缓存
+
+    以 图结构哈希 + 布局参数 为键保存节点坐标，重复绘制同一张图时直接读取。
+    图只增减了少量节点时，可以用参数相同的最相近缓存作为热启动坐标，
+    已有节点基本保持原位，画面不会整体跳动。
+    可被多个线程同时使用：索引的修改和写入加锁，临时文件名各不相同。
+    命中缓存只在内存中更新最近使用时间，下次 put() 或删除条目时一并写入索引文件。
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, directory: str, max_entries: int = 256, max_changed: float = 0.1,
+                 candidates: int = 8):
+        """
+        Args:
+            directory: 缓存目录
+            max_entries: 最多保留的布局数，超出时删除最久未使用的
+            max_changed: 热启动允许的节点变化比例（增加和删除的节点数之和 / 节点数）
+            candidates: 热启动时最多比较的缓存条目数（按最近使用排序）
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_changed = max_changed
+        self.candidates = candidates
+        self.hits = 0
+        self.warm_starts = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._index = self._read_index()
+
+    def _read_index(self) -> Dict:
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"布局缓存索引损坏，已重建: {path}")
+            return {}
+
+    def _replace_atomic(self, path: str, write: Callable, suffix: str, mode: str) -> None:
+        """写入同目录下唯一的临时文件后改名为 path"""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=suffix)
+        try:
+            with os.fdopen(fd, mode, **({'encoding': 'utf-8'} if 'b' not in mode else {})) as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _write_index(self) -> None:
+        """写入索引文件，调用者需持有 _lock"""
+        self._replace_atomic(os.path.join(self.directory, self.INDEX_FILE),
+                             lambda f: json.dump(self._index, f), '.json.tmp', 'w')
+
+    def _remove_entry(self, key: str) -> None:
+        """删除条目和文件，调用者需持有 _lock"""
+        self._index.pop(key, None)
+        try:
+            os.remove(self._entry_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _load(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        try:
+            with np.load(self._entry_path(key)) as data:
+                return data['nodes'], data['positions']
+        except (OSError, KeyError, ValueError):
+            with self._lock:
+                self._index.pop(key, None)
+            return None
+
+    def _touch(self, key: str) -> None:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                entry['used'] = time.time()
+
+    def get(self, G: nx.Graph, params: Dict, weight: Optional[str] = 'weight') -> Optional[Dict]:
+        """
+        读取与图结构和参数完全相同的缓存布局
+
+        Returns:
+            Optional[Dict]: {节点: 坐标}，没有缓存时返回None
+        """
+        key = graph_fingerprint(G, params, weight)
+        if key not in self._index:
+            return None
+        entry = self._load(key)
+        if entry is None:
+            return None
+        keys, positions = entry
+        position = dict(zip(keys.tolist(), positions))
+        self._touch(key)
+        return {node: position[repr(node)] for node in G.nodes()}
+
+    def warm_start(self, G: nx.Graph, params: Dict) -> Optional[Dict]:
+        """
+        查找参数相同、节点变化不超过 max_changed 的缓存布局
+
+        Returns:
+            Optional[Dict]: 与当前图共有节点的 {节点: 坐标}，没有合适的缓存时返回None
+        """
+        nodes = {repr(node): node for node in G.nodes()}
+        n = len(nodes)
+        limit = max(1, int(self.max_changed * n))
+        params_key = json.dumps(params, sort_keys=True, default=str)
+        with self._lock:
+            candidates = sorted(
+                ((entry['used'], key) for key, entry in self._index.items()
+                 if entry['params'] == params_key and abs(entry['n_nodes'] - n) <= limit),
+                reverse=True
+            )
+        candidates = [key for _, key in candidates]
+        for key in candidates[:self.candidates]:
+            entry = self._load(key)
+            if entry is None:
+                continue
+            keys, positions = entry
+            keys = keys.tolist()
+            shared = [i for i, k in enumerate(keys) if k in nodes]
+            if shared and len(keys) + n - 2 * len(shared) <= limit:
+                self._touch(key)
+                return {nodes[keys[i]]: positions[i] for i in shared}
+        return None
+
+    def put(self, G: nx.Graph, params: Dict, pos: Dict, weight: Optional[str] = 'weight') -> None:
+        """保存布局，超出容量时删除最久未使用的条目"""
+        key = graph_fingerprint(G, params, weight)
+        nodes = list(G.nodes())
+        node_keys = np.array([repr(node) for node in nodes], dtype=str)
+        positions = np.array([pos[node] for node in nodes], dtype=np.float64).reshape(-1, 2)
+        self._replace_atomic(self._entry_path(key),
+                             lambda f: np.savez(f, nodes=node_keys, positions=positions), '.tmp.npz', 'wb')
+
+        with self._lock:
+            self._index[key] = {'params': json.dumps(params, sort_keys=True, default=str),
+                                'n_nodes': len(nodes), 'used': time.time()}
+            while len(self._index) > self.max_entries:
+                self._remove_entry(min(self._index, key=lambda k: self._index[k]['used']))
+            self._write_index()
+
+    def layout(self, G: nx.Graph, compute: Callable[[nx.Graph, Optional[Dict]], Dict],
+               params: Dict, warm_start: bool = True, weight: Optional[str] = 'weight') -> Dict:
+        """
+        读取缓存布局，没有时计算并保存
+
+        Args:
+            G: 网络图
+            compute: 布局函数 compute(G, initial)，initial 为热启动坐标或None
+            params: 布局参数，作为缓存键的一部分
+            warm_start: 没有完全相同的缓存时，是否用相近的缓存布局热启动
+            weight: 计入结构哈希的边权重属性名
+
+        Returns:
+            Dict: {节点: 坐标}
+        """
+        pos = self.get(G, params, weight)
+        if pos is not None:
+            self.hits += 1
+            return pos
+
+        initial = self.warm_start(G, params) if warm_start else None
+        if initial is not None:
+            self.warm_starts += 1
+        else:
+            self.misses += 1
+        pos = compute(G, initial)
+        self.put(G, params, pos, weight)
+        return pos
+
+    def clear(self) -> None:
+        """删除全部缓存"""
+        with self._lock:
+            for key in list(self._index):
+                self._remove_entry(key)
+            self._write_index()
@@ -3,10 +3,53 @@
 Network Building Module
 """
 
+import numpy as np
 import pandas as pd
 import networkx as nx
-from collections import defaultdict
-from typing import Dict, List, Set
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from .cast_index import get_index
+from .compact_graph import CompactGraph
+from .graph_algorithms import average_clustering, tree_path_lengths
+from .components import graph_components
+from .weighting import EdgeWeighting
+
+def edge_work_attributes(G: nx.Graph, data: Dict) -> Dict:
+    """
+    读取边的作品信息，兼容保存字符串列表的边和只保存编码的边
+    
+    Args:
+        G: 网络图
+        data: 边属性字典
+        
+    Returns:
+        Dict: 包含 works, work_types, genres, years, collaborator_roles 的字典
+    """
+    if 'work_refs' not in data:
+        return data
+    return G.graph['work_table'].describe(data['work_refs'], data.get('role_refs', ()))
+
+
+def materialize_work_attributes(G: nx.Graph) -> nx.Graph:
+    """
+    把只保存编码的边还原为字符串列表，返回新图，用于导出
+    
+    Args:
+        G: 网络图
+        
+    Returns:
+        nx.Graph: 边属性为字符串列表、不含 work_table 的网络图
+    """
+    H = nx.Graph()
+    H.graph.update((key, value) for key, value in G.graph.items() if key != 'work_table')
+    H.add_nodes_from(G.nodes(data=True))
+    for u, v, data in G.edges(data=True):
+        attributes = {key: value for key, value in data.items() if key not in ('work_refs', 'role_refs')}
+        if 'work_refs' in data:
+            attributes.update(edge_work_attributes(G, data))
+        H.add_edge(u, v, **attributes)
+    return H
+
 
 class NetworkBuilder:
     """合作网络构建器"""
@@ -15,7 +58,12 @@ class NetworkBuilder:
         pass
     
     def build_actor_network(self, cast_name: str, cast_data_df: pd.DataFrame, 
-                          cast_works_df: pd.DataFrame) -> nx.Graph:
+                          cast_works_df: pd.DataFrame,
+                          start_year: Optional[int] = None,
+                          end_year: Optional[int] = None,
+                          interned: bool = False,
+                          weighting: Optional[EdgeWeighting] = None,
+                          genres: Optional[List[str]] = None) -> nx.Graph:
         """
         构建指定演员的合作网络
         这是核心功能的实现
@@ -24,6 +72,12 @@ class NetworkBuilder:
             cast_name: 演员姓名
             cast_data_df: 演员数据
             cast_works_df: 演员作品关系数据
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+            interned: 为True时边只保存作品编码 work_refs 和职能编码 role_refs，
+                标题等信息通过 G.graph['work_table'] 按需查询
+            weighting: 边权重方案，None表示边权重为合作记录数；设置后原始记录数保存在 co_credits
+            genres: 只保留属于任一给定题材的作品，None表示不限
             
         Returns:
             nx.Graph: 合作网络图
@@ -44,11 +98,18 @@ class NetworkBuilder:
         cast_id = target_actors.iloc[0]['cast_id']
         main_works = target_actors.iloc[0]['main_works']
         
-        return self._build_network_by_id(cast_id, cast_name, main_works, cast_works_df)
+        return self._build_network_by_id(cast_id, cast_name, main_works, cast_works_df,
+                                         start_year=start_year, end_year=end_year,
+                                         interned=interned, weighting=weighting, genres=genres)
     
     def build_actor_network_by_id(self, cast_id: str, cast_data_df: pd.DataFrame, 
                                 cast_works_df: pd.DataFrame,
-                                include_roles: List[str] = None) -> nx.Graph:
+                                include_roles: List[str] = None,
+                                start_year: Optional[int] = None,
+                                end_year: Optional[int] = None,
+                                interned: bool = False,
+                                weighting: Optional[EdgeWeighting] = None,
+                                genres: Optional[List[str]] = None) -> nx.Graph:
         """
         根据演员ID构建合作网络
         用于处理重名演员的情况
@@ -58,6 +119,11 @@ class NetworkBuilder:
             cast_data_df: 演员数据
             cast_works_df: 演员作品关系数据
             include_roles: 要包含的职能列表，如 ['演员', '导演']。如果为None则包含所有职能
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+            interned: 为True时边只保存作品编码和职能编码
+            weighting: 边权重方案，None表示边权重为合作记录数
+            genres: 只保留属于任一给定题材的作品，None表示不限
             
         Returns:
             nx.Graph: 合作网络图
@@ -70,11 +136,18 @@ class NetworkBuilder:
         cast_name = target_actor.iloc[0]['cast_name']
         main_works = target_actor.iloc[0]['main_works']
         
-        return self._build_network_by_id(cast_id, cast_name, main_works, cast_works_df, include_roles)
+        return self._build_network_by_id(cast_id, cast_name, main_works, cast_works_df, include_roles,
+                                         start_year=start_year, end_year=end_year,
+                                         interned=interned, weighting=weighting, genres=genres)
     
     def _build_network_by_id(self, cast_id: str, cast_name: str, main_works: str, 
                            cast_works_df: pd.DataFrame, 
-                           include_roles: List[str] = None) -> nx.Graph:
+                           include_roles: List[str] = None,
+                           start_year: Optional[int] = None,
+                           end_year: Optional[int] = None,
+                           interned: bool = False,
+                           weighting: Optional[EdgeWeighting] = None,
+                           genres: Optional[List[str]] = None) -> nx.Graph:
         """
         内部方法：根据cast_id构建网络
         
@@ -84,117 +157,154 @@ class NetworkBuilder:
             main_works: 代表作品
             cast_works_df: 演员作品关系数据
             include_roles: 要包含的职能列表
+            start_year: 起始年份（含）
+            end_year: 结束年份（含）
+            interned: 为True时边只保存作品编码和职能编码
+            weighting: 边权重方案，None表示边权重为合作记录数
+            genres: 只保留属于任一给定题材的作品，None表示不限
             
         Returns:
             nx.Graph: 合作网络图
         """
-        # 2. 使用cast_id从cast_works_data表筛选出该cast的所有作品
-        actor_works = cast_works_df[cast_works_df['cast_id'] == cast_id]
+        index = get_index(cast_works_df)
         
-        if actor_works.empty:
+        # 2. 通过索引取出该cast的所有作品
+        actor_code = index.actor_code(cast_id)
+        if actor_code < 0:
             print(f"演员 {cast_name} (ID: {cast_id}) 没有作品记录")
             return nx.Graph()
         
-        # 3. 根据职能筛选数据
+        # 职能筛选时，作品集合直接取自按职能组合缓存的关联矩阵
+        work_codes = index.works_of_actor(actor_code, include_roles)
+        if include_roles is not None and len(work_codes) == 0:
+            print(f"演员 {cast_name} 在指定职能 {include_roles} 中没有记录")
+            return nx.Graph()
+        
+        # 年份筛选在按年份分区的作品数组上完成
+        if start_year is not None or end_year is not None:
+            work_codes = index.filter_works_by_year(work_codes, start_year, end_year)
+            print(f"年份筛选: {start_year or '不限'} - {end_year or '不限'}，保留 {len(work_codes)} 部作品")
+            if len(work_codes) == 0:
+                print(f"演员 {cast_name} 在指定年份范围内没有记录")
+                return nx.Graph()
+        
+        # 题材筛选在预先拆分好的 作品 x 题材 矩阵上完成
+        if genres is not None:
+            work_codes = np.intersect1d(work_codes, index.works_of_genres(genres), assume_unique=True)
+            print(f"题材筛选: {', '.join(genres)}，保留 {len(work_codes)} 部作品")
+            if len(work_codes) == 0:
+                print(f"演员 {cast_name} 在指定题材中没有记录")
+                return nx.Graph()
+        
+        rows = index.rows_of_works(work_codes)
+        
+        # 3. 根据职能筛选数据：职能编码掩码查表，不做字符串比较
         if include_roles is not None:
-            # 筛选所有相关作品的数据
-            work_ids = set(actor_works['work_id'].tolist())
-            all_cast_data = cast_works_df[cast_works_df['work_id'].isin(work_ids)]
-            filtered_cast_data = all_cast_data[all_cast_data['cast_role'].isin(include_roles)]
+            before_filter = len(rows)
+            rows = rows[index.role_mask(include_roles, rows)]
             
-            print(f"职能筛选: 从 {len(all_cast_data)} 条记录筛选到 {len(filtered_cast_data)} 条记录")
+            print(f"职能筛选: 从 {before_filter} 条记录筛选到 {len(rows)} 条记录")
             print(f"包含职能: {', '.join(include_roles)}")
-            
-            # 使用筛选后的数据
-            cast_works_df = filtered_cast_data
-            
-            # 重新获取该演员在筛选后数据中的作品
-            actor_works = cast_works_df[cast_works_df['cast_id'] == cast_id]
-            if actor_works.empty:
-                print(f"演员 {cast_name} 在指定职能 {include_roles} 中没有记录")
-                return nx.Graph()
+        
+        is_target = index.row_actor[rows] == actor_code
+        work_ids = set(index.row_work[rows[is_target]].tolist())
         
         # 4. 构建合作网络
         G = nx.Graph()
+        G.graph['work_table'] = index.work_table
+        if weighting is not None:
+            G.graph['weighting'] = weighting.describe()
         
         # 添加目标演员节点
         G.add_node(cast_name, 
                   cast_id=cast_id,
                   node_type='target',
-                  works_count=len(actor_works),
+                  works_count=int(is_target.sum()),
                   main_works=main_works,
                   include_roles=include_roles or ['所有职能'])
         
-        # 统计合作关系
-        collaborations = defaultdict(lambda: {
-            'works': set(), 
-            'count': 0, 
-            'work_types': set(),
-            'genres': set(),
-            'years': set(),
-            'cast_id': None,
-            'roles': set()  # 新增：记录合作者的职能
-        })
-        
-        # 获取该演员所有作品的ID
-        work_ids = set(actor_works['work_id'].tolist())
-        
-        # 遍历该演员的每部作品，找出合作者
-        for work_id in work_ids:
-            # 获取该作品的所有演职员
-            work_cast = cast_works_df[cast_works_df['work_id'] == work_id]
-            
-            # 获取作品信息
-            work_info = work_cast.iloc[0] if not work_cast.empty else None
-            work_title = work_info['work_title'] if work_info is not None else str(work_id)
-            work_type = work_info['work_type'] if work_info is not None else 'Unknown'
-            work_year = work_info['work_year'] if work_info is not None else None
-            work_genres = work_info['work_genres'] if work_info is not None else 'Unknown'
-            
-            # 找出与目标演员合作的其他演员
-            for _, collaborator in work_cast.iterrows():
-                if collaborator['cast_id'] != cast_id:  # 不包括自己
-                    collab_name = collaborator['cast_name']
-                    collab_id = collaborator['cast_id']
-                    collab_role = collaborator['cast_role']
-                    
-                    # 记录合作关系
-                    collaborations[collab_name]['works'].add(work_title)
-                    collaborations[collab_name]['count'] += 1
-                    collaborations[collab_name]['work_types'].add(work_type)
-                    collaborations[collab_name]['genres'].add(work_genres)
-                    collaborations[collab_name]['roles'].add(collab_role)
-                    if work_year:
-                        collaborations[collab_name]['years'].add(work_year)
-                    collaborations[collab_name]['cast_id'] = collab_id
+        # 统计合作关系：按合作者姓名分组，作品和职能都保存为编码
+        collab_rows = rows[~is_target]
+        collab_names, name_codes = self._group_by_name(index.row_name[collab_rows])
+        n_names = len(collab_names)
+        counts = np.bincount(name_codes, minlength=n_names)
+        
+        last_rows = np.full(n_names, -1, dtype=np.int64)
+        np.maximum.at(last_rows, name_codes, np.arange(len(collab_rows)))
+        collab_ids = index.actor_ids[index.row_actor[collab_rows[last_rows]]].tolist()
+        
+        if weighting is not None:
+            row_weights = weighting.ego_row_weights(index, actor_code, rows)[~is_target]
+            edge_weights = np.bincount(name_codes, weights=row_weights, minlength=n_names)
+        
+        work_refs = self._split_codes(name_codes, index.row_work[collab_rows], index.n_works, n_names)
+        role_refs = self._split_codes(name_codes, index.row_role_code[collab_rows] + 1,
+                                      index.n_roles + 1, n_names)
         
         # 添加合作者节点和边
-        for collab_name, collab_info in collaborations.items():
-            if collab_info['count'] > 0:
-                # 添加合作者节点
-                G.add_node(collab_name,
-                          cast_id=collab_info['cast_id'],
-                          node_type='collaborator',
-                          collaboration_count=collab_info['count'],
-                          roles=list(collab_info['roles']))
-                
-                # 添加合作关系边
+        for i, collab_name in enumerate(collab_names):
+            roles = tuple((role_refs[i] - 1).tolist())
+            G.add_node(collab_name,
+                      cast_id=collab_ids[i],
+                      node_type='collaborator',
+                      collaboration_count=int(counts[i]),
+                      roles=[index.role_names[code] if code >= 0 else None for code in roles])
+            
+            weights = {'weight': int(counts[i])} if weighting is None else \
+                {'weight': float(edge_weights[i]), 'co_credits': int(counts[i])}
+            if interned:
                 G.add_edge(cast_name, collab_name,
-                          weight=collab_info['count'],
-                          works=list(collab_info['works']),
-                          work_types=list(collab_info['work_types']),
-                          genres=list(collab_info['genres']),
-                          years=sorted(list(collab_info['years'])) if collab_info['years'] else [],
-                          collaborator_roles=list(collab_info['roles']))
+                          work_refs=work_refs[i],
+                          role_refs=roles,
+                          **weights)
+            else:
+                G.add_edge(cast_name, collab_name,
+                          **weights,
+                          **index.work_table.describe(work_refs[i], roles))
         
         role_filter_info = f" (职能筛选: {', '.join(include_roles)})" if include_roles else ""
+        if start_year is not None or end_year is not None:
+            role_filter_info += f" (年份: {start_year or '不限'} - {end_year or '不限'})"
+        if genres is not None:
+            role_filter_info += f" (题材: {', '.join(genres)})"
         print(f"构建完成: {cast_name} (ID: {cast_id}) 的合作网络{role_filter_info} 包含 {G.number_of_nodes()} 个节点, {G.number_of_edges()} 条边")
         print(f"参演作品数: {len(work_ids)}")
         
         return G
     
+    @staticmethod
+    def _group_by_name(names: np.ndarray) -> Tuple[List, np.ndarray]:
+        """按首次出现的顺序给姓名编号"""
+        codes, uniques = pd.factorize(names, use_na_sentinel=False)
+        return uniques.tolist(), codes
+    
+    @staticmethod
+    def _split_codes(groups: np.ndarray, codes: np.ndarray, n_codes: int,
+                     n_groups: int) -> List[np.ndarray]:
+        """
+        每组去重后的编码（升序），各组数组都是同一块缓冲区上的视图
+        
+        Args:
+            groups: 每条记录的组号
+            codes: 每条记录的编码
+            n_codes: 编码总数
+            n_groups: 组数
+            
+        Returns:
+            List[np.ndarray]: 每组的编码数组
+        """
+        keys = np.unique(groups.astype(np.int64) * n_codes + codes)
+        values = (keys % n_codes).astype(np.int32)
+        bounds = np.searchsorted(keys // n_codes, np.arange(1, n_groups))
+        return np.split(values, bounds)
+    
     def build_multi_actor_network(self, cast_names: List[str], cast_data_df: pd.DataFrame, 
-                                cast_works_df: pd.DataFrame) -> nx.Graph:
+                                cast_works_df: pd.DataFrame,
+                                start_year: Optional[int] = None,
+                                end_year: Optional[int] = None,
+                                interned: bool = False,
+                                weighting: Optional[EdgeWeighting] = None,
+                                genres: Optional[List[str]] = None) -> nx.Graph:
         """
         构建多个演员的合作网络
         
@@ -202,18 +312,29 @@ class NetworkBuilder:
             cast_names: 演员姓名列表
             cast_data_df: 演员数据
             cast_works_df: 演员作品关系数据
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+            interned: 为True时边只保存作品编码和职能编码
+            weighting: 边权重方案，None表示边权重为合作记录数
+            genres: 只保留属于任一给定题材的作品，None表示不限
             
         Returns:
             nx.Graph: 多演员合作网络图
         """
         G = nx.Graph()
+        G.graph['work_table'] = get_index(cast_works_df).work_table
+        if weighting is not None:
+            G.graph['weighting'] = weighting.describe()
         
         all_collaborators = set()
         
         # 为每个目标演员构建网络并合并
         for cast_name in cast_names:
             try:
-                actor_network = self.build_actor_network(cast_name, cast_data_df, cast_works_df)
+                actor_network = self.build_actor_network(cast_name, cast_data_df, cast_works_df,
+                                                         start_year=start_year, end_year=end_year,
+                                                         interned=interned, weighting=weighting,
+                                                         genres=genres)
                 
                 # 合并网络
                 for node, data in actor_network.nodes(data=True):
@@ -227,6 +348,15 @@ class NetworkBuilder:
                         # 合并边的权重和作品信息
                         existing_data = G[u][v]
                         existing_data['weight'] += data['weight']
+                        if 'co_credits' in data:
+                            existing_data['co_credits'] += data['co_credits']
+                        if interned:
+                            existing_data['work_refs'] = np.union1d(existing_data['work_refs'],
+                                                                    data['work_refs'])
+                            existing_data['role_refs'] = tuple(sorted(
+                                set(existing_data['role_refs']) | set(data['role_refs'])
+                            ))
+                            continue
                         existing_data['works'] = list(set(existing_data['works'] + data['works']))
                         existing_data['work_types'] = list(set(existing_data['work_types'] + data['work_types']))
                         existing_data['years'] = sorted(list(set(existing_data['years'] + data['years'])))
@@ -240,6 +370,139 @@ class NetworkBuilder:
         
         return G
     
+    def build_global_network(self, cast_works_df: pd.DataFrame,
+                             start_year: Optional[int] = None,
+                             end_year: Optional[int] = None,
+                             include_roles: List[str] = None,
+                             compact: bool = False,
+                             weighting: Optional[EdgeWeighting] = None,
+                             genres: List[str] = None):
+        """
+        构建全行业合作网络
+        边权重为两位演职人员的共同作品数。由于存在重名，节点以cast_id为键，
+        姓名保存在节点属性 cast_name 中。
+        
+        Args:
+            cast_works_df: 演员作品关系数据
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+            include_roles: 要包含的职能列表。如果为None则包含所有职能
+            compact: 为True时返回CompactGraph，否则返回nx.Graph
+            weighting: 边权重方案，None表示边权重为共同作品数
+            genres: 只统计属于任一给定题材的作品，None表示不限
+            
+        Returns:
+            nx.Graph 或 CompactGraph: 全行业合作网络
+        """
+        index = get_index(cast_works_df)
+        row_mask = self._row_mask(index, include_roles, genres)
+        
+        if weighting is None:
+            adjacency = index.cooccurrence(start_year, end_year, row_mask)
+        else:
+            adjacency = weighting.adjacency(index, start_year, end_year, row_mask)
+        graph = index.to_compact_graph(adjacency)
+        print(f"全局网络构建完成: {len(graph.active_nodes())} 个节点, {graph.number_of_edges()} 条边")
+        
+        if compact:
+            return graph
+        G = graph.to_networkx()
+        if weighting is not None:
+            G.graph['weighting'] = weighting.describe()
+        return G
+    
+    def iter_network_windows(self, cast_works_df: pd.DataFrame, window_size: int = 10,
+                             step: int = 1, start_year: Optional[int] = None,
+                             end_year: Optional[int] = None,
+                             include_roles: List[str] = None,
+                             genres: List[str] = None
+                             ) -> Iterator[Tuple[int, int, CompactGraph]]:
+        """
+        按滑动时间窗口迭代全局合作网络
+        窗口前进时增量更新边权重，而不是重新构建每个快照。
+        
+        Args:
+            cast_works_df: 演员作品关系数据
+            window_size: 窗口长度（年）
+            step: 每次前进的年数，例如 window_size=10, step=10 即按年代切分
+            start_year: 第一个窗口的起始年份，None表示数据中最早年份
+            end_year: 最后一个窗口允许的结束年份，None表示数据中最晚年份
+            include_roles: 要包含的职能列表。如果为None则包含所有职能
+            genres: 只统计属于任一给定题材的作品，None表示不限
+            
+        Yields:
+            Tuple[int, int, CompactGraph]: 窗口起始年份、结束年份（含）和该窗口的网络
+        """
+        index = get_index(cast_works_df)
+        row_mask = self._row_mask(index, include_roles, genres)
+        
+        for window_start, window_end, adjacency in index.iter_year_windows(
+                window_size, step, start_year, end_year, row_mask):
+            yield window_start, window_end, index.to_compact_graph(adjacency)
+    
+    def build_role_pair_network(self, cast_works_df: pd.DataFrame, source_role, target_role,
+                                cast_id=None, start_year: Optional[int] = None,
+                                end_year: Optional[int] = None,
+                                genres: List[str] = None) -> nx.DiGraph:
+        """
+        构建职能对有向网络，例如 导演 -> 演员、编剧 -> 导演
+        边 u -> v 表示 u 以起点职能、v 以终点职能在同一作品中署名，权重为这样的作品数。
+        节点以cast_id为键，姓名保存在节点属性 cast_name 中。
+        
+        Args:
+            cast_works_df: 演员作品关系数据
+            source_role: 起点职能（字符串或职能列表）
+            target_role: 终点职能（字符串或职能列表）
+            cast_id: 只构建与该演员相关的边（作为起点或终点），None表示全部数据
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+            genres: 只统计属于任一给定题材的作品，None表示不限
+            
+        Returns:
+            nx.DiGraph: 职能对有向网络
+        """
+        source_roles = [source_role] if isinstance(source_role, str) else list(source_role)
+        target_roles = [target_role] if isinstance(target_role, str) else list(target_role)
+        index = get_index(cast_works_df)
+        
+        seed = None
+        if cast_id is not None:
+            seed = index.actor_code(cast_id)
+            if seed < 0:
+                raise ValueError(f"未找到演员ID: {cast_id}")
+        
+        work_codes = None
+        if start_year is not None or end_year is not None:
+            work_codes = index.works_in_years(start_year, end_year)
+        if genres is not None:
+            genre_works = index.works_of_genres(genres)
+            work_codes = genre_works if work_codes is None else np.intersect1d(work_codes, genre_works)
+        
+        matrix = index.role_projection(source_roles, target_roles, work_codes, seed).tocoo()
+        
+        G = nx.DiGraph(source_roles=source_roles, target_roles=target_roles)
+        nodes = np.unique(np.concatenate((matrix.row, matrix.col)))
+        if seed is not None:
+            nodes = np.union1d(nodes, [seed])
+        ids = index.actor_ids.tolist()
+        G.add_nodes_from((ids[i], {'cast_name': index.actor_names[i]}) for i in nodes.tolist())
+        G.add_weighted_edges_from(zip(index.actor_ids[matrix.row].tolist(),
+                                      index.actor_ids[matrix.col].tolist(),
+                                      matrix.data.tolist()))
+        
+        print(f"职能对网络构建完成 ({'/'.join(source_roles)} -> {'/'.join(target_roles)}): "
+              f"{G.number_of_nodes()} 个节点, {G.number_of_edges()} 条边")
+        return G
+    
+    def _row_mask(self, index, include_roles: Optional[List[str]],
+                  genres: Optional[List[str]] = None) -> Optional[np.ndarray]:
+        """按职能和题材生成关系行掩码"""
+        row_mask = None if include_roles is None else index.role_mask(include_roles)
+        if genres is not None:
+            genre_mask = index.genre_row_mask(genres)
+            row_mask = genre_mask if row_mask is None else row_mask & genre_mask
+        return row_mask
+    
     def build_work_network(self, work_id: str, cast_works_df: pd.DataFrame) -> nx.Graph:
         """
         构建单部作品内的演员合作网络
@@ -300,31 +563,17 @@ class NetworkBuilder:
         Returns:
             List[Dict]: 合作频率统计结果
         """
-        try:
-            network = self.build_actor_network(cast_name, cast_data_df, cast_works_df)
-        except ValueError as e:
-            if "存在多个同名演员" in str(e):
-                print(f"无法直接分析 '{cast_name}' 的合作频率: {e}")
-                return []
-            else:
-                raise e
-        
-        collaborations = []
-        for neighbor in network.neighbors(cast_name):
-            edge_data = network[cast_name][neighbor]
-            collaborations.append({
-                'collaborator': neighbor,
-                'frequency': edge_data['weight'],
-                'works': edge_data['works'],
-                'work_count': len(edge_data['works']),
-                'work_types': edge_data['work_types'],
-                'years': edge_data['years']
-            })
+        target_actors = cast_data_df[cast_data_df['cast_name'] == cast_name]
+        if target_actors.empty:
+            raise ValueError(f"未找到演员: {cast_name}")
         
-        # 按合作频率排序
-        collaborations.sort(key=lambda x: x['frequency'], reverse=True)
+        if len(target_actors) > 1:
+            print(f"无法直接分析 '{cast_name}' 的合作频率: 存在多个同名演员，"
+                  f"请使用 get_collaboration_frequency_by_id(cast_id) 方法指定具体的演员ID")
+            return []
         
-        return collaborations[:top_n]
+        cast_id = target_actors.iloc[0]['cast_id']
+        return self._top_collaborations(cast_id, cast_works_df, top_n)
     
     def get_collaboration_frequency_by_id(self, cast_id: str, cast_data_df: pd.DataFrame, 
                                         cast_works_df: pd.DataFrame, top_n: int = 10) -> List[Dict]:
@@ -341,48 +590,77 @@ class NetworkBuilder:
         Returns:
             List[Dict]: 合作频率统计结果
         """
-        network = self.build_actor_network_by_id(cast_id, cast_data_df, cast_works_df)
+        if cast_data_df[cast_data_df['cast_id'] == cast_id].empty:
+            raise ValueError(f"未找到演员ID: {cast_id}")
         
-        # 获取演员姓名
-        target_actor = cast_data_df[cast_data_df['cast_id'] == cast_id]
-        cast_name = target_actor.iloc[0]['cast_name']
+        return self._top_collaborations(cast_id, cast_works_df, top_n)
+    
+    def _top_collaborations(self, cast_id: str, cast_works_df: pd.DataFrame,
+                            top_n: Optional[int]) -> List[Dict]:
+        """
+        内部方法：直接从索引读取合作次数并选出前N位合作者
+        作品列表和年份只为返回的合作者生成
+        
+        Args:
+            cast_id: 演员ID
+            cast_works_df: 演员作品关系数据
+            top_n: 返回前N个合作伙伴，None表示全部
+            
+        Returns:
+            List[Dict]: 按合作频率降序排列的统计结果
+        """
+        index = get_index(cast_works_df)
+        actor_code = index.actor_code(cast_id)
+        if actor_code < 0:
+            print(f"演员ID {cast_id} 没有作品记录")
+            return []
+        
+        codes, counts = index.top_collaborators(actor_code, top_n)
         
         collaborations = []
-        for neighbor in network.neighbors(cast_name):
-            edge_data = network[cast_name][neighbor]
+        for code, count in zip(codes.tolist(), counts.tolist()):
+            shared = index.work_table.describe(index.shared_works(actor_code, code))
             collaborations.append({
-                'collaborator': neighbor,
-                'frequency': edge_data['weight'],
-                'works': edge_data['works'],
-                'work_count': len(edge_data['works']),
-                'work_types': edge_data['work_types'],
-                'years': edge_data['years']
+                'collaborator': index.actor_names[code],
+                'cast_id': index.actor_ids[code],
+                'frequency': count,
+                'works': shared['works'],
+                'work_ids': shared['work_ids'],
+                'work_count': len(shared['work_ids']),
+                'work_types': shared['work_types'],
+                'years': shared['years']
             })
         
-        # 按合作频率排序
-        collaborations.sort(key=lambda x: x['frequency'], reverse=True)
-        
-        return collaborations[:top_n]
+        return collaborations
     
-    def get_network_stats(self, G: nx.Graph) -> Dict:
+    def get_network_stats(self, G: Union[nx.Graph, CompactGraph]) -> Dict:
         """
         获取网络统计信息
         
         Args:
-            G: 网络图
+            G: 网络图，可以是 extract_backbone() 的输出；CompactGraph 只统计有边的节点
             
         Returns:
-            Dict: 网络统计信息
+            Dict: 网络统计信息。加权度（strength）按边的 weight 属性计算，加权网络即为加权合作强度，
+                并额外包含 weighting（权重方案参数）；骨干网络额外包含 backbone（方法、参数、过滤前后边数）
         """
+        if isinstance(G, CompactGraph):
+            G = G.to_networkx()
+        
+        # 连通分量由并查集一次算出，不再重复调用 is_connected / connected_components
+        roots = graph_components(G)
+        component_sizes = np.bincount(roots, minlength=len(roots))
+        n_components = int(np.count_nonzero(component_sizes))
+        
         stats = {
             'nodes': G.number_of_nodes(),
             'edges': G.number_of_edges(),
             'density': nx.density(G),
-            'is_connected': nx.is_connected(G),
+            'is_connected': n_components == 1,
         }
         
         if G.number_of_nodes() > 0:
-            stats['average_clustering'] = nx.average_clustering(G)
+            stats['average_clustering'] = average_clustering(CompactGraph.from_networkx(G, weight=None))
             
             # 计算度分布
             degrees = [G.degree(n) for n in G.nodes()]
@@ -390,15 +668,44 @@ class NetworkBuilder:
             stats['max_degree'] = max(degrees) if degrees else 0
             stats['min_degree'] = min(degrees) if degrees else 0
             
-            if nx.is_connected(G):
-                stats['diameter'] = nx.diameter(G)
-                stats['average_path_length'] = nx.average_shortest_path_length(G)
+            # 加权度：没有 weight 属性的边按1计算
+            strengths = dict(G.degree(weight='weight'))
+            stats['total_weight'] = sum(strengths.values()) / 2
+            stats['average_strength'] = stats['total_weight'] * 2 / len(strengths)
+            stats['max_strength_node'] = max(strengths, key=strengths.get)
+            stats['max_strength'] = strengths[stats['max_strength_node']]
+            
+            if n_components == 1:
+                stats['diameter'], stats['average_path_length'] = self._path_lengths(G)
             else:
-                stats['connected_components'] = nx.number_connected_components(G)
+                stats['connected_components'] = n_components
                 # 获取最大连通分量的统计
-                largest_cc = max(nx.connected_components(G), key=len)
+                nodes = list(G.nodes())
+                largest_root = int(np.argmax(component_sizes))
+                largest_cc = [nodes[i] for i in np.flatnonzero(roots == largest_root).tolist()]
                 largest_subgraph = G.subgraph(largest_cc)
                 stats['largest_component_size'] = len(largest_cc)
-                stats['largest_component_diameter'] = nx.diameter(largest_subgraph)
+                stats['largest_component_diameter'] = self._path_lengths(largest_subgraph, average=False)[0]
+        
+        if 'weighting' in G.graph:
+            stats['weighting'] = G.graph['weighting']
+        if 'backbone' in G.graph:
+            stats['backbone'] = G.graph['backbone']
         
         return stats
+    
+    def _path_lengths(self, G: nx.Graph, average: bool = True) -> Tuple[int, Optional[float]]:
+        """
+        内部方法：连通图的直径和平均最短路径长度
+        个人网络（星形图）等树形网络按线性时间计算，其他网络使用 networkx
+        
+        Args:
+            G: 连通的网络图
+            average: 为False时不计算平均最短路径长度
+            
+        Returns:
+            Tuple[int, Optional[float]]: 直径和平均最短路径长度
+        """
+        if not G.is_directed() and G.number_of_edges() == G.number_of_nodes() - 1:
+            return tree_path_lengths(CompactGraph.from_networkx(G, weight=None))
+        return nx.diameter(G), nx.average_shortest_path_length(G) if average else None
@@ -0,0 +1,593 @@
+"""
+本地查询服务模块
+Local Query Service
+
+常驻进程只加载一次数据，通过 HTTP 以 JSON 回答查询，分析脚本不必各自重新加载。
+
+- 基于 asyncio 的 HTTP/1.1 服务（支持 keep-alive），只依赖标准库
+- 所有查询（collaborators / search / resolve / ego / path / stats）都交给工作进程池，事件循环只负责收发；
+  同一时间窗内到达的查询合并成批，每个工作进程一批，减少进程间通信次数
+- POST /batch 一次提交多条查询，结果按提交顺序返回
+- 设置 snapshot_dir 时数据快照只发布一次，所有工作进程以内存映射方式共享同一份数据
+
+接口:
+    GET  /health              服务状态和数据规模
+    POST /<op>                请求体为查询参数（JSON 对象），如 POST /search {"keyword": "周"}
+    POST /batch               请求体为 [{"op": ..., "params": {...}}, ...] 或 {"queries": [...]}
+
+启动:
+    python -m src.service --port 8765
+    python -m src.service --processes 16 --snapshot-dir /dev/shm/cast-network
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cast_index import get_index
+from .ego_dataset import iter_ego_tables
+from .snapshot_store import save_snapshot
+
+MAX_BODY_BYTES = 16 * 2 ** 20
+MAX_TOP_N = 1000
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+# 工作进程的状态（已加载数据的 CastNetwork），由 _init_service_worker 设置
+_SERVICE_STATE: Dict = {}
+
+
+def _plain(value):
+    """把查询结果转换为可 JSON 序列化的 Python 对象，NaN 转为 None"""
+    if isinstance(value, pd.DataFrame):
+        return [_plain(record) for record in value.to_dict('records')]
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray, pd.Series)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _require_data(network) -> None:
+    if network.cast_data_df is None or network.cast_works_df is None:
+        raise ValueError("请先调用 load_data() 加载数据")
+
+
+def _actor_records(network, actor_codes) -> List[Dict]:
+    index = get_index(network.cast_works_df)
+    return [{'cast_id': _plain(index.actor_ids[code]), 'cast_name': _plain(index.actor_names[code])}
+            for code in actor_codes]
+
+
+def _index_code(network, cast_id) -> int:
+    code = get_index(network.cast_works_df).actor_code(cast_id)
+    if code < 0:
+        raise ValueError(f"演员ID {cast_id} 没有作品记录")
+    return code
+
+
+def query_search(network, keyword: str, limit: int = 10) -> List[Dict]:
+    """按姓名关键词搜索演员"""
+    return _plain(network.search_actors(keyword, limit))
+
+
+def query_resolve(network, name: Optional[str] = None, cast_ids: Optional[List] = None) -> List:
+    """
+    姓名解析为全部同名演员，或演员ID解析为演员信息
+
+    Args:
+        name: 演员姓名
+        cast_ids: 演员ID列表，结果与之一一对应，未找到的为 None
+
+    Returns:
+        List: 演员信息列表
+    """
+    if (name is None) == (cast_ids is None):
+        raise ValueError("name 和 cast_ids 必须且只能给出一个")
+    if name is not None:
+        return _plain(network.get_actors_by_name_with_selection(name))
+    cast_data_df = network.cast_data_df
+    matches = cast_data_df[cast_data_df['cast_id'].isin(cast_ids)].drop_duplicates('cast_id')
+    records = dict(zip(matches['cast_id'].tolist(), _plain(matches)))
+    return [records.get(cast_id) for cast_id in cast_ids]
+
+
+def query_collaborators(network, cast_id, top_n: int = 10) -> List[Dict]:
+    """合作次数最多的前N位合作者，top_n 不超过 MAX_TOP_N"""
+    if isinstance(top_n, bool) or not isinstance(top_n, int) or not 1 <= top_n <= MAX_TOP_N:
+        raise ValueError(f"top_n 必须是 1 到 {MAX_TOP_N} 之间的整数")
+    return _plain(network.get_collaboration_frequency_by_id(cast_id, top_n))
+
+
+def query_ego(network, cast_id, limit: Optional[int] = None) -> Dict:
+    """
+    个人网络边表（每位合作者一条边），合作者按 cast_id 区分
+
+    Args:
+        cast_id: 演员ID
+        limit: 只返回权重最高的若干条边，None表示全部
+
+    Returns:
+        Dict: 演员信息、边数和按权重降序排列的边（collaborator_id、collaborator_name、weight、work_ids）
+    """
+    _require_data(network)
+    index = get_index(network.cast_works_df)
+    code = _index_code(network, cast_id)
+    table = next(iter_ego_tables(index, np.array([code])))
+    table = table.sort_values(['weight', 'collaborator_id'], ascending=[False, True], kind='stable')
+    edges = len(table)
+    if limit is not None:
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            raise ValueError("limit 必须是正整数")
+        table = table.head(limit)
+    table = table.drop(columns=['ego_id', 'ego_name'])
+    return {**_actor_records(network, [code])[0], 'edges': edges, 'collaborators': _plain(table)}
+
+
+def query_path(network, source, target, max_hops: Optional[int] = None) -> Dict:
+    """
+    两位演员之间经共同作品相连的最短路径
+
+    Args:
+        source: 起点演员ID
+        target: 终点演员ID
+        max_hops: 最多经过的合作次数，None表示不限
+
+    Returns:
+        Dict: hops（不连通时为 None）、路径上的演员和相邻两人的一部共同作品
+    """
+    _require_data(network)
+    index = get_index(network.cast_works_df)
+    found = index.collaboration_path(_index_code(network, source), _index_code(network, target), max_hops)
+    if found is None:
+        return {'hops': None, 'actors': [], 'works': []}
+    actors, works = found
+    return {
+        'hops': len(works),
+        'actors': _actor_records(network, actors),
+        'works': [{'work_id': _plain(index.work_ids[code]), 'work_title': _plain(index.work_titles[code]),
+                   'work_year': _plain(index.work_year[code])} for code in works],
+    }
+
+
+def query_stats(network, cast_id=None, include_roles: Optional[List[str]] = None,
+                start_year: Optional[int] = None, end_year: Optional[int] = None) -> Dict:
+    """
+    统计信息：给定演员时为其合作网络的统计，否则为数据规模
+
+    Args:
+        cast_id: 演员ID，None表示整个数据集
+        include_roles: 要包含的职能列表
+        start_year: 起始年份（含）
+        end_year: 结束年份（含）
+
+    Returns:
+        Dict: 统计信息
+    """
+    _require_data(network)
+    if cast_id is not None:
+        # 统计不需要作品信息，边只保存作品编码
+        G = network.build_actor_network_by_id(cast_id, include_roles, start_year=start_year,
+                                              end_year=end_year, interned=True)
+        return _plain(network.get_network_stats(G))
+    index = get_index(network.cast_works_df)
+    first, last = index.year_range()
+    return {'records': index.n_rows, 'actors': index.n_actors, 'works': index.n_works,
+            'roles': index.n_roles, 'year_range': [first, last]}
+
+
+# 查询名称 -> 函数
+OPERATIONS: Dict[str, Callable] = {
+    'search': query_search,
+    'resolve': query_resolve,
+    'collaborators': query_collaborators,
+    'ego': query_ego,
+    'path': query_path,
+    'stats': query_stats,
+}
+
+
+def _unknown_operation(op: str) -> Tuple[int, Dict]:
+    """未知查询的错误响应"""
+    return 404, {'error': f"未知的查询: {op}，可选: {sorted(OPERATIONS)}"}
+
+
+def execute_query(network, op: str, params: Optional[Dict] = None) -> Tuple[int, Dict]:
+    """
+    执行一条查询，异常转换为错误响应
+
+    Args:
+        network: 已加载数据的 CastNetwork
+        op: 查询名称，见 OPERATIONS
+        params: 查询参数
+
+    Returns:
+        Tuple[int, Dict]: HTTP 状态码和响应体（{'result': ...} 或 {'error': ...}）
+    """
+    if op not in OPERATIONS:
+        return _unknown_operation(op)
+    if params is None:
+        params = {}
+    if not isinstance(params, dict):
+        return 400, {'error': "查询参数必须是 JSON 对象"}
+    try:
+        # 查询由多步组成，固定在同一数据快照上，执行期间重新加载不影响结果
+        result = OPERATIONS[op](network.pinned(), **params)
+    except (ValueError, TypeError, KeyError) as error:
+        return 400, {'error': str(error)}
+    except Exception as error:  # 单条查询失败不影响同批的其他查询
+        return 500, {'error': f"{type(error).__name__}: {error}"}
+    return 200, {'result': result}
+
+
+def _init_service_worker(cast_data_df: pd.DataFrame, cast_works_df: pd.DataFrame,
+                         works_data_df: pd.DataFrame) -> None:
+    """工作进程的初始化：每个进程只接收一次数据并构建一次索引"""
+    from . import CastNetwork
+
+    _SERVICE_STATE['network'] = CastNetwork.from_frames(cast_data_df, cast_works_df, works_data_df)
+    get_index(cast_works_df)
+    sys.stdout = open(os.devnull, 'w')
+
+
+def _attach_service_worker(snapshot_dir: str) -> None:
+    """工作进程的初始化：以内存映射方式加载已发布的数据快照，与其他工作进程共享同一份数据"""
+    from . import CastNetwork
+
+    _SERVICE_STATE['network'] = CastNetwork.from_snapshot(snapshot_dir)
+    sys.stdout = open(os.devnull, 'w')
+
+
+class _QuietThreadStdout:
+    """
+    代替 sys.stdout：转发到原来的输出，只丢弃已静默的线程写入的内容
+
+    processes=0 时查询在本进程的后台线程中执行，构建器和加载器的进度输出不应写入服务日志；
+    redirect_stdout 会替换整个进程的 sys.stdout，因此按线程过滤
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def mute(self) -> None:
+        """静默当前线程的输出（作为线程池的初始化函数）"""
+        self._local.muted = True
+
+    def write(self, text: str) -> int:
+        if getattr(self._local, 'muted', False):
+            return len(text)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        if not getattr(self._local, 'muted', False):
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def _run_batch(queries: List[Tuple[str, Dict]], network=None) -> List[Tuple[int, Dict]]:
+    """在工作进程中顺序执行一批查询"""
+    network = network if network is not None else _SERVICE_STATE['network']
+    return [execute_query(network, op, params) for op, params in queries]
+
+
+class QueryService:
+    """常驻查询服务：持有已加载数据的 CastNetwork 和工作进程池"""
+
+    def __init__(self, network, processes: Optional[int] = None, batch_window: float = 0.002,
+                 max_batch: int = 64, snapshot_dir: Optional[str] = None):
+        """
+        Args:
+            network: 已加载数据的 CastNetwork
+            processes: 工作进程数，None表示CPU核数，0表示在本进程的后台线程中执行
+            batch_window: 计算型查询的合批时间窗（秒）
+            max_batch: 待执行的查询达到该数量时立即发出
+            snapshot_dir: 设置后启动时把数据快照发布到该目录（建议放在 /dev/shm），
+                工作进程以内存映射方式共享加载，不再各自接收数据表和构建索引
+        """
+        _require_data(network)
+        self.network = network
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.snapshot_dir = snapshot_dir
+        self._executor = None
+        self._stdout: Optional[_QuietThreadStdout] = None
+        self._pending: List[Tuple[str, Dict, asyncio.Future]] = []
+        self._flush_handle = None
+        self._server = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self) -> 'QueryService':
+        """创建工作进程池并等待所有工作进程完成数据加载"""
+        get_index(self.network.cast_works_df)
+        loop = asyncio.get_running_loop()
+        if self.processes == 0:
+            self._stdout = _QuietThreadStdout(sys.stdout)
+            sys.stdout = self._stdout
+            self._executor = ThreadPoolExecutor(max_workers=1, initializer=self._stdout.mute)
+        elif self.snapshot_dir is not None:
+            await asyncio.to_thread(save_snapshot, self.network.snapshot, self.snapshot_dir)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, initializer=_attach_service_worker, initargs=(self.snapshot_dir,)
+            )
+        else:
+            network = self.network
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes, initializer=_init_service_worker,
+                initargs=(network.cast_data_df, network.cast_works_df, network.works_data_df)
+            )
+        if self.processes > 0:
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _worker_ready)
+                                   for _ in range(self.processes)))
+        return self
+
+    async def close(self) -> None:
+        """停止 HTTP 服务并关闭工作进程池"""
+        if self._server is not None:
+            self._server.close()
+            # 关闭保持中的连接，处理中的请求写完响应后退出
+            for writer in list(self._connections.values()):
+                writer.transport.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._stdout is not None:
+            if sys.stdout is self._stdout:
+                sys.stdout = self._stdout.stream
+            self._stdout = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def query(self, op: str, params: Optional[Dict] = None) -> Tuple[int, Dict]:
+        """
+        执行一条查询
+
+        Args:
+            op: 查询名称，见 OPERATIONS
+            params: 查询参数
+
+        Returns:
+            Tuple[int, Dict]: HTTP 状态码和响应体
+        """
+        if op not in OPERATIONS:
+            return _unknown_operation(op)
+        if self._executor is None:
+            raise RuntimeError("请先调用 start() 启动服务")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((op, params, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return await future
+
+    async def query_batch(self, queries: List[Dict]) -> List[Dict]:
+        """
+        执行一批查询，结果按提交顺序返回
+
+        Args:
+            queries: [{'op': ..., 'params': {...}}, ...]
+
+        Returns:
+            List[Dict]: 每条查询的 {'status': 状态码, 'result'/'error': ...}
+        """
+        async def run(query):
+            if not isinstance(query, dict) or 'op' not in query:
+                return 400, {'error': "每条查询必须是包含 op 的 JSON 对象"}
+            return await self.query(query['op'], query.get('params'))
+
+        responses = await asyncio.gather(*(run(query) for query in queries))
+        return [{'status': status, **body} for status, body in responses]
+
+    def _flush(self) -> None:
+        """把待执行的计算型查询按工作进程数分批发出"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        loop = asyncio.get_running_loop()
+        n_batches = min(len(pending), max(1, self.processes))
+        for batch in np.array_split(np.arange(len(pending)), n_batches):
+            items = [pending[i] for i in batch.tolist()]
+            queries = [(op, params) for op, params, _ in items]
+            if self.processes == 0:
+                task = loop.run_in_executor(self._executor, _run_batch, queries, self.network)
+            else:
+                task = loop.run_in_executor(self._executor, _run_batch, queries)
+            task.add_done_callback(lambda done, items=items: self._resolve(done, items))
+
+    @staticmethod
+    def _resolve(done: asyncio.Future, items: List) -> None:
+        """把一批的结果分发给各条查询的等待者"""
+        if done.cancelled():
+            responses = [(500, {'error': "查询已取消"})] * len(items)
+        elif done.exception() is not None:
+            error = done.exception()
+            responses = [(500, {'error': f"{type(error).__name__}: {error}"})] * len(items)
+        else:
+            responses = done.result()
+        for (_, _, future), response in zip(items, responses):
+            if not future.done():
+                future.set_result(response)
+
+    def health(self) -> Dict:
+        """服务状态和数据规模"""
+        index = get_index(self.network.cast_works_df)
+        return {'status': 'ok', 'operations': sorted(OPERATIONS), 'processes': self.processes,
+                'actors': index.n_actors, 'works': index.n_works, 'records': index.n_rows}
+
+    async def handle_request(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        """
+        处理一个 HTTP 请求
+
+        Args:
+            method: 请求方法
+            path: 请求路径（忽略查询字符串）
+            body: 请求体
+
+        Returns:
+            Tuple[int, Dict]: HTTP 状态码和响应体
+        """
+        route = path.split('?', 1)[0].strip('/')
+        if route == 'health':
+            return (200, self.health()) if method == 'GET' else (405, {'error': "请使用 GET"})
+        if route != 'batch' and route not in OPERATIONS:
+            return 404, {'error': f"未知的路径: {path}"}
+        if method != 'POST':
+            return 405, {'error': "请使用 POST"}
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError as error:
+            return 400, {'error': f"请求体不是合法的 JSON: {error}"}
+        if route == 'batch':
+            queries = payload.get('queries') if isinstance(payload, dict) else payload
+            if not isinstance(queries, list):
+                return 400, {'error': "请求体必须是查询列表"}
+            return 200, {'results': await self.query_batch(queries)}
+        return await self.query(route, payload)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """按 HTTP/1.1 读取请求并写回 JSON 响应，连接默认保持"""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                parts = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                keep_alive = len(parts) == 3 and (
+                    headers.get('connection', '').lower() != 'close' if parts[2] == 'HTTP/1.1'
+                    else headers.get('connection', '').lower() == 'keep-alive'
+                )
+                raw_length = headers.get('content-length', '0') or '0'
+                length = int(raw_length) if raw_length.isascii() and raw_length.isdigit() else -1
+                if len(parts) != 3:
+                    status, response = 400, {'error': "无法解析的请求"}
+                    keep_alive = False
+                elif length < 0:
+                    status, response = 400, {'error': f"无效的 Content-Length: {raw_length}"}
+                    keep_alive = False
+                elif length > MAX_BODY_BYTES:
+                    status, response = 413, {'error': f"请求体超过 {MAX_BODY_BYTES} 字节"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, response = await self.handle_request(parts[0].upper(), parts[1], body)
+
+                data = json.dumps(response, ensure_ascii=False, default=_plain).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        """
+        开始监听 HTTP 请求（需先调用 start()）
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示由系统分配
+
+        Returns:
+            asyncio.AbstractServer: 服务对象，实际端口见 sockets[0].getsockname()
+        """
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+
+def run_service(network, host: str = '127.0.0.1', port: int = 8765, processes: Optional[int] = None,
+                **kwargs) -> None:
+    """
+    启动查询服务并一直运行，直到进程被中断
+
+    Args:
+        network: 已加载数据的 CastNetwork
+        host: 监听地址
+        port: 监听端口
+        processes: 工作进程数，None表示CPU核数，0表示在本进程的后台线程中执行
+        **kwargs: 传给 QueryService 的其他参数（batch_window、max_batch、snapshot_dir）
+    """
+    async def main():
+        async with QueryService(network, processes, **kwargs) as service:
+            server = await service.serve(host, port)
+            address = server.sockets[0].getsockname()
+            print(f"查询服务已启动: http://{address[0]}:{address[1]} ({service.processes} 个工作进程)")
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("查询服务已停止")
+
+
+def main():
+    from . import CastNetwork
+
+    parser = argparse.ArgumentParser(description="华语影视演员合作网络本地查询服务")
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='工作进程数，默认CPU核数，0表示在本进程的后台线程中执行')
+    parser.add_argument('--data-dir', default='data', help='数据目录')
+    parser.add_argument('--snapshot-dir', default=None,
+                        help='数据快照目录（如 /dev/shm/cast-network），工作进程以内存映射方式共享同一份数据')
+    args = parser.parse_args()
+
+    network = CastNetwork().load_data(
+        os.path.join(args.data_dir, 'cast_data.csv'),
+        os.path.join(args.data_dir, 'cast_works_data.csv'),
+        os.path.join(args.data_dir, 'works_data.csv'),
+    )
+    run_service(network, args.host, args.port, args.processes, snapshot_dir=args.snapshot_dir)
+
+
+if __name__ == '__main__':
+    main()
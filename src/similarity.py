@@ -0,0 +1,321 @@
+"""
+相似演员检索模块
+Similar Actor Search Module
+
+用MinHash签名估计演员作品集合或合作者集合的Jaccard相似度，
+再用LSH分段(banding)索引做次线性的近邻检索。
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import Dict, List, Optional
+
+from .cast_index import get_index
+from .graph_store import _pack_strings, _unpack_strings
+
+# 哈希值小于 2^31，空集合的签名用 2^32-1 表示
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = np.uint32((1 << 32) - 1)
+_BAND_MULTIPLIER = np.uint64(1000003)
+
+
+def _bucket_pairs(members: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """把每个桶内的成员两两配对，返回 (u, v) 数组，u < v"""
+    pair_counts = sizes * (sizes - 1) // 2
+    total = int(pair_counts.sum())
+    if total == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    bucket = np.repeat(np.arange(len(sizes)), pair_counts)
+    # 桶内第k个节点对对应的 (i, j)，i < j
+    k = np.arange(total) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+    size = sizes[bucket]
+    i = (2 * size - 1 - np.sqrt((2 * size - 1) ** 2 - 8 * k)) // 2
+    i = i.astype(np.int64)
+    # 浮点误差修正
+    i -= (i * (2 * size - i - 1) // 2 > k)
+    j = k - i * (2 * size - i - 1) // 2 + i + 1
+
+    u = members[starts[bucket] + i]
+    v = members[starts[bucket] + j]
+    return np.column_stack((np.minimum(u, v), np.maximum(u, v)))
+
+
+class MinHashIndex:
+    """MinHash签名表和LSH分段索引
+
+    签名矩阵每行对应一位演员，共 num_perm 列。签名被切分为 bands 段，
+    每段的哈希值相同的演员落入同一个桶，检索时只比较同桶的候选。
+    """
+
+    def __init__(self, signatures: np.ndarray, node_ids: np.ndarray,
+                 node_names: np.ndarray, bands: int = 32):
+        """
+        Args:
+            signatures: MinHash签名矩阵 (节点数 x num_perm)
+            node_ids: 每行对应的演员ID
+            node_names: 每行对应的演员姓名
+            bands: LSH分段数，必须整除 num_perm
+        """
+        num_perm = signatures.shape[1]
+        if num_perm % bands != 0:
+            raise ValueError(f"bands ({bands}) 必须整除 num_perm ({num_perm})")
+
+        self.signatures = signatures
+        self.node_ids = np.asarray(node_ids)
+        self.node_names = np.asarray(node_names, dtype=object)
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self._node_lookup = pd.Index(self.node_ids)
+
+        self._band_keys = None
+        self._band_order = None
+
+    @property
+    def num_perm(self) -> int:
+        return self.signatures.shape[1]
+
+    @classmethod
+    def from_sets(cls, sets: sp.csr_matrix, node_ids: np.ndarray, node_names: np.ndarray,
+                  num_perm: int = 128, bands: int = 32, seed: int = 1,
+                  chunk_size: int = 2000000) -> 'MinHashIndex':
+        """
+        从集合矩阵计算签名
+
+        Args:
+            sets: 集合矩阵，第i行的非零列即第i个集合的元素
+            node_ids: 每行对应的演员ID
+            node_names: 每行对应的演员姓名
+            num_perm: 哈希函数个数
+            bands: LSH分段数
+            seed: 随机种子
+            chunk_size: 每批处理的 元素数 x 哈希函数数 上限，用于控制内存
+
+        Returns:
+            MinHashIndex: 索引
+        """
+        sets = sp.csr_matrix(sets)
+        rng = np.random.default_rng(seed)
+        a = rng.integers(1, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+        b = rng.integers(0, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+
+        n_rows = sets.shape[0]
+        signatures = np.full((n_rows, num_perm), _MAX_HASH, dtype=np.uint32)
+        row_nnz = np.diff(sets.indptr)
+
+        # 按行分批，每批元素的哈希矩阵大小不超过 chunk_size
+        perm_step = max(1, min(num_perm, chunk_size // max(1, int(row_nnz.max(initial=1)))))
+        elements = sets.indices.astype(np.uint64)
+        row_start = 0
+        while row_start < n_rows:
+            budget = chunk_size // perm_step
+            cumulative = np.cumsum(row_nnz[row_start:])
+            row_end = row_start + max(1, int(np.searchsorted(cumulative, budget, 'right')))
+            lo, hi = sets.indptr[row_start], sets.indptr[row_end]
+            nonempty = np.flatnonzero(row_nnz[row_start:row_end] > 0)
+            if len(nonempty):
+                offsets = sets.indptr[row_start:row_end][nonempty] - lo
+                chunk = elements[lo:hi, None]
+                for p in range(0, num_perm, perm_step):
+                    hashes = (a[None, p:p + perm_step] * chunk + b[None, p:p + perm_step]) \
+                        % _MERSENNE_PRIME
+                    signatures[row_start + nonempty, p:p + perm_step] = \
+                        np.minimum.reduceat(hashes, offsets, axis=0)
+            row_start = row_end
+
+        return cls(signatures, node_ids, node_names, bands)
+
+    @classmethod
+    def for_actors(cls, cast_works_df: pd.DataFrame, kind: str = 'collaborators',
+                   num_perm: int = 128, bands: int = 32, seed: int = 1) -> 'MinHashIndex':
+        """
+        为全部演员构建索引
+
+        Args:
+            cast_works_df: 演员作品关系数据
+            kind: 'collaborators' 按合作者集合，'works' 按作品集合
+            num_perm: 哈希函数个数
+            bands: LSH分段数
+            seed: 随机种子
+
+        Returns:
+            MinHashIndex: 索引
+        """
+        index = get_index(cast_works_df)
+        if kind == 'works':
+            sets = index.incidence
+        elif kind == 'collaborators':
+            sets = index.cooccurrence()
+        else:
+            raise ValueError(f"不支持的集合类型: {kind}")
+        return cls.from_sets(sets, index.actor_ids, index.actor_names, num_perm, bands, seed)
+
+    def _compute_band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """每段签名合成一个64位哈希值，返回 (行数 x bands)"""
+        # 第k段由第 k*rows_per_band 到 (k+1)*rows_per_band-1 列组成
+        keys = np.zeros((signatures.shape[0], self.bands), dtype=np.uint64)
+        for r in range(self.rows_per_band):
+            keys = keys * _BAND_MULTIPLIER + signatures[:, r::self.rows_per_band]
+        return keys
+
+    def _ensure_buckets(self):
+        """按段构建有序的桶键数组"""
+        if self._band_keys is not None:
+            return
+        keys = self._compute_band_keys(self.signatures)
+        nonempty = np.flatnonzero(self.signatures[:, 0] != _MAX_HASH)
+        keys = keys[nonempty]
+        order = np.argsort(keys, axis=0, kind='stable')
+        # 先设置 _band_order：其他线程以 _band_keys 判断是否已构建
+        self._band_order = nonempty[order].T.copy()
+        self._band_keys = np.take_along_axis(keys, order, axis=0).T.copy()
+
+    def query(self, cast_id, top_k: int = 10, min_similarity: float = 0.0) -> List[Dict]:
+        """
+        检索与指定演员最相似的演员
+
+        Args:
+            cast_id: 演员ID
+            top_k: 返回数量
+            min_similarity: 估计Jaccard相似度的下限
+
+        Returns:
+            List[Dict]: 按估计相似度降序排列的结果
+        """
+        code = int(self._node_lookup.get_indexer([cast_id])[0])
+        if code < 0:
+            raise ValueError(f"未找到演员ID: {cast_id}")
+        self._ensure_buckets()
+
+        signature = self.signatures[code:code + 1]
+        if signature[0, 0] == _MAX_HASH:
+            return []
+        keys = self._compute_band_keys(signature)[0]
+
+        candidates = []
+        for band in range(self.bands):
+            lo = np.searchsorted(self._band_keys[band], keys[band], 'left')
+            hi = np.searchsorted(self._band_keys[band], keys[band], 'right')
+            candidates.append(self._band_order[band, lo:hi])
+        candidates = np.unique(np.concatenate(candidates))
+        candidates = candidates[candidates != code]
+
+        similarity = (self.signatures[candidates] == signature).mean(axis=1)
+        keep = similarity >= min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+        order = np.lexsort((candidates, -similarity))[:top_k]
+        return [{
+            'cast_id': self.node_ids[c],
+            'cast_name': self.node_names[c],
+            'similarity': float(s)
+        } for c, s in zip(candidates[order].tolist(), similarity[order].tolist())]
+
+    def candidate_pairs(self, min_similarity: float = 0.0,
+                        max_bucket_size: Optional[int] = 1000) -> pd.DataFrame:
+        """
+        批量生成所有候选相似演员对
+
+        Args:
+            min_similarity: 估计Jaccard相似度的下限
+            max_bucket_size: 超过该大小的桶被跳过，避免退化为两两比较；None表示不限
+
+        Returns:
+            pd.DataFrame: 包含 cast_id_a, cast_id_b, similarity 的候选对
+        """
+        self._ensure_buckets()
+        n = len(self.signatures)
+        pair_keys = []
+        for band in range(self.bands):
+            keys = self._band_keys[band]
+            boundaries = np.flatnonzero(np.diff(keys)) + 1
+            starts = np.concatenate(([0], boundaries))
+            sizes = np.diff(np.concatenate((starts, [len(keys)])))
+            selected = sizes > 1
+            if max_bucket_size is not None:
+                selected &= sizes <= max_bucket_size
+            pairs = _bucket_pairs(self._band_order[band], starts[selected], sizes[selected])
+            pair_keys.append(pairs[:, 0] * n + pairs[:, 1])
+
+        pair_keys = np.unique(np.concatenate(pair_keys)) if pair_keys else np.empty(0, np.int64)
+        u, v = pair_keys // n, pair_keys % n
+        similarity = np.empty(len(pair_keys))
+        for start in range(0, len(pair_keys), 100000):
+            end = start + 100000
+            similarity[start:end] = (self.signatures[u[start:end]] ==
+                                     self.signatures[v[start:end]]).mean(axis=1)
+        keep = similarity >= min_similarity
+        return pd.DataFrame({
+            'cast_id_a': self.node_ids[u[keep]],
+            'cast_id_b': self.node_ids[v[keep]],
+            'similarity': similarity[keep]
+        }).sort_values('similarity', ascending=False, ignore_index=True)
+
+    @staticmethod
+    def _save_labels(directory: str, name: str, values: np.ndarray) -> str:
+        """保存演员ID或姓名，不使用 pickle：数值数组直接保存，字符串编码为 UTF-8 缓冲区和偏移"""
+        if values.dtype != object:
+            np.save(os.path.join(directory, f"{name}.npy"), values, allow_pickle=False)
+            return 'array'
+        invalid = next((value for value in values.tolist()
+                        if not isinstance(value, str) and not pd.isna(value)), None)
+        if invalid is not None:
+            raise TypeError(f"无法保存 {name}: 只支持数值数组或字符串数组，发现 {type(invalid).__name__} 值 {invalid!r}")
+        for suffix, array in zip(('chars', 'offsets', 'present'), _pack_strings(values)):
+            np.save(os.path.join(directory, f"{name}.{suffix}.npy"), array, allow_pickle=False)
+        return 'strings'
+
+    @staticmethod
+    def _load_labels(directory: str, name: str, kind: str) -> np.ndarray:
+        """_save_labels 的逆操作，缺失的字符串为 NaN"""
+        if kind == 'array':
+            return np.load(os.path.join(directory, f"{name}.npy"), allow_pickle=False)
+        chars, offsets, present = (np.load(os.path.join(directory, f"{name}.{suffix}.npy"), allow_pickle=False)
+                                   for suffix in ('chars', 'offsets', 'present'))
+        values = np.array(_unpack_strings(chars, offsets, present), dtype=object)
+        values[~present] = np.nan
+        return values
+
+    def save(self, directory: str) -> None:
+        """
+        保存索引到目录，签名和桶数组保存为 .npy 以便内存映射加载；全部文件不使用 pickle
+
+        Args:
+            directory: 目录路径
+        """
+        self._ensure_buckets()
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'signatures.npy'), self.signatures)
+        np.save(os.path.join(directory, 'band_keys.npy'), self._band_keys)
+        np.save(os.path.join(directory, 'band_order.npy'), self._band_order)
+        labels = {name: self._save_labels(directory, name, getattr(self, name))
+                  for name in ('node_ids', 'node_names')}
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'bands': self.bands, 'num_perm': self.num_perm, 'labels': labels}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'MinHashIndex':
+        """
+        从目录加载索引
+
+        Args:
+            directory: 目录路径
+            mmap: 是否以内存映射方式加载签名和桶数组
+
+        Returns:
+            MinHashIndex: 索引
+        """
+        mode = 'r' if mmap else None
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if 'labels' not in meta:
+            raise ValueError(f"旧格式的索引目录（演员ID和姓名以 pickle 保存），请重新构建并保存: {directory}")
+        index = cls(np.load(os.path.join(directory, 'signatures.npy'), mmap_mode=mode, allow_pickle=False),
+                    cls._load_labels(directory, 'node_ids', meta['labels']['node_ids']),
+                    cls._load_labels(directory, 'node_names', meta['labels']['node_names']),
+                    meta['bands'])
+        index._band_keys = np.load(os.path.join(directory, 'band_keys.npy'), mmap_mode=mode, allow_pickle=False)
+        index._band_order = np.load(os.path.join(directory, 'band_order.npy'), mmap_mode=mode, allow_pickle=False)
+        return index
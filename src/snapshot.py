@@ -0,0 +1,127 @@
+"""
+数据快照模块
+Data Snapshot Module
+
+一次加载得到的数据表、索引和派生结构组成一个只读快照。
+
+- 快照构建完成后不再修改，多个线程可以同时查询，读取时不加锁
+- 演员作品索引在构建快照时一次建好并冻结（数组只读）
+- 推荐器、相似度索引等派生结构属于快照，首次使用时构建一次；重新加载后随旧快照一起失效
+- 重新加载时构建新快照，再由 CastNetwork 一次赋值替换；正在进行的查询继续使用旧快照
+"""
+
+import itertools
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+import pandas as pd
+
+from .cast_index import CastIndex, get_index, register_index
+from .data_loader import DataLoader
+
+_VERSIONS = itertools.count(1)
+_MISSING = object()
+
+
+class DataSnapshot:
+    """只读的数据快照：数据表、属于该快照的 DataLoader、冻结的索引和派生结构"""
+
+    def __init__(self, cast_data_df: Optional[pd.DataFrame] = None,
+                 cast_works_df: Optional[pd.DataFrame] = None,
+                 works_data_df: Optional[pd.DataFrame] = None, index: Optional[CastIndex] = None):
+        """
+        Args:
+            cast_data_df: 演员数据
+            cast_works_df: 演员作品关系数据，之后不应原地修改
+            works_data_df: 作品数据
+            index: 已构建的演员作品索引（如从快照目录加载），None表示由 cast_works_df 构建
+        """
+        loader = DataLoader()
+        loader.cast_data_df, loader.cast_works_df, loader.works_data_df = cast_data_df, cast_works_df, works_data_df
+        if cast_works_df is None:
+            index = None
+        elif index is not None:
+            index = register_index(cast_works_df, index).freeze()
+        else:
+            index = get_index(cast_works_df).freeze()
+        fields = {
+            'cast_data_df': cast_data_df,
+            'cast_works_df': cast_works_df,
+            'works_data_df': works_data_df,
+            'data_loader': loader,
+            'index': index,
+            'version': next(_VERSIONS) if cast_data_df is not None or cast_works_df is not None else 0,
+            'created_at': time.time(),
+            '_derived': {},
+            '_derived_lock': threading.Lock(),
+        }
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def load(cls, cast_data_path: str = 'data/cast_data.csv',
+             cast_works_path: str = 'data/cast_works_data.csv',
+             works_data_path: str = 'data/works_data.csv') -> 'DataSnapshot':
+        """
+        读取数据文件并构建快照
+
+        Args:
+            cast_data_path: 演员表CSV文件路径
+            cast_works_path: 演员作品关系表CSV文件路径
+            works_data_path: 作品表CSV文件路径
+
+        Returns:
+            DataSnapshot: 新快照
+        """
+        return cls(*DataLoader().load_data(cast_data_path, cast_works_path, works_data_path))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("数据快照是只读的，请通过 CastNetwork.load_data() 重新加载")
+
+    def __delattr__(self, name):
+        raise AttributeError("数据快照是只读的，请通过 CastNetwork.load_data() 重新加载")
+
+    def __repr__(self) -> str:
+        actors = self.index.n_actors if self.index is not None else 0
+        return f"DataSnapshot(version={self.version}, actors={actors})"
+
+    @property
+    def loaded(self) -> bool:
+        """是否已包含演员数据和演员作品关系数据"""
+        return self.cast_data_df is not None and self.cast_works_df is not None
+
+    def require(self, cast_data: bool = True, cast_works: bool = True) -> 'DataSnapshot':
+        """检查所需的数据表已加载，返回快照本身"""
+        if (cast_data and self.cast_data_df is None) or (cast_works and self.cast_works_df is None):
+            raise ValueError("请先调用 load_data() 加载数据")
+        return self
+
+    def derived(self, key: Hashable, factory: Callable):
+        """
+        快照上的派生结构，每个键只构建一次
+
+        已构建的结构直接读取，不加锁；只有首次构建时加锁，避免多个线程重复构建。
+
+        Args:
+            key: 缓存键
+            factory: 无参数的构建函数
+
+        Returns:
+            派生结构
+        """
+        value = self._derived.get(key, _MISSING)
+        if value is _MISSING:
+            with self._derived_lock:
+                value = self._derived.get(key, _MISSING)
+                if value is _MISSING:
+                    value = factory()
+                    self._derived[key] = value
+        return value
+
+    def peek(self, key: Hashable):
+        """已构建的派生结构，尚未构建时返回 None（不构建）"""
+        return self._derived.get(key)
+
+
+EMPTY_SNAPSHOT = DataSnapshot()
@@ -0,0 +1,260 @@
+"""
+数据快照存储模块
+Snapshot Store Module
+
+把数据快照（数据表、演员作品索引和已构建的相似度索引）发布到目录中，
+其他进程以内存映射方式加载，同一台机器上的工作进程共享同一份物理内存，不再各自读取 CSV 和构建索引。
+
+- 数值列、索引数组和稀疏矩阵保存为 .npy，加载时内存映射（只读），不复制
+- 所有字符串放入一个字符串池（UTF-8 缓冲区 + 偏移，不使用 pickle），各列只保存 int32 编码；
+  加载时字符串池解码一次，字符串列和索引中的字符串数组都指向池中的同一批字符串对象
+- 对象数组只能包含字符串和缺失值，其他 Python 对象（数字与字符串混合、列表等）拒绝保存，
+  加载时从不反序列化 pickle
+- 目录放在 /dev/shm 等内存文件系统上时不占用磁盘
+- 发布时先写入临时目录再整体改名，已加载旧快照的进程继续使用旧文件
+"""
+
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .cast_index import CastIndex, WorkTable
+from .graph_store import _pack_strings, _unpack_strings
+from .similarity import MinHashIndex
+from .snapshot import DataSnapshot
+
+FORMAT_VERSION = 2
+FRAMES = ('cast_data_df', 'cast_works_df', 'works_data_df')
+SIMILARITY_KINDS = ('collaborators', 'works')
+# 索引中按需填充的缓存，不保存，加载后重新创建
+_TRANSIENT = {'_role_cache': OrderedDict}
+
+
+class _Writer:
+    """把数组写入目录，字符串编码为共享字符串池中的下标"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.pool: Dict[str, int] = {}
+        self.n_files = 0
+
+    def _save(self, values: np.ndarray) -> str:
+        name = f"{self.n_files}.npy"
+        self.n_files += 1
+        np.save(os.path.join(self.directory, name), values, allow_pickle=False)
+        return name
+
+    def array(self, values, name: str = '') -> Dict:
+        values = np.asarray(values)
+        if values.dtype != object:
+            return {'kind': 'array', 'file': self._save(values)}
+        codes, uniques = pd.factorize(values)
+        invalid = next((value for value in uniques if not isinstance(value, str)), None)
+        if invalid is not None:
+            raise TypeError(f"无法保存 {name or '对象数组'}: 对象数组只能包含字符串和缺失值，"
+                            f"发现 {type(invalid).__name__} 值 {invalid!r}，请先转换为数值或字符串类型")
+        # 最后一位对应缺失值（factorize 的编码 -1）
+        mapping = np.array([self.pool.setdefault(value, len(self.pool)) for value in uniques] + [-1],
+                           dtype=np.int32)
+        return {'kind': 'strings', 'file': self._save(mapping[codes])}
+
+    def frame(self, df: pd.DataFrame, name: str = '') -> Dict:
+        spec = {'index_name': df.index.name, 'columns': []}
+        if isinstance(df.index, pd.RangeIndex):
+            spec['range'] = [df.index.start, df.index.stop, df.index.step]
+        else:
+            spec['index'] = {'dtype': str(df.index.dtype), **self.array(df.index.to_numpy(), f"{name} 行索引")}
+        for column_name in df.columns:
+            column = df[column_name]
+            spec['columns'].append({'name': column_name, 'dtype': str(column.dtype),
+                                    **self.array(column.to_numpy(), f"{name} 列 {column_name}")})
+        return spec
+
+    def value(self, value, name: str = '') -> Dict:
+        if value is None or isinstance(value, (bool, int, float, str, np.generic)):
+            return {'kind': 'scalar', 'value': value.item() if isinstance(value, np.generic) else value}
+        if isinstance(value, np.ndarray):
+            return self.array(value, name)
+        if sp.issparse(value):
+            return {'kind': 'sparse', 'format': value.format, 'shape': list(value.shape),
+                    'sorted': bool(value.has_sorted_indices), 'canonical': bool(value.has_canonical_format),
+                    'data': self.array(value.data), 'indices': self.array(value.indices),
+                    'indptr': self.array(value.indptr)}
+        if isinstance(value, pd.Index):
+            return {'kind': 'index', 'name': value.name, 'dtype': str(value.dtype),
+                    'values': self.array(value.to_numpy(), name)}
+        if isinstance(value, pd.DataFrame):
+            return {'kind': 'frame', 'frame': self.frame(value, name)}
+        raise TypeError(f"无法保存的数据类型: {type(value).__name__}")
+
+    def similarity(self, index: MinHashIndex, kind: str) -> Dict:
+        # 与 MinHashIndex.save() 保存相同的数组，演员ID和姓名放入快照的共享字符串池
+        index._ensure_buckets()
+        return {'bands': index.bands,
+                **{name: self.array(getattr(index, name), f"相似度索引 {kind} {name}")
+                   for name in ('signatures', 'node_ids', 'node_names', '_band_keys', '_band_order')}}
+
+    def finish(self) -> None:
+        chars, offsets, _ = _pack_strings(list(self.pool))
+        np.save(os.path.join(self.directory, 'strings.chars.npy'), chars)
+        np.save(os.path.join(self.directory, 'strings.offsets.npy'), offsets)
+
+
+class _Reader:
+    """_Writer 的逆操作，数值数组以内存映射方式加载"""
+
+    def __init__(self, directory: str, mmap: bool):
+        self.directory = directory
+        self.mode = 'r' if mmap else None
+        offsets = np.load(os.path.join(directory, 'strings.offsets.npy'))
+        strings = _unpack_strings(np.load(os.path.join(directory, 'strings.chars.npy')), offsets,
+                                  np.ones(len(offsets) - 1, dtype=bool))
+        # 最后一位为缺失值，对应编码 -1
+        self.pool = np.array(strings + [np.nan], dtype=object)
+
+    def array(self, spec: Dict) -> np.ndarray:
+        if spec['kind'] not in ('array', 'strings'):
+            raise ValueError(f"不支持的数组类型: {spec['kind']}")
+        values = np.load(os.path.join(self.directory, spec['file']), mmap_mode=self.mode,
+                         allow_pickle=False).view(np.ndarray)
+        return self.pool[values] if spec['kind'] == 'strings' else values
+
+    def similarity(self, spec: Dict) -> MinHashIndex:
+        index = MinHashIndex(self.array(spec['signatures']), self.array(spec['node_ids']),
+                             self.array(spec['node_names']), spec['bands'])
+        index._band_order = self.array(spec['_band_order'])
+        index._band_keys = self.array(spec['_band_keys'])
+        return index
+
+    def frame(self, spec: Dict) -> pd.DataFrame:
+        if 'range' in spec:
+            index = pd.RangeIndex(*spec['range'], name=spec['index_name'])
+        else:
+            index = pd.Index(self.array(spec['index']), dtype=spec['index']['dtype'], name=spec['index_name'])
+        columns = {}
+        for column in spec['columns']:
+            values = self.array(column)
+            if column['dtype'] != str(values.dtype):
+                values = pd.array(values, dtype=column['dtype'])
+            columns[column['name']] = values
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def value(self, spec: Dict):
+        kind = spec['kind']
+        if kind == 'scalar':
+            return spec['value']
+        if kind == 'sparse':
+            matrix_class = sp.csr_matrix if spec['format'] == 'csr' else sp.csc_matrix
+            matrix = matrix_class((self.array(spec['data']), self.array(spec['indices']), self.array(spec['indptr'])),
+                                  shape=tuple(spec['shape']), copy=False)
+            # 内存映射的数组只读，恢复排序标记，避免稀疏运算原地整理
+            matrix.has_sorted_indices = spec['sorted']
+            matrix.has_canonical_format = spec['canonical']
+            return matrix
+        if kind == 'index':
+            return pd.Index(self.array(spec['values']), dtype=spec['dtype'], name=spec['name'])
+        if kind == 'frame':
+            return self.frame(spec['frame'])
+        return self.array(spec)
+
+
+def save_snapshot(snapshot: DataSnapshot, directory: str, similarity: Iterable[str] = ()) -> str:
+    """
+    把数据快照发布到目录，供其他进程以 load_snapshot() 共享加载
+
+    Args:
+        snapshot: 已加载数据的快照
+        directory: 目标目录，已存在时整体替换
+        similarity: 需要一并发布的相似度索引类型（'collaborators' / 'works'），
+            尚未构建的先在快照上构建；快照上已构建的相似度索引总是一并发布
+
+    Returns:
+        str: 目标目录
+    """
+    snapshot.require(cast_data=False)
+    for kind in similarity:
+        if kind not in SIMILARITY_KINDS:
+            raise ValueError(f"不支持的集合类型: {kind}")
+        # 与 CastNetwork.find_similar_actors() 使用相同的缓存键
+        snapshot.derived(('similarity', kind), lambda: MinHashIndex.for_actors(snapshot.cast_works_df, kind))
+
+    directory = os.path.normpath(directory)
+    staging = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        writer = _Writer(staging)
+        meta = {
+            'format': FORMAT_VERSION,
+            'version': snapshot.version,
+            'created_at': time.time(),
+            'frames': {name: writer.frame(getattr(snapshot, name), name) if getattr(snapshot, name) is not None else None
+                       for name in FRAMES},
+            'index': {name: writer.value(value, f"索引 {name}") for name, value in vars(snapshot.index).items()
+                      if name != 'work_table' and name not in _TRANSIENT},
+            'similarity': {},
+        }
+        for kind in SIMILARITY_KINDS:
+            index = snapshot.peek(('similarity', kind))
+            if index is not None:
+                meta['similarity'][kind] = writer.similarity(index, kind)
+        writer.finish()
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    except BaseException:
+        # 保存失败时不留下不完整的临时目录，已发布的快照保持不变
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # 旧目录改名后删除；已映射旧文件的进程不受影响
+    retired = None
+    if os.path.exists(directory):
+        retired = f"{directory}.old-{os.getpid()}"
+        os.replace(directory, retired)
+    os.replace(staging, directory)
+    if retired is not None:
+        shutil.rmtree(retired, ignore_errors=True)
+    return directory
+
+
+def load_snapshot(directory: str, mmap: bool = True) -> DataSnapshot:
+    """
+    加载 save_snapshot() 发布的数据快照，索引直接由保存的数组恢复，不重新构建
+
+    Args:
+        directory: 快照目录
+        mmap: 是否以内存映射方式加载数值数组（多个进程共享同一份物理内存）
+
+    Returns:
+        DataSnapshot: 快照，数据表和索引中的数值数组只读
+    """
+    with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != FORMAT_VERSION:
+        raise ValueError(f"不支持的快照格式: {meta.get('format')}，当前版本: {FORMAT_VERSION}")
+    reader = _Reader(directory, mmap)
+    frames = [reader.frame(meta['frames'][name]) if meta['frames'][name] is not None else None
+              for name in FRAMES]
+
+    index = object.__new__(CastIndex)
+    for name, spec in meta['index'].items():
+        setattr(index, name, reader.value(spec))
+    for name, factory in _TRANSIENT.items():
+        setattr(index, name, factory())
+    index.work_table = WorkTable(index.work_ids, index.work_titles, index.work_types,
+                                 index.work_genres, index.work_year, index.role_names)
+
+    snapshot = DataSnapshot(*frames, index=index)
+    for kind, spec in meta['similarity'].items():
+        # 立即加载：目录之后可能被新发布的快照替换
+        similarity_index = reader.similarity(spec)
+        snapshot.derived(('similarity', kind), lambda: similarity_index)
+    return snapshot
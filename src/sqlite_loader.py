@@ -0,0 +1,412 @@
+"""
+SQLite 数据加载模块
+SQLite Data Loader Module
+
+DataLoader 的另一种后端：CSV 只导入一次到带索引的 SQLite 数据库，之后每个查询都是
+一条预编译的 SQL 语句，进程内不常驻任何 DataFrame，适合内存很小的查询节点。
+
+- 导入时沿用 DataLoader 的预处理，并预先计算职能统计、题材统计和 作品-题材 表
+- 数据库记录源文件的大小和修改时间，源文件变化后自动重新导入
+- 查询结果与 DataLoader 相同（行顺序为原表顺序、列类型相同，缺失的年份为 NaN），返回小的 DataFrame；
+  唯一的例外是 search_actors()：关键词按字面子串匹配（SQL LIKE），不支持 DataLoader 的正则表达式，
+  如 '.' 只匹配姓名中的句点，且只有 ASCII 字母不区分大小写
+"""
+
+import contextlib
+import io
+import json
+import os
+import sqlite3
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .cast_index import CastIndex
+from .data_loader import DataLoader
+
+SCHEMA_VERSION = 2
+
+_INDEXES = (
+    'CREATE INDEX idx_cast_data_cast_id ON cast_data (cast_id)',
+    'CREATE INDEX idx_cast_data_cast_name ON cast_data (cast_name)',
+    'CREATE INDEX idx_cast_works_cast_id ON cast_works (cast_id, work_id)',
+    'CREATE INDEX idx_cast_works_work_id ON cast_works (work_id)',
+    'CREATE INDEX idx_cast_works_cast_name ON cast_works (cast_name)',
+    'CREATE INDEX idx_cast_works_cast_role ON cast_works (cast_role)',
+    'CREATE INDEX idx_works_data_work_id ON works_data (work_id)',
+    'CREATE INDEX idx_work_genres_work_id ON work_genres (work_id)',
+    'CREATE INDEX idx_work_genres_genre ON work_genres (genre_code, work_year)',
+)
+
+# 同一作品中 cast_id 的合作记录，按原表顺序
+_COLLABORATION_SQL = """
+    SELECT * FROM cast_works
+    WHERE work_id IN (SELECT work_id FROM cast_works WHERE cast_id = ?){role_filter}
+    ORDER BY rowid
+"""
+
+_GENRE_COOCCURRENCE_SQL = """
+    SELECT a.genre_code, b.genre_code, COUNT(*)
+    FROM work_genres AS a JOIN work_genres AS b ON a.work_id = b.work_id
+    WHERE (? IS NULL AND ? IS NULL)
+       OR (a.work_year IS NOT NULL AND (? IS NULL OR a.work_year >= ?) AND (? IS NULL OR a.work_year <= ?))
+    GROUP BY a.genre_code, b.genre_code
+"""
+
+_ACTOR_GENRE_SQL = """
+    SELECT g.genre_code, COUNT(*)
+    FROM (SELECT DISTINCT work_id FROM cast_works WHERE cast_id = ?) AS w
+    JOIN work_genres AS g ON g.work_id = w.work_id
+    GROUP BY g.genre_code
+"""
+
+
+def _param(value):
+    """NumPy 标量转换为 sqlite3 可以绑定的 Python 对象"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _source_fingerprint(paths: Sequence[str]) -> str:
+    """源文件的路径、大小和修改时间"""
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return '|'.join(parts)
+
+
+class SQLiteDataLoader:
+    """基于 SQLite 的数据加载器
+
+    查询方法与 DataLoader 同名、返回相同的结果。load_data() 不返回 DataFrame，
+    数据只保存在数据库文件中；需要构建网络时仍应使用 DataLoader。
+    """
+
+    def __init__(self, db_path: str = 'data/cast_network.sqlite', cache_size_kb: int = 2048):
+        """
+        Args:
+            db_path: 数据库文件路径
+            cache_size_kb: SQLite 页缓存大小（KB），决定常驻内存的上限
+        """
+        self.db_path = db_path
+        self.cache_size_kb = cache_size_kb
+        self._connection = None
+        self._genre_names = None
+        self._roles = None
+        self._dtypes = {}
+
+    def load_data(self, cast_data_path: str = 'data/cast_data.csv',
+                  cast_works_path: str = 'data/cast_works_data.csv',
+                  works_data_path: str = 'data/works_data.csv',
+                  rebuild: bool = False) -> 'SQLiteDataLoader':
+        """
+        打开数据库；数据库不存在、版本不同或源文件有变化时先从 CSV 导入
+
+        Args:
+            cast_data_path: 演员表CSV文件路径
+            cast_works_path: 演员作品关系表CSV文件路径
+            works_data_path: 作品表CSV文件路径
+            rebuild: 为True时总是重新导入
+
+        Returns:
+            SQLiteDataLoader: self
+        """
+        paths = (cast_data_path, cast_works_path, works_data_path)
+        fingerprint = _source_fingerprint(paths) if all(os.path.exists(path) for path in paths) else None
+        if rebuild or not self._is_current(fingerprint):
+            if fingerprint is None:
+                # 与 DataLoader 相同的文件检查和报错
+                DataLoader().load_data(*paths)
+            self.ingest(*paths)
+        return self.open()
+
+    def _is_current(self, fingerprint: Optional[str]) -> bool:
+        """数据库存在、版本一致，且与源文件一致（源文件不存在时只要求数据库存在）"""
+        if not os.path.exists(self.db_path):
+            return False
+        try:
+            with contextlib.closing(sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)) as connection:
+                meta = dict(connection.execute('SELECT key, value FROM meta'))
+        except sqlite3.DatabaseError:
+            return False
+        if meta.get('schema_version') != str(SCHEMA_VERSION):
+            return False
+        return fingerprint is None or meta.get('source') == fingerprint
+
+    def ingest(self, cast_data_path: str, cast_works_path: str, works_data_path: str) -> None:
+        """
+        把 CSV 导入数据库（写入临时文件后替换），导入期间才会把数据读入内存
+
+        Args:
+            cast_data_path: 演员表CSV文件路径
+            cast_works_path: 演员作品关系表CSV文件路径
+            works_data_path: 作品表CSV文件路径
+        """
+        self.close()
+        with contextlib.redirect_stdout(io.StringIO()):
+            cast_data_df, cast_works_df, works_data_df = DataLoader().load_data(
+                cast_data_path, cast_works_path, works_data_path
+            )
+        index = CastIndex(cast_works_df)
+        genre_matrix = index.genre_matrix.tocoo()
+        # DataLoader 中各列的类型，查询结果按此恢复（同名列在各表中类型相同）
+        dtypes = {}
+        for frame in (cast_data_df, cast_works_df, works_data_df,
+                      index.genre_statistics(), index.role_statistics.reset_index()):
+            for column, dtype in frame.dtypes.items():
+                dtypes.setdefault(column, str(dtype))
+
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = self.db_path + '.tmp'
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        with contextlib.closing(sqlite3.connect(tmp)) as connection:
+            connection.execute('PRAGMA journal_mode = OFF')
+            connection.execute('PRAGMA synchronous = OFF')
+            cast_data_df.to_sql('cast_data', connection, index=False, chunksize=50000)
+            cast_works_df.to_sql('cast_works', connection, index=False, chunksize=50000)
+            works_data_df.to_sql('works_data', connection, index=False, chunksize=50000)
+            pd.DataFrame({
+                'work_id': index.work_ids[genre_matrix.row],
+                'genre_code': genre_matrix.col,
+                'work_year': index.work_year[genre_matrix.row],
+            }).to_sql('work_genres', connection, index=False, chunksize=50000)
+            pd.DataFrame({'genre': index.genre_names}).to_sql('genres', connection, index=False)
+            index.genre_statistics().to_sql('genre_statistics', connection, index=False)
+            index.role_statistics.to_sql('role_statistics', connection, index=True)
+            for statement in _INDEXES:
+                connection.execute(statement)
+            pd.DataFrame({
+                'key': ['schema_version', 'source', 'dtypes'],
+                'value': [str(SCHEMA_VERSION),
+                          _source_fingerprint((cast_data_path, cast_works_path, works_data_path)),
+                          json.dumps(dtypes, ensure_ascii=False)],
+            }).to_sql('meta', connection, index=False)
+            connection.commit()
+            connection.execute('ANALYZE')
+        os.replace(tmp, self.db_path)
+        print(f"已导入SQLite数据库: {self.db_path}（演员 {len(cast_data_df)}，"
+              f"关系 {len(cast_works_df)}，作品 {len(works_data_df)}）")
+
+    def open(self) -> 'SQLiteDataLoader':
+        """以只读方式打开数据库"""
+        if self._connection is None:
+            if not os.path.exists(self.db_path):
+                raise FileNotFoundError(f"数据库文件不存在: {self.db_path}")
+            self._connection = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True,
+                                               check_same_thread=False, cached_statements=256)
+            self._connection.execute(f'PRAGMA cache_size = -{int(self.cache_size_kb)}')
+            self._connection.execute('PRAGMA query_only = ON')
+            dtypes = self._rows("SELECT value FROM meta WHERE key = 'dtypes'")
+            self._dtypes = json.loads(dtypes[0][0]) if dtypes else {}
+        return self
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        self._genre_names = None
+        self._roles = None
+        self._dtypes = {}
+
+    def __enter__(self) -> 'SQLiteDataLoader':
+        return self.open()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _query(self, sql: str, params: Sequence = ()) -> pd.DataFrame:
+        """
+        执行查询并返回 DataFrame；同一条 SQL 的预编译语句由连接缓存复用
+        列转换为 DataLoader 中的类型：SQLite 返回的 None 在浮点列中为 NaN，空结果的列类型也相同
+        """
+        if self._connection is None:
+            raise ValueError("请先加载数据")
+        cursor = self._connection.execute(sql, [_param(value) for value in params])
+        columns = [column[0] for column in cursor.description]
+        result = pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+        for column in columns:
+            dtype = self._dtypes.get(column, 'object')
+            if dtype != 'object' and str(result[column].dtype) != dtype:
+                result[column] = result[column].astype(dtype)
+        return result
+
+    def _rows(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        if self._connection is None:
+            raise ValueError("请先加载数据")
+        return self._connection.execute(sql, [_param(value) for value in params]).fetchall()
+
+    @property
+    def genre_names(self) -> np.ndarray:
+        """所有题材（已排序）"""
+        if self._genre_names is None:
+            self._genre_names = np.array([row[0] for row in self._rows('SELECT genre FROM genres ORDER BY rowid')],
+                                         dtype=object)
+        return self._genre_names
+
+    def get_actor_by_name(self, cast_name: str) -> pd.DataFrame:
+        """根据演员姓名查找演员信息"""
+        return self._query('SELECT * FROM cast_data WHERE cast_name = ? ORDER BY rowid', (cast_name,))
+
+    def get_actors_by_name_with_selection(self, cast_name: str) -> pd.DataFrame:
+        """
+        根据演员姓名查找演员信息，处理重名情况
+
+        Args:
+            cast_name: 演员姓名
+
+        Returns:
+            pd.DataFrame: 所有匹配的演员信息，包含cast_name, cast_id, main_works
+        """
+        result = self._query('SELECT cast_name, cast_id, main_works FROM cast_data '
+                             'WHERE cast_name = ? ORDER BY rowid', (cast_name,))
+        if result.empty:
+            print(f"未找到演员: {cast_name}")
+            return pd.DataFrame()
+
+        if len(result) > 1:
+            print(f"找到 {len(result)} 个同名演员 '{cast_name}':")
+            print("请选择正确的演员:")
+            for idx, row in result.iterrows():
+                print(f"  {idx + 1}. ID: {row['cast_id']} - 代表作: {row['main_works']}")
+        return result
+
+    def get_actor_works(self, cast_id) -> pd.DataFrame:
+        """根据演员ID获取该演员的所有作品"""
+        return self._query('SELECT * FROM cast_works WHERE cast_id = ? ORDER BY rowid', (cast_id,))
+
+    def get_work_cast(self, work_id) -> pd.DataFrame:
+        """根据作品ID获取该作品的所有演职员"""
+        return self._query('SELECT * FROM cast_works WHERE work_id = ? ORDER BY rowid', (work_id,))
+
+    def get_cast_collaboration_data(self, cast_name: str) -> pd.DataFrame:
+        """
+        获取指定演员的所有合作数据，重名时提示改用 get_cast_collaboration_data_by_id
+
+        Args:
+            cast_name: 演员姓名
+
+        Returns:
+            pd.DataFrame: 该演员所有作品的完整cast数据
+        """
+        actor_matches = self.get_actors_by_name_with_selection(cast_name)
+        if actor_matches.empty:
+            raise ValueError(f"未找到演员: {cast_name}")
+
+        if len(actor_matches) > 1:
+            print(f"\n警告: 找到多个同名演员 '{cast_name}'")
+            print("请使用 get_cast_collaboration_data_by_id(cast_id) 方法，并提供具体的 cast_id")
+            return pd.DataFrame()
+
+        return self._collaboration_data(actor_matches.iloc[0]['cast_id'], cast_name)
+
+    def get_cast_collaboration_data_by_id(self, cast_id,
+                                          include_roles: List[str] = None) -> pd.DataFrame:
+        """
+        根据演员ID获取合作数据
+
+        Args:
+            cast_id: 演员ID
+            include_roles: 要包含的职能列表，如 ['演员', '导演']。如果为None则包含所有职能
+
+        Returns:
+            pd.DataFrame: 该演员所有作品的完整cast数据
+        """
+        names = self._rows('SELECT cast_name FROM cast_data WHERE cast_id = ? ORDER BY rowid LIMIT 1', (cast_id,))
+        if not names:
+            raise ValueError(f"未找到演员ID: {cast_id}")
+        return self._collaboration_data(cast_id, names[0][0], include_roles)
+
+    def _collaboration_data(self, cast_id, cast_name: str,
+                            include_roles: List[str] = None) -> pd.DataFrame:
+        n_works = self._rows('SELECT COUNT(DISTINCT work_id) FROM cast_works WHERE cast_id = ?', (cast_id,))[0][0]
+        if n_works == 0:
+            print(f"演员 {cast_name} (ID: {cast_id}) 没有作品记录")
+            return pd.DataFrame()
+
+        if include_roles is None:
+            collaboration_data = self._query(_COLLABORATION_SQL.format(role_filter=''), (cast_id,))
+        else:
+            placeholders = ', '.join('?' * len(include_roles))
+            sql = _COLLABORATION_SQL.format(role_filter=f' AND cast_role IN ({placeholders})')
+            collaboration_data = self._query(sql, (cast_id, *include_roles))
+            print(f"职能筛选: 保留 {len(collaboration_data)} 条记录 (保留职能: {', '.join(include_roles)})")
+
+        print(f"演员 {cast_name} (ID: {cast_id}) 共参演 {n_works} 部作品，涉及 {len(collaboration_data)} 条演员记录")
+        return collaboration_data
+
+    def search_actors(self, keyword: str, limit: int = 10) -> pd.DataFrame:
+        """
+        搜索演员（姓名包含关键词，不区分大小写，不支持正则表达式）
+
+        Args:
+            keyword: 搜索关键词
+            limit: 返回结果数量限制
+
+        Returns:
+            pd.DataFrame: 搜索结果
+        """
+        pattern = '%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return self._query("SELECT * FROM cast_data WHERE cast_name LIKE ? ESCAPE '\\' "
+                           "ORDER BY rowid LIMIT ?", (pattern, limit))
+
+    def get_available_roles(self) -> List[str]:
+        """获取数据中所有可用的职能类型（已排序）"""
+        if self._roles is None:
+            self._roles = sorted(row[0] for row in self._rows('SELECT cast_role FROM role_statistics'))
+        return list(self._roles)
+
+    def get_role_statistics(self) -> pd.DataFrame:
+        """获取职能统计信息（导入时预先计算）"""
+        return self._query('SELECT * FROM role_statistics ORDER BY rowid').set_index('cast_role')
+
+    def get_genres_statistics(self) -> pd.DataFrame:
+        """获取作品题材统计信息（导入时预先计算）"""
+        return self._query('SELECT * FROM genre_statistics ORDER BY rowid')
+
+    def get_genre_cooccurrence(self, start_year: Optional[int] = None,
+                               end_year: Optional[int] = None) -> pd.DataFrame:
+        """
+        获取题材共现矩阵
+
+        Args:
+            start_year: 起始年份（含），None表示不限
+            end_year: 结束年份（含），None表示不限
+
+        Returns:
+            pd.DataFrame: 题材 x 题材，值为同时属于两个题材的作品数，对角线为该题材的作品数
+        """
+        names = self.genre_names
+        matrix = np.zeros((len(names), len(names)), dtype=np.int64)
+        rows = self._rows(_GENRE_COOCCURRENCE_SQL,
+                          (start_year, end_year, start_year, start_year, end_year, end_year))
+        if rows:
+            a, b, counts = map(np.array, zip(*rows))
+            matrix[a, b] = counts
+        return pd.DataFrame(matrix, index=names, columns=names)
+
+    def get_actor_genre_profile(self, cast_id, normalize: bool = False) -> pd.Series:
+        """
+        获取演员的题材分布
+
+        Args:
+            cast_id: 演员ID
+            normalize: 是否换算为占比
+
+        Returns:
+            pd.Series: 题材 -> 作品数（或占比），按降序排列，不含数量为0的题材
+        """
+        if not self._rows('SELECT 1 FROM cast_works WHERE cast_id = ? LIMIT 1', (cast_id,)):
+            raise ValueError(f"未找到演员ID: {cast_id}")
+
+        rows = sorted(self._rows(_ACTOR_GENRE_SQL, (cast_id,)))
+        codes = np.array([code for code, _ in rows], dtype=np.int64)
+        counts = np.array([count for _, count in rows], dtype=np.int64)
+        profile = pd.Series(counts, index=self.genre_names[codes], name=cast_id)
+        profile = profile.sort_values(ascending=False, kind='stable')
+        if normalize and profile.sum() > 0:
+            profile = profile / profile.sum()
+        return profile
@@ -3,53 +3,225 @@
 Network Visualization Module
 """
 
+import contextlib
+import io
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import seaborn as sns
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import numpy as np
-from typing import Dict, List, Optional
+import scipy.sparse as sp
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .cast_index import get_index
+from .compact_graph import CompactGraph
+from .layout import LayoutCache, fast_layout
+from .exporters import export_graph
+from .network_builder import NetworkBuilder, edge_work_attributes
+
+# 批量渲染工作进程的状态（数据、构建器、可视化器），只由 _init_batch_worker 在工作进程中设置
+_BATCH_STATE: Dict = {}
+
+
+def _batch_state(cast_data_df: pd.DataFrame, cast_works_df: pd.DataFrame, options: Dict) -> Dict:
+    """一次批量渲染的状态：数据、渲染选项、构建器和可视化器"""
+    return {'cast_data_df': cast_data_df, 'cast_works_df': cast_works_df, 'options': options,
+            'builder': NetworkBuilder(), 'visualizer': NetworkVisualizer()}
+
+
+def _init_batch_worker(cast_data_df: pd.DataFrame, cast_works_df: pd.DataFrame, options: Dict) -> None:
+    """批量渲染工作进程的初始化：每个进程只接收一次数据"""
+    _BATCH_STATE.update(_batch_state(cast_data_df, cast_works_df, options))
+
+
+def _render_batch_item(cast_id) -> Dict:
+    """工作进程中渲染一位演员，构建和绘图过程中的提示信息被丢弃"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _render_item(_BATCH_STATE, cast_id)
+
+
+def _render_item(state: Dict, cast_id) -> Dict:
+    """
+    渲染一位演员的网络图，返回耗时、内存和输出文件
+
+    单个演员失败不影响其他演员。
+    """
+    options = state['options']
+    record = {'cast_id': cast_id, 'status': 'ok', 'nodes': 0, 'edges': 0, 'files': [], 'error': None,
+              'pid': os.getpid()}
+    start = time.perf_counter()
+    if options['track_memory']:
+        tracemalloc.start()
+    fig = None
+    try:
+        G = state['builder'].build_actor_network_by_id(
+            cast_id, state['cast_data_df'], state['cast_works_df'], **options['network_options']
+        )
+        if G.number_of_nodes() == 0:
+            raise ValueError(f"演员ID {cast_id} 的网络为空")
+        record['nodes'], record['edges'] = G.number_of_nodes(), G.number_of_edges()
+        layout_options = {key: options[key] for key in ('layout', 'seed', 'iterations')}
+        if {'png', 'svg'} & set(options['formats']):
+            fig = state['visualizer'].render_network_figure(G, figsize=options['figsize'], **layout_options)
+        for fmt in options['formats']:
+            path = os.path.join(options['output_dir'], f"{cast_id}.{fmt}")
+            if fmt == 'html':
+                target = next((node for node, data in G.nodes(data=True)
+                               if data.get('node_type') == 'target'), cast_id)
+                state['visualizer'].plot_interactive_network(
+                    G, title=f"{target} 合作网络", **layout_options
+                ).write_html(path, include_plotlyjs='cdn')
+            else:
+                fig.savefig(path, format=fmt, dpi=options['dpi'], bbox_inches='tight')
+            record['files'].append(path)
+    except Exception as error:
+        record['status'] = 'error'
+        record['error'] = f"{type(error).__name__}: {error}"
+    finally:
+        if fig is not None:
+            fig.clear()
+        record['seconds'] = time.perf_counter() - start
+        if options['track_memory']:
+            record['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            tracemalloc.stop()
+        if resource is not None:
+            # Linux 上 ru_maxrss 以 KB 为单位
+            record['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return record
 
 class NetworkVisualizer:
     """网络可视化器"""
     
-    def __init__(self):
+    # spring 布局超过该节点数时自动改用 Barnes-Hut 多层布局
+    FAST_LAYOUT_THRESHOLD = 1000
+    # 交互式网络超过该边数时自动启用大图模式
+    LARGE_GRAPH_EDGES = 5000
+    
+    def __init__(self, layout_cache: Optional[LayoutCache] = None):
+        """
+        Args:
+            layout_cache: 布局缓存，None表示每次重新计算布局
+        """
         plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
         plt.rcParams['axes.unicode_minus'] = False
+        self.layout_cache = layout_cache
     
-    def plot_network(self, G: nx.Graph, figsize: tuple = (12, 8), 
+    def compute_layout(self, G: nx.Graph, layout: str = 'spring', seed: Optional[int] = None,
+                       iterations: int = 50, warm_start: bool = True) -> Dict:
+        """
+        计算节点坐标（设置了布局缓存时优先读取缓存）
+        
+        Args:
+            G: 网络图
+            layout: 布局算法 ('spring', 'barnes_hut', 'circular', 'kamada_kawai', 'random')
+            seed: 随机种子，相同种子得到相同布局
+            iterations: 力导向布局的迭代次数
+            warm_start: 没有完全相同的缓存时，力导向布局是否从相近图的缓存布局出发
+            
+        Returns:
+            Dict: {节点: 坐标}
+        """
+        if layout == 'spring' and G.number_of_nodes() > self.FAST_LAYOUT_THRESHOLD:
+            print(f"节点数 {G.number_of_nodes()} 超过 {self.FAST_LAYOUT_THRESHOLD}，改用 Barnes-Hut 布局")
+            layout = 'barnes_hut'
+        
+        def compute(graph, initial=None):
+            if layout == 'spring':
+                return nx.spring_layout(graph, k=1, iterations=iterations, seed=seed, pos=initial)
+            elif layout == 'barnes_hut':
+                return fast_layout(graph, iterations=iterations, seed=seed, initial=initial)
+            elif layout == 'circular':
+                return nx.circular_layout(graph)
+            elif layout == 'kamada_kawai':
+                return nx.kamada_kawai_layout(graph)
+            else:
+                return nx.random_layout(graph, seed=seed)
+        
+        if self.layout_cache is None:
+            return compute(G)
+        params = {'layout': layout, 'seed': seed, 'iterations': iterations}
+        return self.layout_cache.layout(
+            G, compute, params, warm_start=warm_start and layout in ('spring', 'barnes_hut')
+        )
+    
+    def plot_network(self, G: Union[nx.Graph, CompactGraph], figsize: tuple = (12, 8), 
                     node_size_factor: int = 300, edge_width_factor: float = 0.5,
-                    layout: str = 'spring', save_path: Optional[str] = None) -> None:
+                    layout: str = 'spring', save_path: Optional[str] = None,
+                    seed: Optional[int] = None, iterations: int = 50) -> None:
         """
         使用matplotlib可视化网络
         
         Args:
-            G: 网络图
+            G: 网络图（可以是 extract_backbone() 得到的骨干网络；CompactGraph 只绘制有边的节点）
             figsize: 图形大小
             node_size_factor: 节点大小因子
             edge_width_factor: 边宽度因子
-            layout: 布局算法 ('spring', 'circular', 'kamada_kawai', 'random')
+            layout: 布局算法 ('spring', 'barnes_hut', 'circular', 'kamada_kawai', 'random')
             save_path: 保存路径
+            seed: 布局的随机种子
+            iterations: 力导向布局的迭代次数
         """
+        if isinstance(G, CompactGraph):
+            G = G.to_networkx()
         if G.number_of_nodes() == 0:
             print("网络为空，无法可视化")
             return
         
-        plt.figure(figsize=figsize)
+        fig = plt.figure(figsize=figsize)
         
         # 选择布局算法
-        if layout == 'spring':
-            pos = nx.spring_layout(G, k=1, iterations=50)
-        elif layout == 'circular':
-            pos = nx.circular_layout(G)
-        elif layout == 'kamada_kawai':
-            pos = nx.kamada_kawai_layout(G)
-        else:
-            pos = nx.random_layout(G)
+        pos = self.compute_layout(G, layout, seed, iterations)
+        self._draw_network(G, pos, fig.gca(), node_size_factor, edge_width_factor)
+        
+        if save_path:
+            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            print(f"网络图已保存到: {save_path}")
+        
+        plt.show()
+    
+    def render_network_figure(self, G: Union[nx.Graph, CompactGraph], figsize: tuple = (12, 8),
+                              node_size_factor: int = 300, edge_width_factor: float = 0.5,
+                              layout: str = 'spring', seed: Optional[int] = None,
+                              iterations: int = 50) -> Optional[Figure]:
+        """
+        绘制网络到独立的 Figure 对象（Agg 画布，不经过 pyplot 全局状态，可在无界面环境和多进程中使用）
+        
+        参数同 plot_network。调用方负责保存，用完后 fig.clear() 释放。
+        
+        Returns:
+            Optional[Figure]: matplotlib Figure，网络为空时返回None
+        """
+        if isinstance(G, CompactGraph):
+            G = G.to_networkx()
+        if G.number_of_nodes() == 0:
+            print("网络为空，无法可视化")
+            return None
         
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        pos = self.compute_layout(G, layout, seed, iterations)
+        self._draw_network(G, pos, fig.add_subplot(), node_size_factor, edge_width_factor)
+        return fig
+    
+    @staticmethod
+    def _draw_network(G: nx.Graph, pos: Dict, ax, node_size_factor: int,
+                      edge_width_factor: float) -> None:
+        """在给定的坐标轴上绘制网络"""
         # 设置节点颜色和大小
         node_colors = []
         node_sizes = []
@@ -70,45 +242,116 @@ class NetworkVisualizer:
         
         # 绘制网络
         nx.draw_networkx_nodes(G, pos, node_color=node_colors, 
-                              node_size=node_sizes, alpha=0.8)
+                              node_size=node_sizes, alpha=0.8, ax=ax)
         
         nx.draw_networkx_edges(G, pos, width=edge_widths, 
-                              alpha=0.6, edge_color='gray')
+                              alpha=0.6, edge_color='gray', ax=ax)
         
         # 添加标签（只显示度数较高的节点标签）
         degrees = dict(G.degree())
         high_degree_nodes = {n: n for n, d in degrees.items() if d >= np.percentile(list(degrees.values()), 70)}
         
         nx.draw_networkx_labels(G, pos, labels=high_degree_nodes, 
-                               font_size=8, font_weight='bold')
+                               font_size=8, font_weight='bold', ax=ax)
         
-        plt.title(f"演员合作网络\n节点数: {G.number_of_nodes()}, 边数: {G.number_of_edges()}", 
-                 fontsize=14, fontweight='bold')
-        plt.axis('off')
+        ax.set_title(f"演员合作网络\n节点数: {G.number_of_nodes()}, 边数: {G.number_of_edges()}", 
+                     fontsize=14, fontweight='bold')
+        ax.axis('off')
+    
+    def render_batch(self, cast_ids: Iterable, cast_data_df: pd.DataFrame, cast_works_df: pd.DataFrame,
+                     output_dir: str, formats: Sequence[str] = ('png',), processes: Optional[int] = None,
+                     network_options: Optional[Dict] = None, figsize: tuple = (12, 8), dpi: int = 150,
+                     layout: str = 'spring', seed: Optional[int] = 42, iterations: int = 50,
+                     track_memory: bool = False) -> pd.DataFrame:
+        """
+        批量渲染演员合作网络（无界面，多进程）
         
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"网络图已保存到: {save_path}")
+        每位演员输出 <output_dir>/<cast_id>.<格式>。PNG/SVG 由 render_network_figure 在 Agg 画布上绘制，
+        不经过 pyplot 全局状态，绘制后立即释放；HTML 为交互式网络（plotly.js 从CDN加载）。
+        每个工作进程只接收一次数据。布局缓存不在进程间共享。
         
-        plt.show()
+        Args:
+            cast_ids: 演员ID列表
+            cast_data_df: 演员基本信息数据
+            cast_works_df: 演员作品关系数据
+            output_dir: 输出目录
+            formats: 输出格式，'png'、'svg'、'html' 的任意组合
+            processes: 进程数，None表示CPU核数，1表示在当前进程中顺序执行（构建和绘图的提示信息照常输出）
+            network_options: 传给 build_actor_network_by_id 的参数，如 include_roles、start_year
+            figsize: 图形大小
+            dpi: PNG 分辨率
+            layout: 布局算法，同 compute_layout
+            seed: 布局的随机种子，固定后重复渲染的图片相同
+            iterations: 力导向布局的迭代次数
+            track_memory: 是否用 tracemalloc 记录每位演员的峰值内存（绘图耗时约增加一倍）
+            
+        Returns:
+            pd.DataFrame: 每位演员一行：cast_id、status（ok/error）、nodes、edges、files、error、
+            pid、seconds、peak_memory_mb（track_memory 时）、max_rss_mb（工作进程的最大常驻内存，非Windows）
+        """
+        unknown = set(formats) - {'png', 'svg', 'html'}
+        if unknown:
+            raise ValueError(f"不支持的输出格式: {sorted(unknown)}，可选: png, svg, html")
+        cast_ids = list(cast_ids)
+        os.makedirs(output_dir, exist_ok=True)
+        options = {
+            'output_dir': output_dir, 'formats': list(formats), 'network_options': network_options or {},
+            'figsize': figsize, 'dpi': dpi, 'layout': layout, 'seed': seed, 'iterations': iterations,
+            'track_memory': track_memory,
+        }
+        
+        start = time.perf_counter()
+        if processes == 1:
+            # 在当前进程中执行时使用局部状态，不修改模块全局状态和 sys.stdout，可被多个线程同时调用
+            state = _batch_state(cast_data_df, cast_works_df, options)
+            records = [_render_item(state, cast_id) for cast_id in cast_ids]
+        else:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_batch_worker,
+                                     initargs=(cast_data_df, cast_works_df, options)) as executor:
+                chunksize = max(1, len(cast_ids) // (4 * (processes or os.cpu_count() or 1)))
+                records = list(executor.map(_render_batch_item, cast_ids, chunksize=chunksize))
+        
+        report = pd.DataFrame(records)
+        succeeded = int((report['status'] == 'ok').sum()) if len(report) else 0
+        print(f"批量渲染完成: 成功 {succeeded}/{len(cast_ids)}，总耗时 {time.perf_counter() - start:.1f} 秒")
+        return report
     
-    def plot_interactive_network(self, G: nx.Graph, title: str = "演员合作网络") -> go.Figure:
+    def plot_interactive_network(self, G: Union[nx.Graph, CompactGraph], title: str = "演员合作网络",
+                                 layout: str = 'spring', seed: Optional[int] = None,
+                                 iterations: int = 50, large_graph: Optional[bool] = None,
+                                 max_edges: int = 20000, min_edge_weight: float = 0,
+                                 label_top: int = 50) -> go.Figure:
         """
         使用plotly创建交互式网络可视化
         
         Args:
-            G: 网络图
+            G: 网络图（可以是 extract_backbone() 得到的骨干网络；CompactGraph 只绘制有边的节点）
             title: 图表标题
+            layout: 布局算法，同 compute_layout
+            seed: 布局的随机种子
+            iterations: 力导向布局的迭代次数
+            large_graph: 是否使用大图模式（WebGL + 细节层次裁剪），None表示边数超过
+                LARGE_GRAPH_EDGES 时自动启用
+            max_edges: 大图模式最多绘制的边数，按权重保留
+            min_edge_weight: 大图模式中权重低于该值的边不绘制
+            label_top: 大图模式中显示姓名标签的节点数（按加权度）
             
         Returns:
             go.Figure: plotly图表对象
         """
+        if isinstance(G, CompactGraph):
+            G = G.to_networkx()
         if G.number_of_nodes() == 0:
             print("网络为空，无法可视化")
             return None
         
         # 计算布局
-        pos = nx.spring_layout(G, k=1, iterations=50)
+        pos = self.compute_layout(G, layout, seed, iterations)
+        
+        if large_graph is None:
+            large_graph = G.number_of_edges() > self.LARGE_GRAPH_EDGES
+        if large_graph:
+            return self._plot_large_network(G, pos, title, max_edges, min_edge_weight, label_top)
         
         # 准备节点数据
         node_x = []
@@ -151,7 +394,7 @@ class NetworkVisualizer:
             edge_y.extend([y0, y1, None])
             
             weight = data.get('weight', 1)
-            works = data.get('works', [])
+            works = edge_work_attributes(G, data).get('works', [])
             edge_text.append(f"合作次数: {weight}<br>作品: {', '.join(works[:3])}" + 
                            ("..." if len(works) > 3 else ""))
         
@@ -174,33 +417,103 @@ class NetworkVisualizer:
                                          line=dict(width=2, color='white')))
         
         # 创建图表
-        fig = go.Figure(data=[edge_trace, node_trace],
-                       layout=go.Layout(
-                           title=title,
-                           titlefont_size=16,
-                           showlegend=False,
-                           hovermode='closest',
-                           margin=dict(b=20,l=5,r=5,t=40),
-                           annotations=[ dict(
-                               text="",
-                               showarrow=False,
-                               xref="paper", yref="paper",
-                               x=0.005, y=-0.002 ) ],
-                           xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-                           yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-                           width=800,
-                           height=600))
+        fig = go.Figure(data=[edge_trace, node_trace], layout=self._network_layout(title))
         
         return fig
     
-    def plot_degree_distribution(self, G: nx.Graph, figsize: tuple = (10, 6)) -> None:
+    @staticmethod
+    def _network_layout(title: str) -> go.Layout:
+        """网络图的公共版式"""
+        return go.Layout(
+            title=dict(text=title, font=dict(size=16)),
+            showlegend=False,
+            hovermode='closest',
+            margin=dict(b=20,l=5,r=5,t=40),
+            annotations=[ dict(
+                text="",
+                showarrow=False,
+                xref="paper", yref="paper",
+                x=0.005, y=-0.002 ) ],
+            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            width=800,
+            height=600)
+    
+    def _plot_large_network(self, G: nx.Graph, pos: Dict, title: str, max_edges: int,
+                            min_edge_weight: float, label_top: int) -> go.Figure:
+        """
+        大图模式：WebGL (Scattergl) 绘制，坐标数组用 NumPy 一次生成
+        
+        细节层次裁剪：去掉权重低于 min_edge_weight 的边，再按权重保留前 max_edges 条，
+        但每个节点权重最大的边总是保留，避免节点看起来是孤立的。边按权重分三档，
+        每档一个 trace，线宽和透明度不同。只有加权度最高的 label_top 个节点显示标签。
+        """
+        nodes = list(G.nodes())
+        coords = np.array([pos[node] for node in nodes], dtype=np.float32).reshape(-1, 2)
+        adjacency = nx.to_scipy_sparse_array(G, nodelist=nodes, weight='weight', format='csr')
+        upper = sp.triu(adjacency, k=1).tocoo()
+        rows, cols, weights = upper.row, upper.col, upper.data.astype(np.float64)
+        strength = np.asarray(adjacency.sum(axis=1)).ravel()
+        degree = np.diff(adjacency.indptr)
+        
+        keep = weights >= min_edge_weight
+        if keep.sum() > max_edges:
+            candidates = np.flatnonzero(keep)
+            top = candidates[np.argpartition(-weights[candidates], max_edges - 1)[:max_edges]]
+            keep = np.zeros(len(weights), dtype=bool)
+            keep[top] = True
+            # 每个节点最强的边
+            ends = np.concatenate((rows, cols))
+            edge = np.concatenate((np.arange(len(rows)), np.arange(len(rows))))
+            order = np.lexsort((-weights[edge], ends))
+            first = np.concatenate(([True], ends[order][1:] != ends[order][:-1]))
+            strongest = edge[order][first]
+            keep[strongest[weights[strongest] >= min_edge_weight]] = True
+        print(f"大图模式: 绘制 {int(keep.sum())}/{len(weights)} 条边")
+        rows, cols, weights = rows[keep], cols[keep], weights[keep]
+        
+        traces = []
+        bounds = np.unique(np.quantile(weights, [0, 0.5, 0.9, 1.0])) if len(weights) else []
+        for tier, (low, high) in enumerate(zip(bounds[:-1], bounds[1:])):
+            last = tier == len(bounds) - 2
+            in_tier = (weights >= low) & ((weights <= high) if last else (weights < high))
+            # 每条边 [起点, 终点, NaN]，NaN 使线段断开
+            segment = np.full((int(in_tier.sum()), 3, 2), np.nan, dtype=np.float32)
+            segment[:, 0] = coords[rows[in_tier]]
+            segment[:, 1] = coords[cols[in_tier]]
+            traces.append(go.Scattergl(x=segment[:, :, 0].ravel(), y=segment[:, :, 1].ravel(),
+                                       mode='lines', hoverinfo='none',
+                                       line=dict(width=0.5 + tier, color='#888'),
+                                       opacity=0.25 + 0.25 * tier))
+        
+        names = [str(data.get('cast_name', node)) for node, data in G.nodes(data=True)]
+        targets = np.array([data.get('node_type') == 'target' for _, data in G.nodes(data=True)])
+        size = 4 + 16 * np.sqrt(strength / strength.max()) if strength.max() > 0 else np.full(len(nodes), 6.0)
+        size[targets] = 30
+        hover = [f"{name}<br>连接数: {d}<br>合作强度: {w:g}"
+                 for name, d, w in zip(names, degree.tolist(), strength.tolist())]
+        traces.append(go.Scattergl(x=coords[:, 0], y=coords[:, 1], mode='markers',
+                                   hoverinfo='text', hovertext=hover,
+                                   marker=dict(color=np.where(targets, '#FF6B6B', '#4ECDC4'),
+                                               size=size.astype(np.float32), line=dict(width=0))))
+        
+        labelled = np.argsort(-strength, kind='stable')[:label_top]
+        traces.append(go.Scattergl(x=coords[labelled, 0], y=coords[labelled, 1], mode='text',
+                                   text=[names[i] for i in labelled.tolist()], hoverinfo='none',
+                                   textposition='top center', textfont=dict(size=10)))
+        
+        return go.Figure(data=traces, layout=self._network_layout(title))
+    
+    def plot_degree_distribution(self, G: Union[nx.Graph, CompactGraph], figsize: tuple = (10, 6)) -> None:
         """
         绘制度分布图
         
         Args:
-            G: 网络图
+            G: 网络图（可以是 extract_backbone() 得到的骨干网络；CompactGraph 只绘制有边的节点）
             figsize: 图形大小
         """
+        if isinstance(G, CompactGraph):
+            G = G.to_networkx()
         degrees = [G.degree(n) for n in G.nodes()]
         
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=figsize)
@@ -229,95 +542,154 @@ class NetworkVisualizer:
         plt.tight_layout()
         plt.show()
     
+    @staticmethod
+    def _shared_work_incidence(collaborations: List[Dict]) -> Tuple[sp.csr_matrix, np.ndarray]:
+        """
+        合作者 x 作品 的二值关联矩阵，列为与目标演员的共同作品（由 work_ids 一次生成）
+        
+        Returns:
+            Tuple[sp.csr_matrix, np.ndarray]: 关联矩阵和各列的作品ID
+        """
+        lengths = np.array([len(c['work_ids']) for c in collaborations], dtype=np.int64)
+        flat = [work_id for c in collaborations for work_id in c['work_ids']]
+        work_codes, work_ids = pd.factorize(pd.Series(flat, dtype=object))
+        matrix = sp.csr_matrix(
+            (np.ones(len(flat), dtype=np.int32), (np.repeat(np.arange(len(collaborations)), lengths), work_codes)),
+            shape=(len(collaborations), len(work_ids))
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return matrix, np.asarray(work_ids)
+    
+    def collaboration_matrix(self, collaborations: List[Dict], top_n: int = 20,
+                             cast_works_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        前N位合作者两两之间的共同作品数
+        
+        Args:
+            collaborations: get_collaboration_frequency 的结果（按合作频率降序）
+            top_n: 合作者数量
+            cast_works_df: 演员作品关系数据。给定时统计全部作品（从索引切出这些演员的行）；
+                None时只统计与目标演员的共同作品（由 work_ids 计算）
+            
+        Returns:
+            pd.DataFrame: N x N 矩阵，行列为合作者姓名，对角线为0
+        """
+        top = collaborations[:top_n]
+        names = [c['collaborator'] for c in top]
+        if cast_works_df is not None:
+            index = get_index(cast_works_df)
+            codes = index.actor_codes([c['cast_id'] for c in top])
+            if (codes < 0).any():
+                raise ValueError("合作数据中的演员ID不在 cast_works_df 中")
+            matrix = index.pair_cocredits(codes)
+        else:
+            incidence, _ = self._shared_work_incidence(top)
+            matrix = (incidence @ incidence.T).toarray()
+            np.fill_diagonal(matrix, 0)
+        return pd.DataFrame(matrix, index=names, columns=names)
+    
+    def collaboration_timeline(self, collaborations: List[Dict],
+                               cast_works_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        合作者 x 年份 矩阵：每位合作者每年与目标演员的共同作品数
+        
+        Args:
+            collaborations: get_collaboration_frequency 的结果
+            cast_works_df: 演员作品关系数据，用于查询作品年份。None时只能由每位合作者的
+                years 得到是否在该年合作（0/1）
+            
+        Returns:
+            pd.DataFrame: 行为合作者姓名（与 collaborations 顺序相同），列为年份
+        """
+        names = [c['collaborator'] for c in collaborations]
+        if cast_works_df is not None:
+            index = get_index(cast_works_df)
+            incidence, work_ids = self._shared_work_incidence(collaborations)
+            codes = index.work_codes(work_ids)
+            years = np.where(codes >= 0, index.work_year[codes], np.nan)
+            dated = np.flatnonzero(~np.isnan(years))
+            year_values, year_of_work = np.unique(years[dated], return_inverse=True)
+            by_year = sp.csr_matrix((np.ones(len(dated), dtype=np.int32), (dated, year_of_work)),
+                                    shape=(len(work_ids), len(year_values)))
+            matrix = (incidence @ by_year).toarray()
+        else:
+            lengths = np.array([len(c['years']) for c in collaborations], dtype=np.int64)
+            flat = np.array([year for c in collaborations for year in c['years']], dtype=float)
+            rows = np.repeat(np.arange(len(collaborations)), lengths)
+            dated = ~np.isnan(flat)
+            year_values, year_of_row = np.unique(flat[dated], return_inverse=True)
+            matrix = sp.csr_matrix((np.ones(int(dated.sum()), dtype=np.int32), (rows[dated], year_of_row)),
+                                   shape=(len(collaborations), len(year_values))).toarray()
+        return pd.DataFrame(matrix, index=names, columns=year_values.astype(int))
+    
     def plot_collaboration_heatmap(self, collaborations: List[Dict], 
-                                 figsize: tuple = (12, 8)) -> None:
+                                 figsize: tuple = (12, 8), top_n: int = 20,
+                                 cast_works_df: Optional[pd.DataFrame] = None) -> None:
         """
-        绘制合作关系热力图
+        绘制前N位合作者之间的合作热力图
         
         Args:
             collaborations: 合作关系数据
             figsize: 图形大小
+            top_n: 合作者数量
+            cast_works_df: 演员作品关系数据，给定时统计合作者之间的全部共同作品，
+                否则只统计与目标演员的共同作品
         """
         if not collaborations:
             print("没有合作数据可显示")
             return
         
-        # 准备数据
-        names = [c['collaborator'] for c in collaborations[:20]]  # 取前20个
-        frequencies = [c['frequency'] for c in collaborations[:20]]
-        
-        # 创建热力图数据
-        data = []
-        for i, freq in enumerate(frequencies):
-            row = [0] * len(names)
-            row[i] = freq
-            data.append(row)
+        data = self.collaboration_matrix(collaborations, top_n, cast_works_df)
         
         plt.figure(figsize=figsize)
         sns.heatmap(data, 
-                   xticklabels=names,
-                   yticklabels=names,
-                   annot=True,
+                   mask=np.eye(len(data), dtype=bool),
+                   annot=len(data) <= 30,
                    cmap='YlOrRd',
-                   fmt='d')
+                   fmt='d',
+                   cbar_kws={'label': '共同作品数'})
         
-        plt.title('演员合作频率热力图')
+        scope = '全部作品' if cast_works_df is not None else '与目标演员的共同作品'
+        plt.title(f'主要合作演员之间的合作热力图（{scope}）')
         plt.xticks(rotation=45, ha='right')
         plt.yticks(rotation=0)
         plt.tight_layout()
         plt.show()
     
     def plot_timeline_analysis(self, collaborations: List[Dict], 
-                             figsize: tuple = (14, 8)) -> None:
+                             figsize: tuple = (14, 8), top_n: int = 15,
+                             cast_works_df: Optional[pd.DataFrame] = None) -> None:
         """
         绘制合作时间线分析
         
         Args:
             collaborations: 合作关系数据
             figsize: 图形大小
+            top_n: 热力图中显示的合作者数量
+            cast_works_df: 演员作品关系数据，给定时热力图为每年的共同作品数，否则为是否合作
         """
-        # 准备时间线数据
-        timeline_data = []
-        for collab in collaborations:
-            for year in collab['years']:
-                if year and not pd.isna(year):
-                    timeline_data.append({
-                        'collaborator': collab['collaborator'],
-                        'year': int(year),
-                        'frequency': collab['frequency']
-                    })
-        
-        if not timeline_data:
+        timeline = self.collaboration_timeline(collaborations, cast_works_df) if collaborations else None
+        if timeline is None or timeline.shape[1] == 0:
             print("没有时间数据可显示")
             return
         
-        df = pd.DataFrame(timeline_data)
-        
         # 创建子图
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=figsize)
         
-        # 按年份统计合作次数
-        yearly_collabs = df.groupby('year').size()
+        # 按年份统计合作演员数
+        yearly_collabs = (timeline > 0).sum(axis=0)
         ax1.plot(yearly_collabs.index, yearly_collabs.values, marker='o', linewidth=2)
         ax1.set_title('合作关系年度分布')
         ax1.set_xlabel('年份')
-        ax1.set_ylabel('合作次数')
+        ax1.set_ylabel('合作演员数')
         ax1.grid(True, alpha=0.3)
         
-        # 热力图显示演员-年份关系
-        pivot_data = df.pivot_table(values='frequency', 
-                                   index='collaborator', 
-                                   columns='year', 
-                                   fill_value=0)
-        
-        # 只显示前15个合作最多的演员
-        top_collaborators = df.groupby('collaborator')['frequency'].first().nlargest(15).index
-        pivot_data_top = pivot_data.loc[top_collaborators]
-        
-        sns.heatmap(pivot_data_top, 
+        # 热力图显示演员-年份关系（合作数据已按合作频率降序）
+        sns.heatmap(timeline.iloc[:top_n], 
                    cmap='YlOrRd', 
                    ax=ax2,
-                   cbar_kws={'label': '合作频次'})
+                   cbar_kws={'label': '共同作品数' if cast_works_df is not None else '是否合作'})
         ax2.set_title('主要合作演员时间分布')
         ax2.set_xlabel('年份')
         ax2.set_ylabel('合作演员')
@@ -325,31 +697,23 @@ class NetworkVisualizer:
         plt.tight_layout()
         plt.show()
     
-    def export_network(self, G: nx.Graph, filepath: str, format: str = 'gexf') -> None:
+    def export_network(self, G: Union[nx.Graph, CompactGraph], filepath: str, format: str = 'gexf',
+                       compress: Optional[bool] = None) -> None:
         """
         导出网络数据
         
+        文本格式除 GML 外均为流式写出，大网络导出时内存占用不随规模增长；
+        npz 为二进制列式格式，可用 CastNetwork.load_network() 读回；
+        列表属性（works、years 等）按格式编码，见 exporters 模块。
+        
         Args:
-            G: 网络图
-            filepath: 文件路径
-            format: 导出格式 ('gexf', 'gml', 'graphml', 'json')
+            G: 网络图（nx 图或 CompactGraph）
+            filepath: 文件路径，以 .gz 结尾时gzip压缩
+            format: 导出格式 ('gexf', 'gml', 'graphml', 'json', 'ndjson', 'npz')
+            compress: 是否gzip压缩，None表示按文件名判断
         """
         try:
-            if format.lower() == 'gexf':
-                nx.write_gexf(G, filepath)
-            elif format.lower() == 'gml':
-                nx.write_gml(G, filepath)
-            elif format.lower() == 'graphml':
-                nx.write_graphml(G, filepath)
-            elif format.lower() == 'json':
-                from networkx.readwrite import json_graph
-                import json
-                data = json_graph.node_link_data(G)
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-            else:
-                raise ValueError(f"不支持的格式: {format}")
-            
+            export_graph(G, filepath, format, compress)
             print(f"网络数据已导出到: {filepath}")
             
         except Exception as e:
@@ -0,0 +1,55 @@
+"""
+测试用的小型样例数据
+Sample Data for Tests
+"""
+
+import numpy as np
+import pandas as pd
+
+CAST_WORKS_ROWS = [
+    # work_id, work_title, cast_id, cast_name, cast_role, cast_order, work_year, work_type, work_genres
+    (101, '电影A', 1, '周一', '演员', 1, 1990, '电影', '喜剧/爱情'),
+    (101, '电影A', 2, '李二', '演员', 2, 1990, '电影', '喜剧/爱情'),
+    (101, '电影A', 3, '王三', '导演', 0, 1990, '电影', '喜剧/爱情'),
+    (101, '电影A', 4, '赵四', '演员', 3, 1990, '电影', '喜剧/爱情'),
+    (102, '电影B', 1, '周一', '演员', 1, 1995, '电影', '喜剧'),
+    (102, '电影B', 2, '李二', '演员', 2, 1995, '电影', '喜剧'),
+    (102, '电影B', 5, '孙五', '编剧', 0, 1995, '电影', '喜剧'),
+    (103, '剧C', 1, '周一', '演员', 1, 2001, '电视剧', '剧情/爱情'),
+    (103, '剧C', 4, '赵四', '演员', 2, 2001, '电视剧', '剧情/爱情'),
+    (103, '剧C', 6, '钱六', '演员', 3, 2001, '电视剧', '剧情/爱情'),
+    (103, '剧C', 3, '王三', '导演', 0, 2001, '电视剧', '剧情/爱情'),
+    (104, '电影D', 1, '周一', '演员', 1, 2005, '电影', '动作'),
+    (104, '电影D', 1, '周一', '导演', 0, 2005, '电影', '动作'),
+    (104, '电影D', 2, '李二', '演员', 2, 2005, '电影', '动作'),
+    (104, '电影D', 7, '张伟', '演员', 3, 2005, '电影', '动作'),
+    (105, '电影E', 6, '钱六', '演员', 1, 2012, '电影', '剧情'),
+    (105, '电影E', 8, '张伟', '演员', 2, 2012, '电影', '剧情'),
+    (105, '电影E', 5, '孙五', '导演', 0, 2012, '电影', '剧情'),
+    (106, '电影F', 2, '李二', '演员', 1, np.nan, '电影', '喜剧'),
+    (106, '电影F', 3, '王三', '演员', 2, np.nan, '电影', '喜剧'),
+]
+
+
+def make_sample_frames():
+    """
+    构建样例数据
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]: 演员数据、演员作品关系数据、作品数据
+    """
+    cast_works_df = pd.DataFrame(CAST_WORKS_ROWS, columns=[
+        'work_id', 'work_title', 'cast_id', 'cast_name', 'cast_role',
+        'cast_order', 'work_year', 'work_type', 'work_genres'
+    ])
+    cast_data_df = (cast_works_df[['cast_id', 'cast_name']]
+                    .drop_duplicates('cast_id')
+                    .sort_values('cast_id')
+                    .reset_index(drop=True))
+    cast_data_df['main_works'] = cast_data_df['cast_id'].map(
+        cast_works_df.groupby('cast_id')['work_title'].first()
+    )
+    works_data_df = (cast_works_df[['work_id', 'work_title', 'work_year', 'work_type']]
+                     .drop_duplicates('work_id')
+                     .reset_index(drop=True))
+    return cast_data_df, cast_works_df, works_data_df
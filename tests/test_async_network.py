@@ -0,0 +1,133 @@
+"""
+测试异步接口模块
+Test Asyncio API Module
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+
+from src import AsyncCastNetwork, CastNetwork
+from tests.sample_data import make_sample_frames
+
+
+class TestAsyncCastNetwork(unittest.TestCase):
+    """测试异步调用、合并、超时和取消"""
+
+    def setUp(self):
+        self.network = CastNetwork.from_frames(*make_sample_frames())
+        self.calls = 0
+        self.release = threading.Event()
+
+    def slow_search(self, keyword, limit=10):
+        """替换 search_actors：记录调用次数，等待放行后返回"""
+        self.calls += 1
+        self.release.wait(5)
+        return self.network.data_loader.search_actors(keyword, limit)
+
+    def test_results_match_sync_api(self):
+        """异步调用与同步调用结果相同"""
+        async def main():
+            async with AsyncCastNetwork(self.network) as network:
+                G = await network.build_actor_network_by_id(1, start_year=1990, end_year=2001)
+                stats = await network.get_network_stats(G)
+                top = await network.get_collaboration_frequency_by_id(1, top_n=2)
+                return G, stats, top
+
+        G, stats, top = asyncio.run(main())
+        expected = self.network.build_actor_network_by_id(1, start_year=1990, end_year=2001)
+        self.assertTrue(nx.utils.graphs_equal(G, expected))
+        self.assertEqual(stats, self.network.get_network_stats(expected))
+        self.assertEqual(top, self.network.get_collaboration_frequency_by_id(1, top_n=2))
+
+    def test_identical_calls_are_coalesced(self):
+        """同时进行的相同调用只计算一次，参数不同的调用分别计算"""
+        self.network.search_actors = self.slow_search
+
+        async def main():
+            async with AsyncCastNetwork(self.network) as network:
+                calls = [network.search_actors('张', limit=5) for _ in range(5)]
+                calls.append(network.search_actors('周', limit=5))
+                tasks = [asyncio.ensure_future(call) for call in calls]
+                await asyncio.sleep(0.05)
+                self.release.set()
+                return await asyncio.gather(*tasks)
+
+        results = asyncio.run(main())
+        self.assertEqual(self.calls, 2)
+        self.assertTrue(all(result is results[0] for result in results[:5]))
+        self.assertEqual(results[5]['cast_name'].tolist(), ['周一'])
+
+    def test_timeout_and_cancellation(self):
+        """超时抛出 TimeoutError 且不阻塞事件循环；一个调用者取消不影响共享同一计算的其他调用者"""
+        self.network.search_actors = self.slow_search
+
+        async def main():
+            async with AsyncCastNetwork(self.network, timeout=0.05) as network:
+                ticks = 0
+                waiter = asyncio.ensure_future(network.search_actors('李'))
+                while not waiter.done():
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+                with self.assertRaises(asyncio.TimeoutError):
+                    waiter.result()
+                self.assertGreater(ticks, 3)
+                self.assertEqual(network._inflight, {})
+                self.release.set()
+                await asyncio.sleep(0.05)
+                self.release.clear()
+
+                first = asyncio.ensure_future(network.search_actors('王', timeout=5))
+                second = asyncio.ensure_future(network.search_actors('王', timeout=5))
+                await asyncio.sleep(0.05)
+                first.cancel()
+                self.release.set()
+                result = await second
+                self.assertTrue(first.cancelled())
+                return result
+
+        result = asyncio.run(main())
+        self.assertEqual(result['cast_name'].tolist(), ['王三'])
+        self.assertEqual(self.calls, 2)
+
+    def test_process_executor(self):
+        """进程池中每个工作进程持有一份数据，结果与同步调用相同"""
+        async def main():
+            async with AsyncCastNetwork(self.network, executor='process', max_workers=2) as network:
+                return await asyncio.gather(network.get_collaboration_frequency_by_id(2, top_n=3),
+                                            network.are_actors_connected(8, 7))
+
+        top, connected = asyncio.run(main())
+        self.assertEqual(top, self.network.get_collaboration_frequency_by_id(2, top_n=3))
+        self.assertTrue(connected)
+
+    def test_unsupported_method(self):
+        """不在 ASYNC_METHODS 中的方法不能异步调用，使用 pyplot 的绘图方法不包装"""
+        async def main():
+            async with AsyncCastNetwork(self.network) as network:
+                await network.call('serve')
+
+        with self.assertRaises(ValueError):
+            asyncio.run(main())
+        self.assertFalse(hasattr(AsyncCastNetwork, 'visualize_network'))
+
+    def test_render_network_figure_in_thread(self):
+        """绘图在后台线程中绘制到独立的 Agg Figure"""
+        async def main():
+            async with AsyncCastNetwork(self.network) as network:
+                G = await network.build_actor_network_by_id(1)
+                return await network.render_network_figure(G, seed=0, iterations=10)
+
+        fig = asyncio.run(main())
+        self.assertEqual(type(fig.canvas).__name__, 'FigureCanvasAgg')
+        self.assertEqual(len(fig.axes), 1)
+        fig.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+测试骨干网络模块
+Test Backbone Extraction Module
+"""
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import networkx as nx
+
+from src.backbone import extract_backbone
+from src.compact_graph import CompactGraph
+from src.network_builder import NetworkBuilder
+from tests.sample_data import make_sample_frames
+
+
+class TestBackbone(unittest.TestCase):
+    """测试差异过滤、前k条边和最大生成森林"""
+
+    def setUp(self):
+        self.G = nx.relabel_nodes(nx.powerlaw_cluster_graph(300, 4, 0.4, seed=5), lambda n: f"演员{n}")
+        rng = np.random.default_rng(1)
+        for u, v in self.G.edges():
+            self.G[u][v]['weight'] = float(rng.choice([1, 1, 1, 2, 3, 10]))
+            self.G[u][v]['works'] = [f"{u}-{v}"]
+        self.G.graph['name'] = '测试网络'
+
+    def expected_disparity(self, alpha):
+        """逐条边直接计算差异过滤的结果"""
+        kept = set()
+        for u, v, w in self.G.edges(data='weight'):
+            for node in (u, v):
+                k = self.G.degree(node)
+                s = self.G.degree(node, weight='weight')
+                if k > 1 and (1 - w / s) ** (k - 1) < alpha:
+                    kept.add(frozenset((u, v)))
+        return kept
+
+    def test_disparity_filter(self):
+        """差异过滤与逐条边计算一致，节点、边和图属性保留"""
+        backbone = extract_backbone(self.G, 'disparity', alpha=0.2)
+        self.assertEqual({frozenset(edge) for edge in backbone.edges()}, self.expected_disparity(0.2))
+        self.assertEqual(backbone.number_of_nodes(), self.G.number_of_nodes())
+        u, v = next(iter(backbone.edges()))
+        self.assertEqual(backbone[u][v]['works'], self.G[u][v]['works'])
+        self.assertEqual(backbone.graph['name'], '测试网络')
+        self.assertEqual(backbone.graph['backbone']['edges_before'], self.G.number_of_edges())
+
+    def test_top_k(self):
+        """每条保留的边至少是一个端点的前k条边之一，每个节点至少保留 min(k, 度) 条边"""
+        k = 2
+        backbone = extract_backbone(self.G, 'top_k', k=k)
+        for u, v in backbone.edges():
+            ranked = [sorted((w for _, _, w in self.G.edges(node, data='weight')), reverse=True)
+                      for node in (u, v)]
+            self.assertTrue(any(self.G[u][v]['weight'] >= r[min(k, len(r)) - 1] for r in ranked))
+        for node in self.G:
+            self.assertGreaterEqual(backbone.degree(node), min(k, self.G.degree(node)))
+
+    def test_spanning_forest(self):
+        """最大生成森林与networkx的结果权重相同，连通分量不变"""
+        self.G.add_edge('孤岛甲', '孤岛乙', weight=1)
+        backbone = extract_backbone(self.G, 'spanning_forest')
+        expected = nx.maximum_spanning_tree(self.G)
+        self.assertEqual(backbone.number_of_edges(), expected.number_of_edges())
+        self.assertAlmostEqual(backbone.size(weight='weight'), expected.size(weight='weight'))
+        self.assertEqual(nx.number_connected_components(backbone), 2)
+
+    def test_combined_and_compact(self):
+        """组合过滤器取并集，CompactGraph 结果与 nx 一致"""
+        disparity = extract_backbone(self.G, 'disparity', alpha=0.1)
+        combined = extract_backbone(self.G, ['disparity', 'spanning_forest'], alpha=0.1)
+        self.assertTrue(set(map(frozenset, disparity.edges())) <= set(map(frozenset, combined.edges())))
+        self.assertEqual(nx.number_connected_components(combined), 1)
+
+        compact = extract_backbone(CompactGraph.from_networkx(self.G), ['disparity', 'spanning_forest'],
+                                   alpha=0.1, keep_isolates=False)
+        ids = compact.node_ids
+        rows, cols, _ = compact.edge_arrays()
+        self.assertEqual({frozenset((ids[u], ids[v])) for u, v in zip(rows, cols)},
+                         set(map(frozenset, combined.edges())))
+
+        with self.assertRaises(ValueError):
+            extract_backbone(self.G, 'unknown')
+        with self.assertRaises(ValueError):
+            extract_backbone(self.G, 'top_k', alpha=0.1)
+
+    def test_builder_output(self):
+        """网络构建器的输出可以直接过滤并统计"""
+        _, cast_works_df, _ = make_sample_frames()
+        builder = NetworkBuilder()
+        G = builder.build_global_network(cast_works_df)
+        backbone = extract_backbone(G, 'top_k', k=1, keep_isolates=False)
+        stats = builder.get_network_stats(backbone)
+        self.assertEqual(stats['edges'], backbone.number_of_edges())
+        self.assertEqual(stats['backbone']['methods'], ['top_k'])
+
+        compact = extract_backbone(builder.build_global_network(cast_works_df, compact=True), 'top_k', k=1)
+        self.assertEqual(builder.get_network_stats(compact)['edges'], stats['edges'])
+
+
+if __name__ == '__main__':
+    unittest.main()
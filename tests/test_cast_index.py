@@ -0,0 +1,178 @@
+"""
+测试索引与按年份构建网络
+Test Cast Index and Time-Sliced Networks
+"""
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import networkx as nx
+
+from src.cast_index import CastIndex, get_index
+from src.data_loader import DataLoader
+from src.network_builder import NetworkBuilder, edge_work_attributes, materialize_work_attributes
+from tests.sample_data import make_sample_frames
+
+
+class TestCastIndex(unittest.TestCase):
+    """测试演员作品索引"""
+
+    def setUp(self):
+        self.cast_data_df, self.cast_works_df, _ = make_sample_frames()
+        self.index = CastIndex(self.cast_works_df)
+        self.network_builder = NetworkBuilder()
+
+    def test_get_index_is_cached(self):
+        """同一个DataFrame只构建一次索引"""
+        self.assertIs(get_index(self.cast_works_df), get_index(self.cast_works_df))
+
+    def test_works_in_years(self):
+        """年份区间筛选"""
+        works = self.index.work_ids[self.index.works_in_years(1995, 2005)]
+        self.assertEqual(sorted(works.tolist()), [102, 103, 104])
+        # 不限结束年份时不包含无年份作品
+        works = self.index.work_ids[self.index.works_in_years(2005, None)]
+        self.assertEqual(sorted(works.tolist()), [104, 105])
+
+    def test_cooccurrence_counts_shared_works(self):
+        """共现矩阵的值为共同作品数"""
+        matrix = self.index.cooccurrence()
+        a, b = self.index.actor_code(1), self.index.actor_code(2)
+        self.assertEqual(matrix[a, b], 3)
+        self.assertEqual(matrix.diagonal().sum(), 0)
+        self.assertEqual((matrix != matrix.T).nnz, 0)
+
+    def test_actor_network_matches_year_filter(self):
+        """按年份构建的个人网络只包含区间内的合作"""
+        network = self.network_builder.build_actor_network_by_id(
+            1, self.cast_data_df, self.cast_works_df, start_year=2000, end_year=2010
+        )
+        self.assertEqual(set(network.nodes()), {'周一', '赵四', '钱六', '王三', '李二', '张伟'})
+        self.assertEqual(network['周一']['李二']['works'], ['电影D'])
+        self.assertEqual(network['周一']['李二']['years'], [2005.0])
+
+        full = self.network_builder.build_actor_network_by_id(1, self.cast_data_df, self.cast_works_df)
+        self.assertEqual(full['周一']['李二']['weight'], 3)
+        self.assertEqual(full.nodes['周一']['works_count'], 5)
+
+    def test_global_network(self):
+        """全局网络以cast_id为节点"""
+        G = self.network_builder.build_global_network(self.cast_works_df, start_year=1990, end_year=1995)
+        self.assertIsInstance(G, nx.Graph)
+        self.assertEqual(G[1][2]['weight'], 2)
+        self.assertEqual(G.nodes[5]['cast_name'], '孙五')
+        self.assertNotIn(6, G)
+
+    def test_sliding_windows_match_rebuild(self):
+        """增量更新的窗口与重新构建的结果一致"""
+        windows = list(self.network_builder.iter_network_windows(
+            self.cast_works_df, window_size=10, step=3, include_roles=['演员']
+        ))
+        self.assertEqual(windows[0][:2], (1990, 1999))
+        row_mask = (self.cast_works_df['cast_role'] == '演员').to_numpy()
+        for start, end, graph in windows:
+            expected = self.index.cooccurrence(start, end, row_mask)
+            self.assertEqual((graph.adjacency != expected).nnz, 0)
+
+    def test_top_collaborators_match_network(self):
+        """前N位合作者与完整网络的排序结果一致"""
+        network = self.network_builder.build_actor_network_by_id(1, self.cast_data_df, self.cast_works_df)
+        expected = sorted(((network['周一'][n]['weight'], n) for n in network.neighbors('周一')),
+                          key=lambda x: -x[0])
+
+        collaborations = self.network_builder.get_collaboration_frequency_by_id(
+            1, self.cast_data_df, self.cast_works_df, top_n=2
+        )
+        self.assertEqual([c['frequency'] for c in collaborations], [w for w, _ in expected[:2]])
+        self.assertEqual(collaborations[0]['collaborator'], '李二')
+        self.assertEqual(sorted(collaborations[0]['works']), ['电影A', '电影B', '电影D'])
+        self.assertEqual(collaborations[0]['years'], [1990.0, 1995.0, 2005.0])
+
+    def test_collaboration_frequency_with_duplicate_name(self):
+        """重名演员返回空列表"""
+        self.assertEqual(self.network_builder.get_collaboration_frequency(
+            '张伟', self.cast_data_df, self.cast_works_df), [])
+
+    def test_role_statistics_match_groupby(self):
+        """预先计算的职能统计与groupby结果一致"""
+        expected = self.cast_works_df.groupby('cast_role').agg(
+            人数=('cast_id', 'nunique'), 作品数=('work_id', 'nunique'), 记录数=('cast_name', 'count')
+        )
+        stats = self.index.role_statistics
+        self.assertEqual(stats['记录数'].tolist(), sorted(stats['记录数'], reverse=True))
+        self.assertTrue(stats.sort_index().equals(expected.sort_index()))
+        self.assertEqual(self.index.available_roles, ['导演', '演员', '编剧'])
+
+    def test_role_filtered_collaboration_data(self):
+        """按职能筛选的合作数据与直接筛选DataFrame一致"""
+        loader = DataLoader()
+        loader.cast_data_df, loader.cast_works_df = self.cast_data_df, self.cast_works_df
+        data = loader.get_cast_collaboration_data_by_id(3, include_roles=['演员'])
+
+        works = self.cast_works_df.loc[self.cast_works_df['cast_id'] == 3, 'work_id']
+        expected = self.cast_works_df[self.cast_works_df['work_id'].isin(works)
+                                      & (self.cast_works_df['cast_role'] == '演员')]
+        self.assertTrue(data.equals(expected))
+
+    def test_role_filtered_actor_network(self):
+        """职能筛选只保留目标在该职能下参与的作品"""
+        network = self.network_builder.build_actor_network_by_id(
+            3, self.cast_data_df, self.cast_works_df, include_roles=['演员']
+        )
+        # 王三只在电影F中担任演员
+        self.assertEqual(set(network.nodes()), {'王三', '李二'})
+        self.assertIs(self.index.role_incidence(['演员']), self.index.role_incidence({'演员'}))
+
+    def test_interned_edges_resolve_to_strings(self):
+        """只保存作品编码的边，按需还原后与字符串属性一致"""
+        full = self.network_builder.build_actor_network_by_id(1, self.cast_data_df, self.cast_works_df)
+        interned = self.network_builder.build_actor_network_by_id(
+            1, self.cast_data_df, self.cast_works_df, interned=True
+        )
+        edge = interned['周一']['李二']
+        self.assertNotIn('works', edge)
+        self.assertEqual(edge['work_refs'].dtype, np.int32)
+        resolved = edge_work_attributes(interned, edge)
+        for key in ('works', 'work_types', 'genres', 'years', 'collaborator_roles'):
+            self.assertEqual(resolved[key], full['周一']['李二'][key])
+
+        exported = materialize_work_attributes(interned)
+        self.assertNotIn('work_table', exported.graph)
+        self.assertEqual(exported['周一']['李二']['works'], ['电影A', '电影B', '电影D'])
+
+    def test_remakes_with_same_title_are_kept(self):
+        """同名的不同作品在边上分别保留"""
+        cast_works_df = self.cast_works_df.copy()
+        cast_works_df.loc[cast_works_df['work_id'] == 102, 'work_title'] = '电影A'
+        network = self.network_builder.build_actor_network_by_id(1, self.cast_data_df, cast_works_df)
+        self.assertEqual(network['周一']['李二']['works'], ['电影A', '电影A', '电影D'])
+        self.assertEqual(network['周一']['李二']['work_ids'], [101, 102, 104])
+
+    def test_role_pair_network_matches_pairs(self):
+        """职能对投影与逐作品配对的结果一致"""
+        G = self.network_builder.build_role_pair_network(self.cast_works_df, '导演', '演员')
+        df = self.cast_works_df
+        pairs = df[df['cast_role'] == '导演'].merge(df[df['cast_role'] == '演员'], on='work_id')
+        pairs = pairs[pairs['cast_id_x'] != pairs['cast_id_y']]
+        expected = pairs.groupby(['cast_id_x', 'cast_id_y'])['work_id'].nunique().to_dict()
+        self.assertTrue(G.is_directed())
+        self.assertEqual({(u, v): d['weight'] for u, v, d in G.edges(data=True)}, expected)
+
+    def test_role_pair_network_for_seed(self):
+        """种子演员的职能对网络只包含与其相关的出边和入边"""
+        G = self.network_builder.build_role_pair_network(
+            self.cast_works_df, ['导演'], ['演员'], cast_id=1
+        )
+        self.assertEqual(sorted(G.edges(data='weight')), [(1, 2, 1), (1, 7, 1), (3, 1, 2)])
+        G = self.network_builder.build_role_pair_network(
+            self.cast_works_df, '导演', '演员', cast_id=3, start_year=2000
+        )
+        self.assertEqual(sorted(G.successors(3)), [1, 4, 6])
+        self.assertEqual(G.nodes[3]['cast_name'], '王三')
+
+
+if __name__ == '__main__':
+    unittest.main()
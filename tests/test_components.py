@@ -0,0 +1,76 @@
+"""
+测试连通分量模块
+Test Connected Components Module
+"""
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import networkx as nx
+
+from src.components import ComponentIndex, UnionFind, graph_components
+from tests.sample_data import make_sample_frames
+
+
+class TestComponents(unittest.TestCase):
+    """测试并查集和连通分量索引"""
+
+    def setUp(self):
+        _, self.cast_works_df, _ = make_sample_frames()
+        # 去掉2012年的电影E，张伟(ID 8)只出现在这部作品中
+        self.early = self.cast_works_df[self.cast_works_df['work_id'] != 105]
+        self.components = ComponentIndex.from_data(self.early)
+
+    def test_bulk_union_matches_networkx(self):
+        """批量合并的分量与networkx一致"""
+        G = nx.gnm_random_graph(500, 400, seed=3)
+        roots = graph_components(G)
+        for component in nx.connected_components(G):
+            self.assertEqual(len(set(roots[list(component)].tolist())), 1)
+        self.assertEqual(len(set(roots.tolist())), nx.number_connected_components(G))
+
+    def test_component_queries(self):
+        """分量查询只统计演员"""
+        self.assertTrue(self.components.connected(1, 6))
+        self.assertEqual(self.components.component_size(1), 7)
+        self.assertEqual(self.components.n_components, 1)
+        self.assertNotIn(8, self.components.largest_component())
+
+    def test_incremental_credits(self):
+        """增量加入的记录会合并分量"""
+        self.components.add_credits([8, 99], [900, 900])
+        self.assertFalse(self.components.connected(1, 99))
+        self.assertEqual(self.components.component_size(99), 2)
+
+        self.components.add_credits([99], [101])
+        self.assertTrue(self.components.connected(1, 8))
+        self.assertEqual(self.components.component_size(8), 9)
+
+    def test_invalid_credits_leave_index_unchanged(self):
+        """长度不一致或ID不可哈希时抛出异常，索引不被部分更新"""
+        n_components, n_nodes = self.components.n_components, self.components._uf.n
+        with self.assertRaises(ValueError):
+            self.components.add_credits([8, 99, 100], [900, 900])
+        with self.assertRaises(TypeError):
+            self.components.add_credits([99, [100]], [900, 901])
+        self.assertEqual(self.components._uf.n, n_nodes)
+        self.assertEqual(self.components.n_components, n_components)
+        with self.assertRaises(ValueError):
+            self.components.connected(1, 99)
+
+    def test_union_find_sizes(self):
+        """逐条合并后的分量大小正确"""
+        uf = UnionFind(6)
+        uf.union(0, 1)
+        uf.union(2, 3)
+        uf.union_arrays(np.array([1]), np.array([3]))
+        uf.union(4, 5)
+        self.assertEqual(uf.component_weight(0), 4)
+        self.assertEqual(uf.n_components, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+测试个人网络数据集导出模块
+Test Ego Network Dataset Export Module
+"""
+
+import unittest
+import sys
+import os
+import contextlib
+import io
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from src.cast_index import get_index
+from src.ego_dataset import export_ego_dataset, iter_ego_tables, shard_of
+from src.network_builder import NetworkBuilder
+from tests.sample_data import make_sample_frames
+
+
+class TestEgoDataset(unittest.TestCase):
+    """测试分片数据集的内容、分区和断点续写"""
+
+    def setUp(self):
+        self.cast_data_df, self.cast_works_df, _ = make_sample_frames()
+        self.index = get_index(self.cast_works_df)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.output_dir = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def export(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return export_ego_dataset(self.cast_works_df, self.output_dir, **kwargs)
+
+    def read_dataset(self, manifest):
+        return pd.concat([pd.read_json(os.path.join(self.output_dir, record['file']), lines=True)
+                          for record in manifest['shards'].values()], ignore_index=True)
+
+    def test_edges_match_actor_network(self):
+        """边表与 build_actor_network_by_id 的权重和共同作品一致"""
+        tables = pd.concat(iter_ego_tables(self.index, range(self.index.n_actors), batch_size=3))
+        builder = NetworkBuilder()
+        for cast_id in self.index.actor_ids.tolist():
+            with contextlib.redirect_stdout(io.StringIO()):
+                G = builder.build_actor_network_by_id(cast_id, self.cast_data_df, self.cast_works_df)
+            ego = next(node for node, data in G.nodes(data=True) if data['node_type'] == 'target')
+            expected = {G.nodes[node]['cast_id']: (data['weight'], sorted(data['work_ids']))
+                        for _, node, data in G.edges(ego, data=True)}
+            rows = tables[tables['ego_id'] == cast_id]
+            actual = {row.collaborator_id: (row.weight, row.work_ids) for row in rows.itertuples()}
+            self.assertEqual(actual, expected)
+
+    def test_sharded_export(self):
+        """每位演员的边都在按 cast_id 哈希得到的分片中，manifest 记录完整"""
+        manifest = self.export(n_shards=3, processes=1)
+        self.assertTrue(manifest['complete'])
+        self.assertEqual(manifest['egos'], self.index.n_actors)
+        with open(os.path.join(self.output_dir, 'manifest.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['edges'], manifest['edges'])
+        for record in manifest['shards'].values():
+            table = pd.read_json(os.path.join(self.output_dir, record['file']), lines=True)
+            self.assertEqual(len(table), record['edges'])
+            if len(table):
+                self.assertTrue((shard_of(table['ego_id'], 3) == record['shard']).all())
+        self.assertEqual(len(self.read_dataset(manifest)), manifest['edges'])
+
+    def test_resume(self):
+        """中断后重新运行只写出缺失的分片"""
+        manifest = self.export(n_shards=4, processes=1)
+        lost = manifest['shards'].pop('2')
+        os.remove(os.path.join(self.output_dir, lost['file']))
+        with open(os.path.join(self.output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        kept = os.path.join(self.output_dir, manifest['shards']['0']['file'])
+        mtime = os.stat(kept).st_mtime_ns
+
+        resumed = self.export(n_shards=4, processes=1)
+        self.assertTrue(resumed['complete'])
+        self.assertEqual(os.stat(kept).st_mtime_ns, mtime)
+        self.assertEqual(resumed['shards']['2']['edges'], lost['edges'])
+        self.assertEqual(resumed['edges'], manifest['edges'])
+
+    def test_parameter_mismatch(self):
+        """输出目录中已有不同分片数的数据集时拒绝续写"""
+        self.export(n_shards=2, processes=1)
+        with self.assertRaises(ValueError):
+            self.export(n_shards=3, processes=1)
+        self.assertEqual(self.export(n_shards=3, processes=1, resume=False)['n_shards'], 3)
+
+    def test_changed_content_mismatch(self):
+        """数据规模相同但内容有变化（如更正职能）时拒绝续写"""
+        self.export(n_shards=2, processes=1)
+        corrected = self.cast_works_df.copy()
+        corrected.loc[corrected.index[0], 'cast_role'] = '导演'
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaisesRegex(ValueError, '数据内容'):
+                export_ego_dataset(corrected, self.output_dir, n_shards=2, processes=1)
+            self.assertTrue(export_ego_dataset(corrected, self.output_dir, n_shards=2, processes=1,
+                                               resume=False)['complete'])
+
+    def test_parallel_export(self):
+        """多进程导出与顺序导出的内容相同"""
+        manifest = self.export(n_shards=3, processes=2)
+        parallel = self.read_dataset(manifest).sort_values(['ego_id', 'collaborator_id'])
+        tables = pd.concat(iter_ego_tables(self.index, range(self.index.n_actors)))
+        self.assertEqual(parallel['weight'].tolist(),
+                         tables.sort_values(['ego_id', 'collaborator_id'])['weight'].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
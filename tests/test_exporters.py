@@ -0,0 +1,106 @@
+"""
+测试流式导出模块
+Test Streaming Graph Exporters Module
+"""
+
+import unittest
+import sys
+import os
+import gzip
+import io
+import json
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+import pandas as pd
+
+from src.exporters import export_graph, write_gexf, write_graphml, write_ndjson
+from src.network_builder import NetworkBuilder
+from tests.sample_data import make_sample_frames
+
+
+class TestExporters(unittest.TestCase):
+    """测试流式写出的 GEXF、GraphML、JSON 和 NDJSON"""
+
+    def setUp(self):
+        self.cast_data_df, self.cast_works_df, _ = make_sample_frames()
+        self.builder = NetworkBuilder()
+        self.G = self.builder.build_actor_network('周一', self.cast_data_df, self.cast_works_df)
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_gexf_list_attributes(self):
+        """列表属性写为以 '|' 连接的 liststring，networkx 可以读回"""
+        path = self.path('network.gexf')
+        write_gexf(self.G, path)
+        H = nx.read_gexf(path)
+        self.assertEqual(H.number_of_nodes(), self.G.number_of_nodes())
+        self.assertEqual(H.number_of_edges(), self.G.number_of_edges())
+        for u, v, data in self.G.edges(data=True):
+            self.assertEqual(H[u][v]['weight'], data['weight'])
+            self.assertEqual(H[u][v]['works'].split('|'), list(data['works']))
+
+    def test_graphml_round_trip(self):
+        """GraphML 中的列表属性为 JSON 数组字符串"""
+        path = self.path('network.graphml')
+        write_graphml(self.G, path)
+        H = nx.read_graphml(path)
+        self.assertEqual(set(H.edges()), set(self.G.edges()))
+        for u, v, data in self.G.edges(data=True):
+            self.assertEqual(json.loads(H[u][v]['works']), list(data['works']))
+
+    def test_json_matches_node_link(self):
+        """node-link JSON 与 networkx 的结构一致"""
+        path = self.path('network.json')
+        export_graph(self.G, path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        H = nx.node_link_graph(data, edges='edges')
+        self.assertEqual(set(H.edges()), set(self.G.edges()))
+        self.assertEqual(set(H.nodes()), set(self.G.nodes()))
+
+    def test_ndjson_gzip(self):
+        """文件名以 .gz 结尾时压缩，每行一个节点或边"""
+        path = self.path('network.ndjson.gz')
+        export_graph(self.G, path)
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            records = pd.read_json(f, lines=True)
+        counts = records['type'].value_counts()
+        self.assertEqual(counts['node'], self.G.number_of_nodes())
+        self.assertEqual(counts['edge'], self.G.number_of_edges())
+
+    def test_interned_edges(self):
+        """只保存作品编码的网络导出结果与普通网络相同"""
+        interned = self.builder.build_actor_network('周一', self.cast_data_df, self.cast_works_df,
+                                                    interned=True)
+        plain_out, interned_out = io.StringIO(), io.StringIO()
+        write_ndjson(self.G, plain_out, include_nodes=False)
+        write_ndjson(interned, interned_out, include_nodes=False)
+        by_edge = lambda text: {frozenset((r['source'], r['target'])): sorted(r['works'])
+                                for r in map(json.loads, text.splitlines())}
+        self.assertEqual(by_edge(interned_out.getvalue()), by_edge(plain_out.getvalue()))
+
+    def test_compact_graph(self):
+        """CompactGraph 按上三角导出，每条边一次"""
+        compact = self.builder.build_global_network(self.cast_works_df, compact=True)
+        path = self.path('global.gexf')
+        write_gexf(compact, path)
+        H = nx.read_gexf(path)
+        self.assertEqual(H.number_of_edges(), compact.number_of_edges())
+
+    def test_unknown_format(self):
+        """无法判断或不支持的格式抛出 ValueError"""
+        with self.assertRaises(ValueError):
+            export_graph(self.G, self.path('network.txt'))
+        with self.assertRaises(ValueError):
+            export_graph(self.G, self.path('network.out'), format='pajek')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+测试题材索引与按题材筛选的网络
+Test Genre Index and Genre-Filtered Networks
+"""
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+from src.cast_index import get_index
+from src.data_loader import DataLoader
+from src.network_builder import NetworkBuilder
+from tests.sample_data import make_sample_frames
+
+
+class TestGenreIndex(unittest.TestCase):
+    """测试题材矩阵及其派生统计"""
+
+    def setUp(self):
+        self.cast_data_df, self.cast_works_df, _ = make_sample_frames()
+        self.index = get_index(self.cast_works_df)
+        self.network_builder = NetworkBuilder()
+        self.loader = DataLoader()
+        self.loader.cast_data_df, self.loader.cast_works_df = self.cast_data_df, self.cast_works_df
+
+    def test_genre_statistics_count_works(self):
+        """题材统计按作品计数"""
+        stats = self.loader.get_genres_statistics()
+        self.assertEqual(stats['题材'].tolist(), ['喜剧', '剧情', '爱情', '动作'])
+        self.assertEqual(stats['作品数'].tolist(), [3, 2, 2, 1])
+
+    def test_genre_cooccurrence(self):
+        """共现矩阵对角线为题材作品数"""
+        matrix = self.loader.get_genre_cooccurrence()
+        self.assertEqual(matrix.loc['喜剧', '爱情'], 1)
+        self.assertEqual(matrix.loc['剧情', '爱情'], 1)
+        self.assertEqual(matrix.loc['喜剧', '喜剧'], 3)
+        self.assertTrue((matrix.values == matrix.values.T).all())
+        self.assertEqual(self.loader.get_genre_cooccurrence(2000, None).loc['喜剧', '喜剧'], 0)
+
+    def test_actor_genre_profile(self):
+        """演员题材分布"""
+        profile = self.loader.get_actor_genre_profile(1)
+        self.assertEqual(profile.to_dict(), {'喜剧': 2, '爱情': 2, '剧情': 1, '动作': 1})
+        self.assertAlmostEqual(self.loader.get_actor_genre_profile(1, normalize=True).sum(), 1.0)
+
+        profiles = self.index.actor_genre_profiles()
+        self.assertEqual(profiles[self.index.actor_code(1), self.index.genre_code('喜剧')], 2)
+
+    def test_genre_filtered_ego_network(self):
+        """题材筛选只保留属于该题材的作品"""
+        network = self.network_builder.build_actor_network_by_id(
+            1, self.cast_data_df, self.cast_works_df, genres=['爱情']
+        )
+        self.assertEqual(set(network.nodes()), {'周一', '李二', '王三', '赵四', '钱六'})
+        self.assertEqual(sorted(network['周一']['赵四']['works']), ['剧C', '电影A'])
+
+    def test_genre_filtered_global_network(self):
+        """全局网络的题材筛选与先筛选数据再构建一致"""
+        graph = self.network_builder.build_global_network(
+            self.cast_works_df, genres=['喜剧'], include_roles=['演员'], compact=True
+        )
+        subset = self.cast_works_df[self.cast_works_df['work_genres'].str.contains('喜剧')
+                                    & (self.cast_works_df['cast_role'] == '演员')]
+        expected = self.network_builder.build_global_network(subset)
+        self.assertEqual(graph.number_of_edges(), expected.number_of_edges())
+        self.assertEqual(set(graph.to_networkx().edges()), set(expected.edges()))
+
+
+if __name__ == '__main__':
+    unittest.main()
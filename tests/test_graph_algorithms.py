@@ -0,0 +1,62 @@
+"""
+测试图算法模块
+Test Graph Algorithms Module
+"""
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import networkx as nx
+
+from src.compact_graph import CompactGraph
+from src.graph_algorithms import (triangle_counts, local_clustering, average_clustering,
+                                  core_numbers, k_core, tree_path_lengths)
+
+
+class TestGraphAlgorithms(unittest.TestCase):
+    """测试三角形计数、聚类系数和k-core分解"""
+
+    def setUp(self):
+        self.G = nx.powerlaw_cluster_graph(300, 4, 0.5, seed=7)
+        self.G.add_node('孤立节点')
+        self.graph = CompactGraph.from_networkx(self.G)
+        self.nodes = list(self.G.nodes())
+
+    def test_triangles_match_networkx(self):
+        """三角形数与networkx一致（小分块也一致）"""
+        expected = nx.triangles(self.G)
+        counts = triangle_counts(self.graph, block_size=17)
+        self.assertEqual(counts.tolist(), [expected[n] for n in self.nodes])
+
+    def test_clustering_match_networkx(self):
+        """局部和平均聚类系数与networkx一致"""
+        expected = nx.clustering(self.G)
+        np.testing.assert_allclose(local_clustering(self.graph), [expected[n] for n in self.nodes])
+        self.assertAlmostEqual(average_clustering(self.graph), nx.average_clustering(self.G))
+
+    def test_core_numbers_match_networkx(self):
+        """核数与networkx一致，最大核子图只包含最大核数的节点"""
+        expected = nx.core_number(self.G)
+        cores = core_numbers(self.graph)
+        self.assertEqual(cores.tolist(), [expected[n] for n in self.nodes])
+
+        inner = k_core(self.graph, cores=cores)
+        self.assertEqual(set(inner.node_ids.tolist()), set(nx.k_core(self.G).nodes()))
+
+    def test_tree_path_lengths_match_networkx(self):
+        """树的直径和平均最短路径长度与networkx一致，非树报错"""
+        trees = [nx.star_graph(20), nx.path_graph(7), nx.balanced_tree(3, 3),
+                 nx.minimum_spanning_tree(self.G.subgraph(self.nodes[:-1]))]
+        for T in trees:
+            diameter, average = tree_path_lengths(CompactGraph.from_networkx(T, weight=None))
+            self.assertEqual(diameter, nx.diameter(T))
+            self.assertAlmostEqual(average, nx.average_shortest_path_length(T))
+        with self.assertRaises(ValueError):
+            tree_path_lengths(self.graph)
+
+
+if __name__ == '__main__':
+    unittest.main()
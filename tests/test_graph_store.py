@@ -0,0 +1,95 @@
+"""
+测试二进制列式存储模块
+Test Binary Columnar Graph Store Module
+"""
+
+import unittest
+import sys
+import os
+import io
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import networkx as nx
+
+from src.exporters import export_graph
+from src.graph_store import load_graph, save_graph
+from src.network_builder import NetworkBuilder, materialize_work_attributes
+from tests.sample_data import make_sample_frames
+
+
+def round_trip(G, **kwargs):
+    buffer = io.BytesIO()
+    save_graph(G, buffer)
+    buffer.seek(0)
+    return load_graph(buffer, **kwargs)
+
+
+class TestGraphStore(unittest.TestCase):
+    """测试 .npz 格式的保存和加载"""
+
+    def setUp(self):
+        self.cast_data_df, self.cast_works_df, _ = make_sample_frames()
+        self.builder = NetworkBuilder()
+
+    def assert_same_graph(self, G, H):
+        self.assertEqual(dict(G.nodes(data=True)), dict(H.nodes(data=True)))
+        G, H = materialize_work_attributes(G), materialize_work_attributes(H)
+        self.assertEqual(G.number_of_edges(), H.number_of_edges())
+        for u, v, data in G.edges(data=True):
+            self.assertEqual(H[u][v], data)
+
+    def test_round_trip(self):
+        """节点和边属性（含列表属性和空值）原样读回"""
+        G = self.builder.build_multi_actor_network(['周一', '李二'], self.cast_data_df, self.cast_works_df)
+        G.nodes['周一']['extra'] = {'source': 'test'}
+        G.graph['name'] = '样例'
+        H = round_trip(G)
+        self.assert_same_graph(G, H)
+        self.assertEqual(H.graph['name'], '样例')
+
+    def test_interned_round_trip(self):
+        """作品编码边读回后仍只保存编码，作品表一并还原"""
+        G = self.builder.build_multi_actor_network(['周一', '李二'], self.cast_data_df, self.cast_works_df,
+                                                   interned=True)
+        H = round_trip(G)
+        self.assertIn('work_table', H.graph)
+        data = H['周一']['李二']
+        self.assertIsInstance(data['work_refs'], np.ndarray)
+        self.assertNotIn('works', data)
+        self.assert_same_graph(G, H)
+
+    def test_compact_graph(self):
+        """CompactGraph 读回后邻接矩阵不变，也可加载为 nx 图"""
+        graph = self.builder.build_global_network(self.cast_works_df, compact=True)
+        compact = round_trip(graph, compact=True)
+        self.assertEqual((compact.adjacency != graph.adjacency).nnz, 0)
+        self.assertEqual(compact.node_names.tolist(), graph.node_names.tolist())
+        G = round_trip(graph)
+        self.assertTrue(nx.utils.graphs_equal(G, graph.to_networkx(include_isolates=True)))
+
+    def test_networkx_as_compact(self):
+        """nx 图加载为 CompactGraph，与 from_networkx 一致"""
+        G = self.builder.build_global_network(self.cast_works_df)
+        compact = round_trip(G, compact=True)
+        expected = nx.to_scipy_sparse_array(G, nodelist=list(G.nodes()), format='csr')
+        self.assertEqual(abs(compact.adjacency - expected).sum(), 0)
+
+    def test_export_format(self):
+        """export_graph 按 .npz 扩展名写出二进制格式"""
+        G = self.builder.build_actor_network('周一', self.cast_data_df, self.cast_works_df)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'network.npz')
+            export_graph(G, path)
+            self.assert_same_graph(G, load_graph(path))
+
+    def test_mixed_node_keys(self):
+        """整数和字符串混合的节点键无法保存"""
+        G = nx.Graph([(1, 'a')])
+        with self.assertRaises(ValueError):
+            save_graph(G, io.BytesIO())
+
+
+if __name__ == '__main__':
+    unittest.main()
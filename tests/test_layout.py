@@ -0,0 +1,196 @@
+"""
+测试快速布局模块
+Test Fast Layout Module
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import networkx as nx
+
+from src.compact_graph import CompactGraph
+from src.layout import LayoutCache, _QuadTree, _coarsen, fast_layout, graph_fingerprint
+from src.visualizer import NetworkVisualizer
+
+
+class TestFastLayout(unittest.TestCase):
+    """测试 Barnes-Hut 多层布局"""
+
+    def setUp(self):
+        self.G = nx.powerlaw_cluster_graph(300, 3, 0.3, seed=3)
+        self.G.add_node('孤立节点')
+        self.graph = CompactGraph.from_networkx(self.G)
+
+    def test_repulsion_matches_exact(self):
+        """开角很小时四叉树斥力与逐对计算一致"""
+        rng = np.random.default_rng(0)
+        pos = rng.random((200, 2))
+        mass = rng.integers(1, 4, 200).astype(float)
+        k = 0.1
+        delta = pos[:, None, :] - pos[None, :, :]
+        dist2 = (delta ** 2).sum(axis=2)
+        np.fill_diagonal(dist2, np.inf)
+        expected = (delta * (k * k * mass[None, :] / dist2)[:, :, None]).sum(axis=1)
+
+        np.testing.assert_allclose(_QuadTree(pos, mass, 8).repulsion(k, 0.01), expected, rtol=1e-6)
+        approximate = _QuadTree(pos, mass, 8).repulsion(k, 0.9)
+        error = np.linalg.norm(approximate - expected, axis=1) / np.linalg.norm(expected, axis=1)
+        self.assertLess(np.median(error), 0.1)
+
+    def test_coarsen_preserves_mass_and_weight(self):
+        """粗化保持总质量，粗图边权重为跨组细边权重之和"""
+        adjacency = self.graph.adjacency.astype(float)
+        coarse_of, coarse, mass = _coarsen(adjacency, np.ones(adjacency.shape[0]),
+                                           np.random.default_rng(0))
+        self.assertLess(coarse.shape[0], 0.7 * adjacency.shape[0])
+        self.assertEqual(mass.sum(), adjacency.shape[0])
+        rows, cols = adjacency.nonzero()
+        between = coarse_of[rows] != coarse_of[cols]
+        self.assertAlmostEqual(coarse.sum(), adjacency[rows[between], cols[between]].sum())
+        self.assertEqual(coarse.diagonal().sum(), 0)
+
+    def test_networkx_output(self):
+        """nx图返回与spring_layout相同形式的字典，坐标在[-1, 1]内"""
+        pos = fast_layout(self.G, seed=1)
+        self.assertEqual(set(pos), set(self.G.nodes()))
+        coords = np.array(list(pos.values()))
+        self.assertEqual(coords.shape, (self.G.number_of_nodes(), 2))
+        self.assertLessEqual(np.abs(coords).max(), 1.0 + 1e-12)
+        self.assertTrue(np.isfinite(coords).all())
+
+    def test_seed_is_deterministic(self):
+        """相同种子得到相同布局，nx图与CompactGraph结果一致"""
+        first = fast_layout(self.graph, seed=5)
+        np.testing.assert_array_equal(first, fast_layout(self.graph, seed=5))
+        self.assertFalse(np.allclose(first, fast_layout(self.graph, seed=6)))
+
+        pos = fast_layout(self.G, seed=5)
+        np.testing.assert_allclose(np.array([pos[n] for n in self.G.nodes()]), first)
+
+    def test_neighbours_are_close(self):
+        """相连的节点比随机节点对更近"""
+        pos = fast_layout(self.graph, seed=2, weight=None)
+        rows, cols, _ = self.graph.edge_arrays()
+        edge_length = np.linalg.norm(pos[rows] - pos[cols], axis=1).mean()
+        rng = np.random.default_rng(0)
+        i, j = rng.integers(0, len(pos), (2, 5000))
+        self.assertLess(edge_length, 0.7 * np.linalg.norm(pos[i] - pos[j], axis=1).mean())
+
+    def test_small_graphs(self):
+        """空图、单节点和两个节点"""
+        self.assertEqual(fast_layout(nx.Graph()), {})
+        single = nx.Graph()
+        single.add_node('甲')
+        self.assertEqual(list(fast_layout(single, seed=0)), ['甲'])
+        pos = fast_layout(nx.Graph([('甲', '乙')]), seed=0)
+        self.assertGreater(np.linalg.norm(pos['甲'] - pos['乙']), 0)
+
+
+class TestLayoutCache(unittest.TestCase):
+    """测试磁盘布局缓存和热启动"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.G = nx.relabel_nodes(nx.powerlaw_cluster_graph(200, 3, 0.3, seed=4), lambda n: f"演员{n}")
+        self.params = {'layout': 'barnes_hut', 'seed': 1, 'iterations': 50}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def compute(self, G, initial=None):
+        return fast_layout(G, seed=1, initial=initial)
+
+    def test_fingerprint(self):
+        """结构哈希与节点/边的插入顺序无关，随边权重和参数变化"""
+        shuffled = nx.Graph()
+        shuffled.add_nodes_from(reversed(list(self.G.nodes())))
+        shuffled.add_edges_from(reversed(list(self.G.edges())))
+        self.assertEqual(graph_fingerprint(self.G, self.params), graph_fingerprint(shuffled, self.params))
+        self.assertNotEqual(graph_fingerprint(self.G, self.params),
+                            graph_fingerprint(self.G, dict(self.params, seed=2)))
+        u, v = next(iter(shuffled.edges()))
+        shuffled[u][v]['weight'] = 3
+        self.assertNotEqual(graph_fingerprint(self.G), graph_fingerprint(shuffled))
+        self.assertEqual(graph_fingerprint(self.G, weight=None), graph_fingerprint(shuffled, weight=None))
+
+    def test_hit_persists_on_disk(self):
+        """第二次读取缓存，新建的缓存对象也能读到"""
+        cache = LayoutCache(self.directory.name)
+        first = cache.layout(self.G, self.compute, self.params)
+        second = cache.layout(self.G, self.compute, self.params)
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+
+        reopened = LayoutCache(self.directory.name)
+        third = reopened.layout(self.G, lambda G, initial: self.fail("不应重新计算"), self.params)
+        for node in self.G.nodes():
+            np.testing.assert_array_equal(first[node], second[node])
+            np.testing.assert_array_equal(first[node], third[node])
+
+    def test_warm_start_keeps_positions(self):
+        """增加少量节点时从旧布局出发，已有节点基本不动"""
+        cache = LayoutCache(self.directory.name)
+        before = cache.layout(self.G, self.compute, self.params)
+        grown = self.G.copy()
+        grown.add_edges_from([('新演员甲', '演员0'), ('新演员甲', '演员1'), ('新演员乙', '演员5')])
+        after = cache.layout(grown, self.compute, self.params)
+        self.assertEqual(cache.warm_starts, 1)
+        cold = self.compute(grown)
+
+        def shift(pos):
+            return np.mean([np.linalg.norm(pos[n] - before[n]) for n in self.G.nodes()])
+        self.assertLess(shift(after), 0.5 * shift(cold))
+
+        # 变化太大时不热启动
+        other = nx.relabel_nodes(self.G, lambda n: f"{n}'")
+        cache.layout(other, self.compute, self.params)
+        self.assertEqual(cache.misses, 2)
+
+    def test_eviction(self):
+        """超过容量时删除最久未使用的条目"""
+        cache = LayoutCache(self.directory.name, max_entries=2)
+        graphs = [nx.path_graph(n) for n in (5, 30, 60)]
+        for G in graphs:
+            cache.layout(G, self.compute, self.params, warm_start=False)
+        self.assertIsNone(cache.get(graphs[0], self.params))
+        self.assertIsNotNone(cache.get(graphs[2], self.params))
+        self.assertEqual(len([f for f in os.listdir(self.directory.name) if f.endswith('.npz')]), 2)
+
+    def test_concurrent_threads(self):
+        """多个线程同时读写同一缓存不出错，不留下临时文件；命中缓存不重写索引文件"""
+        from concurrent.futures import ThreadPoolExecutor
+        cache = LayoutCache(self.directory.name, max_entries=8)
+        graphs = [nx.path_graph(n) for n in range(5, 17)]
+
+        def run(i):
+            return cache.layout(graphs[i % len(graphs)], self.compute, self.params, warm_start=i % 2 == 0)
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(run, range(120)))
+        self.assertEqual(len(results), 120)
+        files = os.listdir(self.directory.name)
+        self.assertFalse([f for f in files if 'tmp' in f])
+        self.assertEqual(len([f for f in files if f.endswith('.npz')]), 8)
+
+        index_path = os.path.join(self.directory.name, LayoutCache.INDEX_FILE)
+        with open(index_path, encoding='utf-8') as f:
+            before = f.read()
+        for G in graphs:
+            cache.get(G, self.params)
+        with open(index_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), before)
+
+    def test_visualizer_uses_cache(self):
+        """可视化器的布局经过缓存"""
+        visualizer = NetworkVisualizer(LayoutCache(self.directory.name))
+        first = visualizer.compute_layout(self.G, 'barnes_hut', seed=1)
+        second = visualizer.compute_layout(self.G, 'barnes_hut', seed=1)
+        self.assertEqual(visualizer.layout_cache.hits, 1)
+        np.testing.assert_array_equal(first['演员3'], second['演员3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
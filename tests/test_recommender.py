@@ -0,0 +1,89 @@
+"""
+测试合作推荐模块
+Test Collaborator Recommendation Module
+"""
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+from src.recommender import CollaboratorRecommender, _average_precision, _roc_auc, evaluate_temporal_split
+from tests.sample_data import make_sample_frames
+
+
+class TestCollaboratorRecommender(unittest.TestCase):
+    """测试合作者推荐器"""
+
+    def setUp(self):
+        self.cast_data_df, self.cast_works_df, _ = make_sample_frames()
+        self.recommender = CollaboratorRecommender.from_data(self.cast_works_df)
+        self.G = self.recommender.graph.to_networkx()
+
+    def test_recommend_excludes_existing_collaborators(self):
+        """推荐结果不包含自身和已有合作者"""
+        recommendations = self.recommender.recommend(7, method='common_neighbors', top_k=10)
+        recommended = {r['cast_id'] for r in recommendations}
+        self.assertTrue(recommended)
+        self.assertNotIn(7, recommended)
+        self.assertFalse(recommended & set(self.G.neighbors(7)))
+
+    def test_scores_match_networkx(self):
+        """各打分方法与networkx的结果一致"""
+        pairs = [(7, 3), (7, 4), (8, 1), (6, 2)]
+        codes = self.recommender._codes([p for pair in pairs for p in pair]).reshape(-1, 2)
+        scores = self.recommender.score_pairs(codes[:, 0], codes[:, 1])
+
+        expected = {
+            'adamic_adar': [s for _, _, s in nx.adamic_adar_index(self.G, pairs)],
+            'resource_allocation': [s for _, _, s in nx.resource_allocation_index(self.G, pairs)],
+            'jaccard': [s for _, _, s in nx.jaccard_coefficient(self.G, pairs)],
+            'common_neighbors': [len(list(nx.common_neighbors(self.G, u, v))) for u, v in pairs],
+        }
+        for method, values in expected.items():
+            np.testing.assert_allclose(scores[method], values, err_msg=method)
+
+        batch = self.recommender.recommend_batch([7], method='jaccard', top_k=10)[7]
+        by_id = {r['cast_id']: r['score'] for r in batch}
+        self.assertAlmostEqual(by_id[3], expected['jaccard'][0])
+
+    def test_evaluate_temporal_split(self):
+        """时间切分评估返回每种方法的指标"""
+        report = evaluate_temporal_split(self.cast_works_df, split_year=2005)
+        self.assertEqual(set(report.index),
+                         {'common_neighbors', 'adamic_adar', 'resource_allocation', 'jaccard'})
+        self.assertTrue(((report['auc'] >= 0) & (report['auc'] <= 1)).all())
+
+    def test_evaluate_temporal_split_few_non_edges(self):
+        """未合作的节点对不足时负样本取全部，没有时抛出异常而不是一直抽样"""
+        report = evaluate_temporal_split(self.cast_works_df, split_year=2005, negative_ratio=100)
+        self.assertTrue((report['negatives'] < report['positives'] * 100).all())
+
+        dense = pd.DataFrame({
+            'work_id': [1, 1, 2, 2, 3, 3, 3, 3],
+            'cast_id': [1, 2, 3, 4, 1, 2, 3, 4],
+            'work_year': [1990, 1990, 1991, 1991, 2000, 2000, 2000, 2000],
+        })
+        for column in ('work_title', 'cast_name', 'cast_role', 'work_type', 'work_genres'):
+            dense[column] = 'x'
+        with self.assertRaises(ValueError):
+            evaluate_temporal_split(dense, split_year=2000)
+        with self.assertRaisesRegex(ValueError, 'negative_ratio'):
+            evaluate_temporal_split(self.cast_works_df, split_year=2005, negative_ratio=0)
+
+    def test_ranking_metrics(self):
+        """AUC 和平均精度按同分取平均处理"""
+        labels = np.array([1, 0, 1, 0, 0, 1], dtype=float)
+        scores = np.array([0.9, 0.8, 0.8, 0.3, 0.1, 0.05])
+        # 9 个正负对中正样本得分更高的 5 个，同分的 1 个记 0.5
+        self.assertAlmostEqual(_roc_auc(labels, scores), 5.5 / 9)
+        # 阈值 0.9: P=1, R=1/3；0.8: P=2/3, R=2/3；0.05: P=1/2, R=1
+        self.assertAlmostEqual(_average_precision(labels, scores), (1 + 2 / 3 + 1 / 2) / 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+测试本地查询服务模块
+Test Local Query Service Module
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import CastNetwork
+from src.cast_index import get_index
+from src.service import MAX_TOP_N, QueryService, execute_query
+from tests.sample_data import make_sample_frames
+
+
+def sample_network():
+    return CastNetwork.from_frames(*make_sample_frames())
+
+
+async def http_request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(data)
+
+
+class TestQueries(unittest.TestCase):
+    """测试查询函数"""
+
+    def setUp(self):
+        self.network = sample_network()
+
+    def test_search_and_resolve(self):
+        """搜索和ID解析，重名演员全部返回，未找到的ID为 None"""
+        status, body = execute_query(self.network, 'search', {'keyword': '张'})
+        self.assertEqual(status, 200)
+        self.assertEqual(sorted(r['cast_id'] for r in body['result']), [7, 8])
+        status, body = execute_query(self.network, 'resolve', {'name': '张伟'})
+        self.assertEqual(len(body['result']), 2)
+        status, body = execute_query(self.network, 'resolve', {'cast_ids': [2, 99]})
+        self.assertEqual(body['result'][0]['cast_name'], '李二')
+        self.assertIsNone(body['result'][1])
+
+    def test_collaborators_and_ego(self):
+        """合作频率与个人网络边表的权重一致"""
+        _, body = execute_query(self.network, 'collaborators', {'cast_id': 1, 'top_n': 1})
+        top = body['result'][0]
+        self.assertEqual((top['cast_id'], top['frequency']), (2, 3))
+        _, body = execute_query(self.network, 'ego', {'cast_id': 1})
+        ego = body['result']
+        self.assertEqual(ego['cast_name'], '周一')
+        self.assertEqual(ego['edges'], 6)
+        self.assertEqual(ego['collaborators'][0], {'collaborator_id': 2, 'collaborator_name': '李二',
+                                                   'weight': 3, 'work_ids': [101, 102, 104]})
+
+    def test_path(self):
+        """最短合作路径，相邻两人确实共同参与了给出的作品"""
+        _, body = execute_query(self.network, 'path', {'source': 8, 'target': 7})
+        path = body['result']
+        self.assertEqual(path['hops'], 3)
+        self.assertEqual([a['cast_id'] for a in path['actors']][0::3], [8, 7])
+        rows = self.network.cast_works_df
+        for (a, b), work in zip(zip(path['actors'], path['actors'][1:]), path['works']):
+            cast = set(rows.loc[rows['work_id'] == work['work_id'], 'cast_id'])
+            self.assertTrue({a['cast_id'], b['cast_id']} <= cast)
+        _, body = execute_query(self.network, 'path', {'source': 8, 'target': 7, 'max_hops': 2})
+        self.assertIsNone(body['result']['hops'])
+
+    def test_collaboration_path_matches_bfs(self):
+        """路径长度与全局网络上的最短路径长度一致"""
+        import networkx as nx
+        index = get_index(self.network.cast_works_df)
+        G = self.network.network_builder.build_global_network(self.network.cast_works_df)
+        for a in range(index.n_actors):
+            for b in range(index.n_actors):
+                found = index.collaboration_path(a, b)
+                expected = nx.shortest_path_length(G, index.actor_ids[a], index.actor_ids[b])
+                self.assertEqual(len(found[1]), expected)
+
+    def test_errors(self):
+        """未知查询、未知参数和不存在的演员返回错误而不是抛出异常"""
+        self.assertEqual(execute_query(self.network, 'nope')[0], 404)
+        self.assertEqual(execute_query(self.network, 'ego', {'cast_id': 1, 'bogus': 1})[0], 400)
+        self.assertEqual(execute_query(self.network, 'stats', {'cast_id': 99})[0], 400)
+        for top_n in (None, 0, MAX_TOP_N + 1):
+            self.assertEqual(execute_query(self.network, 'collaborators', {'cast_id': 1, 'top_n': top_n})[0], 400)
+        for limit in (-2, 0, True, 1.5):
+            self.assertEqual(execute_query(self.network, 'ego', {'cast_id': 1, 'limit': limit})[0], 400)
+        self.assertEqual(len(execute_query(self.network, 'ego', {'cast_id': 1, 'limit': 2})[1]['result']
+                             ['collaborators']), 2)
+
+
+class TestQueryService(unittest.TestCase):
+    """测试 HTTP 服务和批量查询"""
+
+    def setUp(self):
+        self.network = sample_network()
+
+    def run_service(self, scenario, processes=0):
+        async def main():
+            async with QueryService(self.network, processes=processes) as service:
+                server = await service.serve(port=0)
+                return await scenario(service, server.sockets[0].getsockname()[1])
+        return asyncio.run(main())
+
+    def test_http_endpoints(self):
+        """health、单条查询和错误状态码"""
+        async def scenario(service, port):
+            return (await http_request(port, 'GET', '/health'),
+                    await http_request(port, 'POST', '/stats', {}),
+                    await http_request(port, 'POST', '/ego', {'cast_id': 99}),
+                    await http_request(port, 'GET', '/ego'),
+                    await http_request(port, 'POST', '/unknown', {}))
+
+        health, stats, missing, method, unknown = self.run_service(scenario)
+        self.assertEqual(health[1]['actors'], 8)
+        self.assertEqual(stats[1]['result']['works'], 6)
+        self.assertEqual([missing[0], method[0], unknown[0]], [400, 405, 404])
+
+    def test_invalid_content_length(self):
+        """Content-Length 不是非负整数时返回 400 和 JSON 错误信息"""
+        async def raw_request(port, length):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(f"POST /stats HTTP/1.1\r\nHost: test\r\nContent-Length: {length}\r\n\r\n{{}}"
+                         .encode('latin-1'))
+            response = await reader.read()
+            writer.close()
+            head, _, data = response.partition(b'\r\n\r\n')
+            return int(head.split()[1]), json.loads(data)
+
+        async def scenario(service, port):
+            return [await raw_request(port, length) for length in ('abc', '-1', '2.5')]
+
+        for status, body in self.run_service(scenario):
+            self.assertEqual(status, 400)
+            self.assertIn('Content-Length', body['error'])
+
+    def test_thread_executor_output(self):
+        """processes=0 时后台线程中构建器的进度输出不写入服务的标准输出，本线程的输出不受影响"""
+        async def scenario(service, port):
+            print('服务日志')
+            return (await service.query('stats', {'cast_id': 1}),
+                    await service.query('nope'))
+
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            stats, unknown = self.run_service(scenario)
+            self.assertIs(sys.stdout, stdout)
+        self.assertEqual(stats[0], 200)
+        self.assertGreater(stats[1]['result']['nodes'], 0)
+        self.assertEqual(unknown[0], 404)
+        self.assertEqual(stdout.getvalue(), '服务日志\n')
+
+    def test_batch_with_worker_processes(self):
+        """批量查询经工作进程执行，结果按提交顺序返回，单条失败不影响其他查询"""
+        queries = [{'op': 'path', 'params': {'source': 8, 'target': cast_id}} for cast_id in range(1, 9)]
+        queries.append({'op': 'ego', 'params': {'cast_id': 99}})
+        queries.append({'op': 'search', 'params': {'keyword': '周'}})
+
+        async def scenario(service, port):
+            return await http_request(port, 'POST', '/batch', queries)
+
+        status, body = self.run_service(scenario, processes=2)
+        self.assertEqual(status, 200)
+        results = body['results']
+        self.assertEqual([r['result']['hops'] for r in results[:8]], [2, 2, 2, 2, 1, 1, 3, 0])
+        self.assertEqual(results[8]['status'], 400)
+        self.assertEqual(results[9]['result'][0]['cast_name'], '周一')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+测试相似演员检索模块
+Test Similar Actor Search Module
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.similarity import MinHashIndex
+from tests.sample_data import make_sample_frames
+
+
+class TestMinHashIndex(unittest.TestCase):
+    """测试MinHash/LSH索引"""
+
+    def setUp(self):
+        # 集合0和集合1完全相同，集合2与集合0的Jaccard为 0.5，集合3为空
+        rows = [[0, 1, 2, 3, 4, 5], [0, 1, 2, 3, 4, 5], [0, 1, 2, 3, 6, 7], []]
+        indptr = np.cumsum([0] + [len(r) for r in rows])
+        sets = sp.csr_matrix((np.ones(indptr[-1]), np.concatenate(rows[:3]), indptr), shape=(4, 10))
+        self.index = MinHashIndex.from_sets(sets, np.array([10, 11, 12, 13]),
+                                            np.array(['甲', '乙', '丙', '丁']),
+                                            num_perm=256, bands=128)
+
+    def test_query_estimates_jaccard(self):
+        """相同集合的估计相似度为1，部分重叠的接近真实值"""
+        results = {r['cast_id']: r['similarity'] for r in self.index.query(10)}
+        self.assertEqual(results[11], 1.0)
+        self.assertAlmostEqual(results[12], 0.5, delta=0.15)
+        self.assertNotIn(13, results)
+        self.assertEqual(self.index.query(13), [])
+
+    def test_candidate_pairs(self):
+        """批量候选对包含所有同桶节点对"""
+        pairs = self.index.candidate_pairs(min_similarity=0.9)
+        self.assertEqual(pairs[['cast_id_a', 'cast_id_b']].values.tolist(), [[10, 11]])
+
+    def test_save_and_load(self):
+        """保存后加载的索引返回相同结果"""
+        with tempfile.TemporaryDirectory() as directory:
+            self.index.save(directory)
+            loaded = MinHashIndex.load(directory)
+            self.assertEqual(loaded.query(10), self.index.query(10))
+
+    def test_save_without_pickle(self):
+        """字符串ID和缺失的姓名不经 pickle 保存，加载时不允许 pickle"""
+        index = MinHashIndex(self.index.signatures, np.array(['a10', 'a11', 'a12', 'a13'], dtype=object),
+                             np.array(['甲', np.nan, '丙', '丁'], dtype=object), self.index.bands)
+        with tempfile.TemporaryDirectory() as directory:
+            index.save(directory)
+            for name in os.listdir(directory):
+                if name.endswith('.npy'):
+                    self.assertNotEqual(np.load(os.path.join(directory, name), allow_pickle=False).dtype, object)
+            loaded = MinHashIndex.load(directory)
+            self.assertEqual(loaded.query('a10'), index.query('a10'))
+            self.assertEqual(loaded.node_names[0], '甲')
+            self.assertTrue(np.isnan(loaded.node_names[1]))
+
+            bad = MinHashIndex(self.index.signatures, np.array([10, 'a11', 12, 13], dtype=object),
+                               self.index.node_names, self.index.bands)
+            with self.assertRaises(TypeError):
+                bad.save(os.path.join(directory, 'bad'))
+
+    def test_for_actors(self):
+        """按演员合作者集合构建索引"""
+        _, cast_works_df, _ = make_sample_frames()
+        index = MinHashIndex.for_actors(cast_works_df, kind='works', num_perm=64, bands=32)
+        self.assertEqual(index.signatures.shape, (8, 64))
+        # 两位“张伟”各只有一部作品，作品集合不重叠
+        self.assertNotIn(8, [r['cast_id'] for r in index.query(7)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+测试数据快照模块
+Test Data Snapshot Module
+"""
+
+import unittest
+import sys
+import os
+import contextlib
+import io
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import CastNetwork, DataSnapshot
+from tests.sample_data import make_sample_frames
+
+
+def frame_versions():
+    """两个版本的数据：第二版删除了作品 104"""
+    cast_data_df, cast_works_df, works_data_df = make_sample_frames()
+    trimmed = cast_works_df[cast_works_df['work_id'] != 104].reset_index(drop=True)
+    return [(cast_data_df, cast_works_df, works_data_df), (cast_data_df, trimmed, works_data_df)]
+
+
+def fingerprint(network):
+    """在同一快照上执行一组查询，结果转换为可比较的元组"""
+    top = network.get_collaboration_frequency_by_id(1, top_n=3)
+    recommended = network.recommend_collaborators(6, top_k=3)
+    similar = network.find_similar_actors(2, top_k=3)
+    return (
+        tuple((int(r['cast_id']), r['frequency']) for r in top),
+        tuple(int(r['cast_id']) for r in recommended),
+        tuple((int(r['cast_id']), r['similarity']) for r in similar),
+        network.are_actors_connected(1, 8),
+        network.snapshot.index.n_actors,
+        network.build_actor_network_by_id(1).number_of_edges(),
+    )
+
+
+class TestDataSnapshot(unittest.TestCase):
+    """测试快照的只读性和派生结构缓存"""
+
+    def test_snapshot_is_read_only(self):
+        """快照属性不能修改，索引数组不可写"""
+        snapshot = DataSnapshot(*make_sample_frames())
+        with self.assertRaises(AttributeError):
+            snapshot.cast_works_df = None
+        with self.assertRaises(ValueError):
+            snapshot.index.incidence.data[0] = 0
+        with self.assertRaises(ValueError):
+            snapshot.index.work_table.years[0] = 0
+        with self.assertRaises(ValueError):
+            DataSnapshot().require()
+
+    def test_derived_built_once(self):
+        """多个线程同时请求同一派生结构，只构建一次"""
+        snapshot = DataSnapshot(*make_sample_frames())
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(snapshot.derived('key', factory))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+    def test_reload_replaces_snapshot(self):
+        """替换快照后旧快照不变，派生结构随新快照重新构建"""
+        versions = frame_versions()
+        network = CastNetwork.from_frames(*versions[0])
+        pinned = network.pinned()
+        old = network.swap_snapshot(DataSnapshot(*versions[1]))
+        self.assertIs(old, pinned.snapshot)
+        self.assertGreater(network.snapshot.version, old.version)
+        self.assertEqual(pinned.get_collaboration_frequency_by_id(1, top_n=1)[0]['frequency'], 3)
+        self.assertEqual(network.get_collaboration_frequency_by_id(1, top_n=1)[0]['frequency'], 2)
+        self.assertEqual(network.snapshot.derived('components', list), [])
+
+    def test_frame_assignment_swaps_snapshot(self):
+        """给数据表属性赋值（旧用法）会构建新快照并整体替换"""
+        versions = frame_versions()
+        network = CastNetwork.from_frames(*versions[0])
+        old = network.snapshot
+        network.cast_works_df = versions[1][1]
+        self.assertIsNot(network.snapshot, old)
+        self.assertIs(network.snapshot.cast_data_df, old.cast_data_df)
+        self.assertIs(network.data_loader.cast_works_df, versions[1][1])
+        self.assertEqual(network.get_collaboration_frequency_by_id(1, top_n=1)[0]['frequency'], 2)
+
+        empty = CastNetwork()
+        empty.cast_data_df, empty.cast_works_df = versions[0][:2]
+        self.assertTrue(empty.snapshot.loaded)
+
+    def test_component_index_is_private_copy(self):
+        """连通分量索引的增量更新只作用于调用者的副本，快照上的共享索引只读"""
+        network = CastNetwork.from_frames(*frame_versions()[1])
+        components = network.get_component_index()
+        components.add_credits([8, 99], [900, 900])
+        self.assertTrue(components.connected(8, 99))
+        self.assertIsNot(network.get_component_index(), components)
+        with self.assertRaises(ValueError):
+            network.are_actors_connected(8, 99)
+
+        shared = network.snapshot.peek('components')
+        self.assertEqual(shared.n_components, 1)
+        self.assertEqual(len(shared.largest_component()), 7)
+        with self.assertRaises(ValueError):
+            shared.add_credits([1], [900])
+
+
+class TestConcurrentQueries(unittest.TestCase):
+    """并发压力测试：多个线程查询的同时反复替换快照"""
+
+    def test_queries_consistent_during_reloads(self):
+        """每组查询的结果都与某一版本完全一致，不出现错误或混合结果"""
+        versions = frame_versions()
+        expected = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i, frames in enumerate(versions):
+                expected[fingerprint(CastNetwork.from_frames(*frames))] = i
+            self.assertEqual(len(expected), 2)
+
+            network = CastNetwork.from_frames(*versions[0])
+            stop = threading.Event()
+            errors, seen = [], []
+
+            def reader():
+                try:
+                    while not stop.is_set():
+                        seen.append(expected.get(fingerprint(network.pinned()), 'mixed'))
+                except Exception as error:
+                    errors.append(error)
+
+            def writer():
+                try:
+                    for i in range(30):
+                        # 复制数据表，每次替换都构建新的索引和派生结构
+                        frames = [None if df is None else df.copy() for df in versions[(i + 1) % 2]]
+                        network.swap_snapshot(DataSnapshot(*frames))
+                finally:
+                    stop.set()
+
+            threads = [threading.Thread(target=reader) for _ in range(6)]
+            threads.append(threading.Thread(target=writer))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(60)
+
+        self.assertEqual(errors, [])
+        self.assertNotIn('mixed', seen)
+        self.assertEqual(set(seen), {0, 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+测试数据快照存储模块
+Test Snapshot Store Module
+"""
+
+import unittest
+import sys
+import os
+import asyncio
+import contextlib
+import io
+import shutil
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from src import CastNetwork, DataSnapshot
+from src.service import QueryService
+from src.snapshot_store import load_snapshot, save_snapshot
+from tests.sample_data import make_sample_frames
+
+
+def query_results(network):
+    """一组覆盖数据表和索引的查询"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        G = network.build_actor_network_by_id(1, genres=['喜剧'])
+    return (
+        network.get_collaboration_frequency_by_id(1, top_n=5),
+        sorted(G.edges(data='weight')),
+        network.recommend_collaborators(6, top_k=3),
+        network.find_similar_actors(2, top_k=3),
+        network.search_actors('张'),
+        network.get_role_statistics().to_dict(),
+        network.get_genres_statistics(),
+        network.get_actor_genre_profile(1),
+    )
+
+
+class TestSnapshotStore(unittest.TestCase):
+    """测试快照的发布和内存映射加载"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.snapshot_dir = os.path.join(self.temp_dir, 'snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        """加载的数据表与原数据相同，索引数组与重新构建的一致且只读"""
+        frames = make_sample_frames()
+        snapshot = DataSnapshot(*frames)
+        save_snapshot(snapshot, self.snapshot_dir)
+        loaded = load_snapshot(self.snapshot_dir)
+
+        for original, restored in zip(frames, (loaded.cast_data_df, loaded.cast_works_df, loaded.works_data_df)):
+            pd.testing.assert_frame_equal(original, restored)
+        for name, value in vars(snapshot.index).items():
+            restored = getattr(loaded.index, name)
+            if isinstance(value, np.ndarray):
+                self.assertEqual(value.dtype, restored.dtype, name)
+                self.assertTrue(pd.Series(value).equals(pd.Series(restored)), name)
+            elif sp.issparse(value):
+                self.assertEqual((value != restored).nnz, 0, name)
+        self.assertFalse(loaded.index.row_actor.flags.writeable)
+        self.assertFalse(loaded.index.incidence.indices.flags.owndata)
+        self.assertFalse(loaded.cast_works_df['cast_id'].to_numpy().flags.writeable)
+
+    def test_queries_match(self):
+        """从快照目录创建的实例与从数据表创建的实例查询结果相同，已发布的相似度索引直接加载"""
+        network = CastNetwork.from_frames(*make_sample_frames())
+        network.publish_snapshot(self.snapshot_dir, similarity=['collaborators'])
+        attached = CastNetwork.from_snapshot(self.snapshot_dir)
+        self.assertIsNotNone(attached.snapshot.peek(('similarity', 'collaborators')))
+        self.assertEqual(repr(query_results(network)), repr(query_results(attached)))
+
+    def test_missing_values_and_index(self):
+        """缺失的字符串和非连续的行索引原样恢复"""
+        cast_data_df, cast_works_df, works_data_df = make_sample_frames()
+        cast_works_df = cast_works_df[cast_works_df['work_id'] != 102].copy()
+        cast_works_df.loc[cast_works_df.index[0], 'cast_name'] = np.nan
+        save_snapshot(DataSnapshot(cast_data_df, cast_works_df, None), self.snapshot_dir)
+        loaded = load_snapshot(self.snapshot_dir, mmap=False)
+        pd.testing.assert_frame_equal(cast_works_df, loaded.cast_works_df)
+        self.assertIsNone(loaded.works_data_df)
+        self.assertTrue(pd.isna(loaded.index.row_name[0]))
+
+    def test_no_pickle(self):
+        """所有数组不使用 pickle；含非字符串对象的列拒绝保存，已发布的快照不受影响"""
+        network = CastNetwork.from_frames(*make_sample_frames())
+        network.publish_snapshot(self.snapshot_dir, similarity=['works'])
+        for name in os.listdir(self.snapshot_dir):
+            if name.endswith('.npy'):
+                self.assertNotEqual(np.load(os.path.join(self.snapshot_dir, name), allow_pickle=False).dtype, object)
+
+        cast_data_df, cast_works_df, works_data_df = make_sample_frames()
+        cast_data_df['main_works'] = cast_data_df['main_works'].astype(object)
+        cast_data_df.loc[0, 'main_works'] = 42
+        with self.assertRaisesRegex(TypeError, 'main_works'):
+            save_snapshot(DataSnapshot(cast_data_df, cast_works_df, works_data_df), self.snapshot_dir)
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['snapshot'])
+        self.assertIsNotNone(load_snapshot(self.snapshot_dir).peek(('similarity', 'works')))
+
+    def test_republish(self):
+        """重新发布替换目录，已加载的旧快照仍可查询"""
+        network = CastNetwork.from_frames(*make_sample_frames())
+        network.publish_snapshot(self.snapshot_dir)
+        old = CastNetwork.from_snapshot(self.snapshot_dir)
+
+        cast_data_df, cast_works_df, works_data_df = make_sample_frames()
+        trimmed = cast_works_df[cast_works_df['work_id'] != 104].reset_index(drop=True)
+        CastNetwork.from_frames(cast_data_df, trimmed, works_data_df).publish_snapshot(self.snapshot_dir)
+        new = CastNetwork.from_snapshot(self.snapshot_dir)
+        self.assertEqual(old.get_collaboration_frequency_by_id(1, top_n=1)[0]['frequency'], 3)
+        self.assertEqual(new.get_collaboration_frequency_by_id(1, top_n=1)[0]['frequency'], 2)
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['snapshot'])
+
+    def test_service_workers_attach(self):
+        """查询服务的工作进程从快照目录加载数据"""
+        network = CastNetwork.from_frames(*make_sample_frames())
+        queries = [{'op': 'path', 'params': {'source': 8, 'target': cast_id}} for cast_id in range(1, 9)]
+
+        async def main():
+            async with QueryService(network, processes=2, snapshot_dir=self.snapshot_dir) as service:
+                return await service.query_batch(queries)
+
+        results = asyncio.run(main())
+        self.assertEqual([r['result']['hops'] for r in results], [2, 2, 2, 2, 1, 1, 3, 0])
+        self.assertTrue(os.path.exists(os.path.join(self.snapshot_dir, 'meta.json')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+测试SQLite数据加载模块
+Test SQLite Data Loader Module
+"""
+
+import unittest
+import sys
+import os
+import contextlib
+import io
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from pandas.testing import assert_frame_equal, assert_series_equal
+
+from src.data_loader import DataLoader
+from src.sqlite_loader import SQLiteDataLoader
+from tests.sample_data import make_sample_frames
+
+
+class TestSQLiteDataLoader(unittest.TestCase):
+    """SQLite 后端的查询结果与 DataLoader 一致"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = [os.path.join(self.tmpdir.name, name)
+                      for name in ('cast_data.csv', 'cast_works_data.csv', 'works_data.csv')]
+        for frame, path in zip(make_sample_frames(), self.paths):
+            frame.to_csv(path, index=False, encoding='utf-8')
+        self.db_path = os.path.join(self.tmpdir.name, 'cast.sqlite')
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.frames = DataLoader()
+            self.frames.load_data(*self.paths)
+            self.loader = SQLiteDataLoader(self.db_path).load_data(*self.paths)
+
+    def tearDown(self):
+        self.loader.close()
+        self.tmpdir.cleanup()
+
+    def assert_same(self, expected, actual):
+        assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True))
+
+    def quiet(self, func, *args, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func(*args, **kwargs)
+
+    def test_row_queries(self):
+        """按ID、姓名查询和关键词搜索"""
+        self.assert_same(self.frames.get_actor_works(1), self.loader.get_actor_works(1))
+        self.assert_same(self.frames.get_work_cast(103), self.loader.get_work_cast(103))
+        self.assert_same(self.frames.get_actor_by_name('张伟'), self.loader.get_actor_by_name('张伟'))
+        self.assert_same(self.frames.search_actors('李', limit=5), self.loader.search_actors('李', limit=5))
+        self.assertTrue(self.loader.search_actors('%').empty)
+        # 缺失的年份为 NaN，无结果时列类型也与 DataLoader 相同
+        self.assert_same(self.frames.get_work_cast(106), self.loader.get_work_cast(106))
+        self.assertTrue(self.loader.get_work_cast(106)['work_year'].isna().all())
+        self.assert_same(self.frames.get_actor_works(99), self.loader.get_actor_works(99))
+        # 关键词按字面匹配，不是正则表达式
+        self.assertFalse(self.frames.search_actors('.').empty)
+        self.assertTrue(self.loader.search_actors('.').empty)
+
+    def test_collaboration_data(self):
+        """合作数据（含职能筛选）与 DataLoader 相同，行为原表顺序"""
+        for cast_id in (1, 2, 8):
+            self.assert_same(self.quiet(self.frames.get_cast_collaboration_data_by_id, cast_id),
+                             self.quiet(self.loader.get_cast_collaboration_data_by_id, cast_id))
+        self.assert_same(self.quiet(self.frames.get_cast_collaboration_data_by_id, 1, ['导演']),
+                         self.quiet(self.loader.get_cast_collaboration_data_by_id, 1, ['导演']))
+        self.assert_same(self.quiet(self.frames.get_cast_collaboration_data, '周一'),
+                         self.quiet(self.loader.get_cast_collaboration_data, '周一'))
+        with self.assertRaises(ValueError):
+            self.loader.get_cast_collaboration_data_by_id(999)
+
+    def test_statistics(self):
+        """职能、题材统计和题材共现矩阵"""
+        self.assertEqual(self.frames.get_available_roles(), self.loader.get_available_roles())
+        assert_frame_equal(self.frames.get_role_statistics(), self.loader.get_role_statistics(),
+                           check_dtype=False)
+        self.assert_same(self.frames.get_genres_statistics(), self.loader.get_genres_statistics())
+        for years in ((None, None), (1995, None), (None, 2001), (1995, 2005)):
+            assert_frame_equal(self.frames.get_genre_cooccurrence(*years),
+                               self.loader.get_genre_cooccurrence(*years), check_dtype=False)
+        for normalize in (False, True):
+            assert_series_equal(self.frames.get_actor_genre_profile(2, normalize),
+                                self.loader.get_actor_genre_profile(2, normalize), check_dtype=False)
+
+    def test_reuses_database(self):
+        """源文件不变时直接打开数据库，源文件变化后重新导入"""
+        mtime = os.stat(self.db_path).st_mtime_ns
+        with SQLiteDataLoader(self.db_path).load_data(*self.paths) as loader:
+            self.assertEqual(len(loader.get_actor_works(1)), 5)
+        self.assertEqual(os.stat(self.db_path).st_mtime_ns, mtime)
+
+        cast_works_df = pd.read_csv(self.paths[1])
+        cast_works_df[cast_works_df['cast_id'] != 8].to_csv(self.paths[1], index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            loader = SQLiteDataLoader(self.db_path).load_data(*self.paths)
+        self.assertTrue(loader.get_actor_works(8).empty)
+        loader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+测试网络可视化模块
+Test Network Visualization Module
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import contextlib
+import io
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import networkx as nx
+
+from matplotlib.figure import Figure
+
+from src.backbone import extract_backbone
+from src.compact_graph import CompactGraph
+from src.network_builder import NetworkBuilder
+from src.visualizer import NetworkVisualizer
+from tests.sample_data import make_sample_frames
+
+
+class TestLargeInteractiveNetwork(unittest.TestCase):
+    """测试交互式网络的大图模式"""
+
+    def setUp(self):
+        self.G = nx.relabel_nodes(nx.powerlaw_cluster_graph(400, 3, 0.3, seed=2), lambda n: f"演员{n}")
+        rng = np.random.default_rng(0)
+        for u, v in self.G.edges():
+            self.G[u][v]['weight'] = int(rng.integers(1, 10))
+        self.visualizer = NetworkVisualizer()
+
+    def edge_segments(self, fig):
+        """各边 trace 中的线段，每段为 ((x0, y0), (x1, y1))"""
+        segments = []
+        for trace in fig.data:
+            if trace.mode == 'lines':
+                x = np.asarray(trace.x, dtype=float).reshape(-1, 3)
+                y = np.asarray(trace.y, dtype=float).reshape(-1, 3)
+                self.assertTrue(np.isnan(x[:, 2]).all())
+                segments.extend(zip(map(tuple, np.column_stack((x[:, 0], y[:, 0]))),
+                                    map(tuple, np.column_stack((x[:, 1], y[:, 1])))))
+        return segments
+
+    def test_webgl_traces(self):
+        """大图模式全部使用 Scattergl，未裁剪时每条边一段"""
+        fig = self.visualizer.plot_interactive_network(self.G, layout='barnes_hut', seed=1,
+                                                       large_graph=True, label_top=10)
+        self.assertTrue(all(trace.type == 'scattergl' for trace in fig.data))
+        self.assertEqual(len(self.edge_segments(fig)), self.G.number_of_edges())
+        labels = [trace for trace in fig.data if trace.mode == 'text'][0]
+        self.assertEqual(len(labels.text), 10)
+        strength = dict(self.G.degree(weight='weight'))
+        self.assertEqual(labels.text[0], max(strength, key=strength.get))
+
+    def test_level_of_detail_pruning(self):
+        """按权重裁剪边，但每个节点最强的边保留"""
+        fig = self.visualizer.plot_interactive_network(self.G, layout='barnes_hut', seed=1,
+                                                       large_graph=True, max_edges=200)
+        segments = self.edge_segments(fig)
+        self.assertGreaterEqual(len(segments), 200)
+        self.assertLess(len(segments), self.G.number_of_edges())
+
+        pos = self.visualizer.compute_layout(self.G, 'barnes_hut', seed=1)
+        drawn = {frozenset(segment) for segment in segments}
+        point = {node: tuple(np.asarray(pos[node], dtype=np.float32).astype(float)) for node in self.G}
+        for node in self.G:
+            u, v, _ = max(self.G.edges(node, data='weight'), key=lambda edge: edge[2])
+            if not any(frozenset((point[u], point[x])) in drawn for x in self.G[u]
+                       if self.G[u][x]['weight'] == self.G[u][v]['weight']):
+                self.fail(f"{node} 最强的边被裁剪")
+
+    def test_min_edge_weight(self):
+        """低于 min_edge_weight 的边不绘制"""
+        fig = self.visualizer.plot_interactive_network(self.G, layout='barnes_hut', seed=1,
+                                                       large_graph=True, min_edge_weight=5)
+        expected = sum(1 for _, _, w in self.G.edges(data='weight') if w >= 5)
+        self.assertEqual(len(self.edge_segments(fig)), expected)
+
+    def test_automatic_switch(self):
+        """边数超过阈值时自动启用大图模式"""
+        self.visualizer.LARGE_GRAPH_EDGES = 100
+        fig = self.visualizer.plot_interactive_network(self.G, layout='barnes_hut', seed=1)
+        self.assertEqual(fig.data[-1].type, 'scattergl')
+        small = self.visualizer.plot_interactive_network(nx.path_graph(5), layout='barnes_hut', seed=1)
+        self.assertEqual(small.data[0].type, 'scatter')
+
+
+
+class TestBatchRendering(unittest.TestCase):
+    """测试无界面批量渲染"""
+
+    def setUp(self):
+        self.cast_data_df, self.cast_works_df, _ = make_sample_frames()
+        self.visualizer = NetworkVisualizer()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_render_figure_without_pyplot(self):
+        """render_network_figure 返回独立的 Figure，不注册到 pyplot"""
+        import matplotlib.pyplot as plt
+        before = plt.get_fignums()
+        fig = self.visualizer.render_network_figure(nx.karate_club_graph(), seed=1)
+        self.assertIsInstance(fig, Figure)
+        self.assertEqual(plt.get_fignums(), before)
+        fig.clear()
+
+    def test_degree_distribution_of_compact_backbone(self):
+        """度分布图接受 extract_backbone() 得到的 CompactGraph"""
+        import matplotlib.pyplot as plt
+        backbone = extract_backbone(CompactGraph.from_networkx(nx.karate_club_graph()), 'top_k', k=2)
+        with mock.patch.object(plt, 'show'):
+            self.visualizer.plot_degree_distribution(backbone)
+            fig = plt.gcf()
+        degrees = dict(backbone.to_networkx().degree())
+        self.assertEqual(sum(patch.get_height() for patch in fig.axes[0].patches), len(degrees))
+        plt.close(fig)
+
+    def test_render_batch(self):
+        """每位演员输出各格式文件，报告耗时和内存，失败的演员单独记录"""
+        for processes in (1, 2):
+            output_dir = os.path.join(self.directory.name, str(processes))
+            report = self.visualizer.render_batch(
+                [1, 3, 999], self.cast_data_df, self.cast_works_df, output_dir,
+                formats=('png', 'svg', 'html'), processes=processes, figsize=(4, 3), dpi=50,
+                track_memory=processes == 1
+            )
+            self.assertEqual(report['cast_id'].tolist(), [1, 3, 999])
+            self.assertEqual(report['status'].tolist(), ['ok', 'ok', 'error'])
+            self.assertIn('999', report['error'].iloc[2])
+            for cast_id in (1, 3):
+                for fmt in ('png', 'svg', 'html'):
+                    self.assertGreater(os.path.getsize(os.path.join(output_dir, f"{cast_id}.{fmt}")), 0)
+            self.assertTrue((report['seconds'] > 0).all())
+            self.assertEqual(report['nodes'].iloc[0], NetworkBuilder().build_actor_network_by_id(
+                1, self.cast_data_df, self.cast_works_df).number_of_nodes())
+        self.assertTrue((report['pid'] != os.getpid()).all())
+
+        report = self.visualizer.render_batch([1], self.cast_data_df, self.cast_works_df,
+                                              self.directory.name, processes=1, track_memory=True)
+        self.assertGreater(report['peak_memory_mb'].iloc[0], 0)
+        with self.assertRaises(ValueError):
+            self.visualizer.render_batch([1], self.cast_data_df, self.cast_works_df,
+                                         self.directory.name, formats=('gif',))
+
+    def test_render_batch_concurrent_in_process(self):
+        """多个线程同时在当前进程中批量渲染，各自的文件写入各自的目录"""
+        from concurrent.futures import ThreadPoolExecutor
+        from src import visualizer as visualizer_module
+        cast_ids = list(range(1, 9))
+
+        def render(i):
+            output_dir = os.path.join(self.directory.name, f"thread{i}")
+            report = self.visualizer.render_batch(cast_ids, self.cast_data_df, self.cast_works_df,
+                                                  output_dir, formats=('html',), processes=1)
+            return report, output_dir
+
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(6) as executor:
+            results = list(executor.map(render, range(6)))
+        for report, output_dir in results:
+            self.assertEqual(sorted(os.listdir(output_dir)),
+                             sorted(f"{cast_id}.html" for cast_id in report.loc[report['status'] == 'ok', 'cast_id']))
+            self.assertTrue(all(os.path.dirname(path) == output_dir for files in report['files'] for path in files))
+        self.assertEqual(visualizer_module._BATCH_STATE, {})
+
+
+class TestCollaborationMatrices(unittest.TestCase):
+    """测试合作者之间的热力图矩阵和时间线矩阵"""
+
+    def setUp(self):
+        self.cast_data_df, self.cast_works_df, _ = make_sample_frames()
+        self.builder = NetworkBuilder()
+        self.collaborations = self.builder.get_collaboration_frequency_by_id(
+            1, self.cast_data_df, self.cast_works_df, top_n=None
+        )
+        self.visualizer = NetworkVisualizer()
+
+    def works_of(self, cast_id):
+        return set(self.cast_works_df.loc[self.cast_works_df['cast_id'] == cast_id, 'work_id'])
+
+    def test_pairwise_cocredits(self):
+        """非对角线为两位合作者的共同作品数"""
+        ids = [c['cast_id'] for c in self.collaborations]
+        full = self.visualizer.collaboration_matrix(self.collaborations, cast_works_df=self.cast_works_df)
+        within = self.visualizer.collaboration_matrix(self.collaborations)
+        target_works = self.works_of(1)
+        for i, a in enumerate(ids):
+            for j, b in enumerate(ids):
+                shared = self.works_of(a) & self.works_of(b) if i != j else set()
+                self.assertEqual(full.iloc[i, j], len(shared))
+                self.assertEqual(within.iloc[i, j], len(shared & target_works))
+        self.assertEqual(list(full.index), [c['collaborator'] for c in self.collaborations])
+        self.assertEqual(len(self.visualizer.collaboration_matrix(self.collaborations, top_n=2)), 2)
+
+    def test_timeline(self):
+        """每位合作者每年与目标演员的共同作品数"""
+        timeline = self.visualizer.collaboration_timeline(self.collaborations, self.cast_works_df)
+        rows = self.cast_works_df.drop_duplicates(['cast_id', 'work_id'])
+        target_works = self.works_of(1)
+        for i, collaboration in enumerate(self.collaborations):
+            shared = rows[(rows['cast_id'] == collaboration['cast_id']) & rows['work_id'].isin(target_works)]
+            expected = shared['work_year'].dropna().astype(int).value_counts()
+            actual = timeline.iloc[i]
+            self.assertEqual(actual[actual > 0].to_dict(), expected.to_dict())
+
+        presence = self.visualizer.collaboration_timeline(self.collaborations)
+        self.assertTrue(((timeline > 0).astype(int) == presence).all().all())
+
+
+if __name__ == '__main__':
+    unittest.main()
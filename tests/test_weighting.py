@@ -0,0 +1,116 @@
+"""
+测试边权重方案
+Test Edge Weighting Schemes
+"""
+
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.cast_index import get_index
+from src.network_builder import NetworkBuilder
+from src.recommender import CollaboratorRecommender
+from src.weighting import EdgeWeighting
+from tests.sample_data import make_sample_frames
+
+
+class TestEdgeWeighting(unittest.TestCase):
+    """测试加权合作强度"""
+
+    def setUp(self):
+        self.cast_data_df, self.cast_works_df, _ = make_sample_frames()
+        self.index = get_index(self.cast_works_df)
+        self.network_builder = NetworkBuilder()
+        self.weighting = EdgeWeighting(half_life=10, order_exponent=1.0,
+                                       role_weights={('演员', '导演'): 2.0, ('演员', '编剧'): 0.5})
+
+    def expected_weights(self, weighting):
+        """逐条记录对直接计算的期望权重，同一演员在一部作品中有多条记录时取平均"""
+        credits = self.cast_works_df.groupby(['cast_id', 'work_id'])['cast_id'].transform('size')
+        rows = self.cast_works_df.assign(
+            time=np.where(self.cast_works_df['work_year'].isna(), weighting.undated_weight,
+                          0.5 ** ((2012 - self.cast_works_df['work_year']).clip(lower=0)
+                                  / (weighting.half_life or np.inf))),
+            prominence=1.0 / self.cast_works_df['cast_order'].clip(lower=1) ** weighting.order_exponent / credits
+        )
+        pairs = rows.merge(rows, on='work_id')
+        pairs = pairs[pairs['cast_id_x'] != pairs['cast_id_y']]
+        role = [weighting.role_weights.get((a, b), weighting.role_weights.get(
+                (b, a), weighting.default_role_weight))
+                for a, b in zip(pairs['cast_role_x'], pairs['cast_role_y'])]
+        contribution = pairs['time_x'] * pairs['prominence_x'] * pairs['prominence_y'] * role
+        return contribution.groupby([pairs['cast_id_x'], pairs['cast_id_y']]).sum()
+
+    def test_adjacency_matches_row_pairs(self):
+        """加权共现矩阵与逐条记录对的计算结果一致"""
+        for weighting in (EdgeWeighting(), self.weighting):
+            matrix = weighting.adjacency(self.index)
+            expected = self.expected_weights(weighting)
+            for (a, b), value in expected.items():
+                self.assertAlmostEqual(
+                    matrix[self.index.actor_code(a), self.index.actor_code(b)], value
+                )
+            self.assertEqual(matrix.nnz, len(expected))
+
+    def test_default_matches_shared_works(self):
+        """默认方案的边权重等于共同作品数，与不加权的全局网络一致"""
+        matrix = EdgeWeighting().adjacency(self.index)
+        self.assertEqual(abs(matrix - self.index.cooccurrence()).max(), 0)
+        network = self.network_builder.build_actor_network_by_id(
+            1, self.cast_data_df, self.cast_works_df, weighting=EdgeWeighting()
+        )
+        # 周一在电影D中既是演员又是导演：与李二的记录对有4对，共同作品3部
+        self.assertEqual(network['周一']['李二']['weight'], 3)
+
+    def test_ego_network_matches_global(self):
+        """个人网络的加权边与全局矩阵一致，原始次数保存在 co_credits"""
+        network = self.network_builder.build_actor_network_by_id(
+            1, self.cast_data_df, self.cast_works_df, weighting=self.weighting
+        )
+        matrix = self.weighting.adjacency(self.index)
+        for name in ('李二', '王三', '赵四', '孙五'):
+            edge = network['周一'][name]
+            code = self.index.actor_code(network.nodes[name]['cast_id'])
+            self.assertAlmostEqual(edge['weight'], matrix[self.index.actor_code(1), code])
+        self.assertEqual(network['周一']['李二']['co_credits'], 3)
+
+    def test_global_network_time_decay(self):
+        """时间衰减使早年的合作权重变小"""
+        G = self.network_builder.build_global_network(
+            self.cast_works_df, weighting=EdgeWeighting(half_life=5, reference_year=2005)
+        )
+        # 电影A(1990)衰减3个半衰期，电影B(1995)衰减2个，电影D(2005)不衰减
+        self.assertAlmostEqual(G[1][2]['weight'], 0.125 + 0.25 + 1.0)
+
+    def test_network_stats_use_weights(self):
+        """网络统计的加权度读取加权边，并记录权重方案"""
+        G = self.network_builder.build_global_network(self.cast_works_df, weighting=self.weighting)
+        stats = self.network_builder.get_network_stats(G)
+        strengths = dict(G.degree(weight='weight'))
+        self.assertAlmostEqual(stats['total_weight'], self.weighting.adjacency(self.index).sum() / 2)
+        self.assertAlmostEqual(stats['max_strength'], max(strengths.values()))
+        self.assertEqual(stats['weighting']['half_life'], 10)
+
+        plain = self.network_builder.get_network_stats(
+            self.network_builder.build_global_network(self.cast_works_df))
+        self.assertEqual(plain['total_weight'], self.index.cooccurrence().sum() / 2)
+        self.assertNotIn('weighting', plain)
+
+    def test_weighted_recommender(self):
+        """加权推荐器的共同邻居分数为两跳路径权重之积的和"""
+        recommender = CollaboratorRecommender.from_data(self.cast_works_df, weighting=self.weighting)
+        weights = recommender.graph.adjacency
+        u, v = recommender._codes([7, 6])
+        scores = recommender.score_pairs(np.array([u]), np.array([v]), ['common_neighbors', 'jaccard'])
+        self.assertAlmostEqual(scores['common_neighbors'][0], (weights @ weights)[u, v])
+        self.assertGreater(scores['jaccard'][0], 0)
+
+        recommendation = recommender.recommend(7, 'common_neighbors')[0]
+        self.assertIsInstance(recommendation['common_neighbors'], int)
+
+
+if __name__ == '__main__':
+    unittest.main()